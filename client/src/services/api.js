@@ -105,6 +105,14 @@ export const plansAPI = {
     return response.data
   },
 
+  // Lightweight listing (no plan_text); pass next_cursor to fetch the next page
+  getPlanSummaries: async (cursor = null, limit = 20) => {
+    const params = { limit }
+    if (cursor) params.cursor = cursor
+    const response = await api.get('/plans/summary', { params })
+    return response.data
+  },
+
   getPlan: async (planId) => {
     const response = await api.get(`/plans/${planId}`)
     return response.data
@@ -233,5 +241,42 @@ export const healthAPI = {
   }
 }
 
+// Live updates (Server-Sent Events). Returns a function that closes the stream.
+// EventSource can't send headers, so the URL carries a short-lived stream-only token;
+// every (re)connect fetches a fresh one.
+export const eventsAPI = {
+  subscribe: (onEvent) => {
+    const types = ['food_logged', 'food_totals_changed', 'workout_logged', 'workout_totals_changed', 'sync_completed']
+    let source = null
+    let closed = false
+    let retry = null
+    const reconnect = () => {
+      if (!closed) retry = setTimeout(open, 5000)
+    }
+    const open = async () => {
+      try {
+        const { data } = await api.post('/events/token')
+        if (closed) return
+        source = new EventSource(`${API_BASE_URL}/events/stream?token=${encodeURIComponent(data.token)}`)
+        types.forEach((type) => {
+          source.addEventListener(type, (e) => onEvent(JSON.parse(e.data)))
+        })
+        source.onerror = () => {
+          source.close()
+          reconnect()
+        }
+      } catch {
+        reconnect()
+      }
+    }
+    open()
+    return () => {
+      closed = true
+      clearTimeout(retry)
+      if (source) source.close()
+    }
+  },
+}
+
 export default api
 
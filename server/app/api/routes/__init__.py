@@ -1,3 +1,3 @@
 """API route modules exported for main application."""
-from . import auth, users, ai, plans, food, workout, analytics, health, health_insights
+from . import auth, users, ai, plans, food, workout, analytics, health, health_insights, events, metrics, admin, jobs
 
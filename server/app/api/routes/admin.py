@@ -0,0 +1,50 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from app.core.config import settings
+from app.core.profiling import list_profiles, get_profile
+
+router = APIRouter()
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+
+def require_admin(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)) -> None:
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, then require it as a Bearer token."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if credentials is None or not hmac.compare_digest(credentials.credentials, settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/profiles")
+async def get_profiles(_: None = Depends(require_admin)):
+    """List captured request profiles, newest first."""
+    return {"enabled": settings.PROFILING_ENABLED, "profiles": list_profiles()}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("report", pattern="^(report|json)$"),
+    _: None = Depends(require_admin)
+):
+    """Download a profile: the profiler report (HTML or text), or JSON with the Mongo call list."""
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    if format == "json":
+        return {k: v for k, v in profile.items() if k != "report"}
+
+    headers = {"Content-Disposition": f'attachment; filename="profile-{profile_id}.{"html" if profile["profiler"] == "pyinstrument" else "txt"}"'}
+    if profile["profiler"] == "pyinstrument":
+        return HTMLResponse(profile["report"], headers=headers)
+    return PlainTextResponse(profile["report"], headers=headers)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Response, status
 from fastapi.responses import StreamingResponse
 from app.core.security import get_current_user_id
-from app.services.ai_service import classify_body_image, generate_personalized_plan, chat_with_history, predict_height_weight
+from app.core.uploads import read_image_upload
+from app.services.ai_service import analyze_image, classify_body_image, generate_personalized_plan, chat_with_history, predict_height_weight
+from app.models.job import JobResponse
 from app.models.plan import ChatRequest
+from app.services.job_queue import dedup_key, submit_job
 import json
 from typing import Optional
 
@@ -14,40 +17,49 @@ async def predict_hw(
     user_id: str = Depends(get_current_user_id)
 ):
     """Predict height and weight from an uploaded image using the finetuned ViT model."""
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an image"
-        )
-    image_bytes = await file.read()
+    image_bytes = await read_image_upload(file)
     try:
         result = await predict_height_weight(image_bytes)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Height/weight prediction failed: {str(e)}"
         )
 
+@router.post("/analyze-image")
+async def analyze(
+    file: UploadFile = File(...),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Classify body type and predict height/weight from one uploaded image."""
+    image_bytes = await read_image_upload(file)
+    try:
+        return await analyze_image(image_bytes)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Image analysis failed: {str(e)}"
+        )
+
 @router.post("/classify-image")
 async def classify_image(
     file: UploadFile = File(...),
     user_id: str = Depends(get_current_user_id)
 ):
     """Classify body type from uploaded image."""
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an image"
-        )
-    
-    # Read image bytes
-    image_bytes = await file.read()
+    image_bytes = await read_image_upload(file)
     
     # Classify image
     try:
         label = await classify_body_image(image_bytes)
         return {"classifier_label": label}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -68,18 +80,13 @@ async def generate_plan(
     user_id: str = Depends(get_current_user_id)
 ):
     """Generate personalized fitness plan with image classification."""
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an image"
-        )
-    
-    # Read image bytes
-    image_bytes = await file.read()
+    image_bytes = await read_image_upload(file)
     
     # Classify image
     try:
         classifier_label = await classify_body_image(image_bytes)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -113,6 +120,46 @@ async def generate_plan(
             detail=f"Plan generation failed: {str(e)}"
         )
 
+@router.post("/generate-plan/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_generate_plan(
+    response: Response,
+    file: UploadFile = File(...),
+    name: Optional[str] = Form(None),
+    age: int = Form(...),
+    sex: str = Form(...),
+    weight: float = Form(...),
+    height_cm: float = Form(...),
+    activity_level: str = Form(...),
+    goal: str = Form(...),
+    diet_prefs: Optional[str] = Form(None),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Queue plan generation and return the job at once.
+
+    Poll GET /api/jobs/{id} or wait for the `job_completed` SSE event; the
+    result has the same shape as /generate-plan. Resubmitting identical
+    inputs while the job is still active returns the same job.
+    """
+    image_bytes = await read_image_upload(file)
+    user_inputs = {
+        "name": name,
+        "age": age,
+        "sex": sex,
+        "weight": weight,
+        "height_cm": height_cm,
+        "activity_level": activity_level,
+        "goal": goal,
+        "diet_prefs": diet_prefs
+    }
+    job, created = await submit_job(
+        user_id, "generate_plan", {"image": image_bytes, "user_inputs": user_inputs},
+        dedup_key(image_bytes, user_inputs),
+    )
+    response.headers["Location"] = f"/api/jobs/{job['_id']}"
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return JobResponse.from_doc(job)
+
 @router.post("/chat")
 async def chat(
     request: ChatRequest,
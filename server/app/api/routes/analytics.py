@@ -1,12 +1,16 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
 from pydantic import BaseModel
 
 from app.core.security import get_current_user_id
+from app.core.config import settings
+from app.core.log import get_logger
 from app.db.mongodb import get_database
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 
 class DailySummaryItem(BaseModel):
@@ -78,12 +82,8 @@ async def weekly_summary(
     end_dt = datetime.combine((end_date or date.today()) + timedelta(days=1), datetime.min.time())
     start_dt = datetime.combine(start_date or (date.today() - timedelta(days=6)), datetime.min.time())
 
-    print(f"[DEBUG weekly_summary] user_id={user_id}")
-    print(f"[DEBUG weekly_summary] start_dt={start_dt}, end_dt={end_dt}")
-
     # Get user goals (from latest plan or defaults)
     goals = await _get_user_goals(db, user_id)
-    print(f"[DEBUG weekly_summary] goals={goals}")
 
     # Aggregate food per day
     food_pipeline = [
@@ -99,8 +99,6 @@ async def weekly_summary(
 
     food_cursor = food_coll.aggregate(food_pipeline)
     food_rows = await food_cursor.to_list(length=1000)
-    print(f"[DEBUG weekly_summary] food_rows count: {len(food_rows)}")
-    print(f"[DEBUG weekly_summary] food_rows: {food_rows}")
 
     # Aggregate workouts per day
     workout_pipeline = [
@@ -116,8 +114,19 @@ async def weekly_summary(
     workout_cursor = workout_coll.aggregate(workout_pipeline)
     workout_rows = await workout_cursor.to_list(length=1000)
 
-    print(f"[DEBUG weekly_summary] workout_rows count: {len(workout_rows)}")
-    print(f"[DEBUG weekly_summary] workout_rows: {workout_rows}")
+    if logger.isEnabledFor(logging.DEBUG):
+        details = {
+            "user_id": user_id,
+            "start": start_dt,
+            "end": end_dt,
+            "goals": goals,
+            "food_rows": len(food_rows),
+            "workout_rows": len(workout_rows),
+        }
+        if settings.LOG_DUMP_AGGREGATES:
+            details["food_data"] = food_rows
+            details["workout_data"] = workout_rows
+        logger.debug("weekly_summary", extra=details)
 
     # Merge results by date using dicts (small amount of data)
     food_map = {r["_id"]: r for r in food_rows}
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, status
 from app.models.user import UserCreate, UserLogin, UserResponse, TokenResponse, UserInDB
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import get_password_hash_async, verify_password_async, create_access_token
+from app.core.log import get_logger
 from app.db.mongodb import get_database
 from datetime import datetime
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate):
@@ -24,7 +26,7 @@ async def signup(user_data: UserCreate):
         user_dict = {
             "email": user_data.email,
             "name": user_data.name,
-            "hashed_password": get_password_hash(user_data.password),
+            "hashed_password": await get_password_hash_async(user_data.password),
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
@@ -44,9 +46,10 @@ async def signup(user_data: UserCreate):
         )
         
         return TokenResponse(access_token=access_token, user=user_response)
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print("ERROR IN SIGNUP:", traceback.format_exc())
+        logger.exception("signup_failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/login", response_model=TokenResponse)
@@ -57,7 +60,7 @@ async def login(credentials: UserLogin):
     
     # Find user
     user = await users_collection.find_one({"email": credentials.email})
-    if not user or not verify_password(credentials.password, user["hashed_password"]):
+    if not user or not await verify_password_async(credentials.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
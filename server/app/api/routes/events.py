@@ -0,0 +1,80 @@
+import asyncio
+from datetime import timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from app.core.config import settings
+from app.core.security import create_scoped_token, get_current_user_id, verify_token
+from app.services.event_bus import event_bus, format_sse
+
+router = APIRouter()
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+STREAM_SCOPE = "events:stream"
+
+
+@router.post("/token")
+async def create_stream_token(user_id: str = Depends(get_current_user_id)):
+    """Short-lived token for `GET /stream?token=...`, for clients (EventSource) that cannot set headers.
+
+    URLs end up in access logs and browser history, so the login token is never accepted
+    there; this one only opens the stream and expires after EVENTS_TOKEN_EXPIRE_SECONDS.
+    """
+    ttl = settings.EVENTS_TOKEN_EXPIRE_SECONDS
+    return {
+        "token": create_scoped_token(user_id, STREAM_SCOPE, timedelta(seconds=ttl)),
+        "expires_in": ttl,
+    }
+
+
+async def get_stream_user_id(
+    token: Optional[str] = Query(None, description="Stream token from POST /api/events/token"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)
+) -> str:
+    """Authenticate from the Authorization header (login token) or a `token` query param (stream token)."""
+    if credentials:
+        user_id, _ = verify_token(credentials.credentials)
+    elif token:
+        user_id, _ = verify_token(token, scope=STREAM_SCOPE)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user_id
+
+
+@router.get("/stream")
+async def stream_events(request: Request, user_id: str = Depends(get_stream_user_id)):
+    """Server-Sent Events stream of the user's live updates.
+
+    Event types: food_logged, food_totals_changed, workout_logged,
+    workout_totals_changed, sync_completed, job_completed, job_failed.
+    """
+    queue = event_bus.subscribe(user_id)
+
+    async def _events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment frame keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            event_bus.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request, Response
 from typing import Optional
 from datetime import date, datetime
 from app.models.food import (
@@ -6,11 +6,24 @@ from app.models.food import (
     FoodLogEntry, DailyFoodLog, FoodItem, CustomFoodCreate
 )
 from app.core.security import get_current_user_id
+from app.core.http_cache import make_etag, has_conditional, etag_matches, not_modified, set_etag
+from app.core.responses import model_response, ndjson_response, NDJSON_MEDIA_TYPE
+from app.core.log import get_logger
 from app.db.mongodb import get_database
+from app.services.log_ranges import iter_daily_logs, validate_range
 from app.services.food_service import search_food_items, calculate_macros_for_quantity
+from app.services.event_bus import event_bus
 from bson import ObjectId
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+
+def _daily_etag(log_date: date, doc: Optional[dict]) -> str:
+    if not doc:
+        return make_etag("food", log_date, "empty")
+    return make_etag("food", doc["_id"], doc.get("version", 0), doc.get("updated_at"))
+
 
 @router.get("/search", response_model=FoodSearchResponse)
 async def search_food(
@@ -105,11 +118,20 @@ async def log_food(
         
         existing_log["total_macros"] = total_macros
         existing_log["updated_at"] = log_entry.logged_at
+        existing_log["version"] = existing_log.get("version", 0) + 1
         
         await food_logs_collection.replace_one(
             {"_id": existing_log["_id"]},
             existing_log
         )
+        await event_bus.publish(user_id, "food_logged", {
+            "log_id": str(existing_log["_id"]),
+            "date": log_date.isoformat(),
+            "meal_type": food_log.meal_type,
+            "food_name": food_log.food_name,
+            "macros": macros,
+            "total_macros": existing_log["total_macros"]
+        })
         
         return DailyFoodLogResponse(
             id=str(existing_log["_id"]),
@@ -137,6 +159,14 @@ async def log_food(
         log_dict = new_log.dict(by_alias=True)
         result = await food_logs_collection.insert_one(log_dict)
         log_dict["_id"] = result.inserted_id
+        await event_bus.publish(user_id, "food_logged", {
+            "log_id": str(result.inserted_id),
+            "date": log_date.isoformat(),
+            "meal_type": food_log.meal_type,
+            "food_name": food_log.food_name,
+            "macros": macros,
+            "total_macros": log_dict["total_macros"]
+        })
         
         return DailyFoodLogResponse(
             id=str(result.inserted_id),
@@ -180,14 +210,21 @@ async def log_water(
     log_datetime = datetime.combine(log_date, datetime.min.time())
 
     # Debug log to help reproduce client issues
-    print(f"[food.water] user={user_id} date={log_date} water_ml={water_ml}")
+    logger.debug("water_updated", extra={"user_id": user_id, "date": log_date, "water_ml": water_ml})
 
     existing_log = await food_logs_collection.find_one({"user_id": user_id, "date": log_datetime})
 
     if existing_log:
         existing_log["water_ml"] = float(water_ml)
         existing_log["updated_at"] = datetime.utcnow()
+        existing_log["version"] = existing_log.get("version", 0) + 1
         await food_logs_collection.replace_one({"_id": existing_log["_id"]}, existing_log)
+        await event_bus.publish(user_id, "food_totals_changed", {
+            "log_id": str(existing_log["_id"]),
+            "date": log_date.isoformat(),
+            "total_macros": existing_log.get("total_macros", {}),
+            "water_ml": existing_log["water_ml"]
+        })
 
         return DailyFoodLogResponse(
             id=str(existing_log["_id"]),
@@ -212,6 +249,12 @@ async def log_water(
     log_dict = new_log.dict(by_alias=True)
     result = await food_logs_collection.insert_one(log_dict)
     log_dict["_id"] = result.inserted_id
+    await event_bus.publish(user_id, "food_totals_changed", {
+        "log_id": str(result.inserted_id),
+        "date": log_date.isoformat(),
+        "total_macros": log_dict["total_macros"],
+        "water_ml": log_dict["water_ml"]
+    })
 
     return DailyFoodLogResponse(
         id=str(result.inserted_id),
@@ -225,8 +268,29 @@ async def log_water(
     )
 
 
+@router.get("/range")
+async def get_food_log_range(
+    request: Request,
+    start: date = Query(..., description="First day (inclusive)"),
+    end: date = Query(..., description="Last day (inclusive)"),
+    fields: str = Query("totals", pattern="^(totals|full)$", description="totals: per-day totals only; full: every entry"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams one day per line"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get daily food logs for a date range in one query; days without a log are omitted.
+
+    Send `format=ndjson` (or `Accept: application/x-ndjson`) to stream long ranges.
+    """
+    validate_range(start, end)
+    rows = iter_daily_logs("food", user_id, start, end, fields)
+    if format == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return ndjson_response(rows)
+    return {"start": start, "end": end, "fields": fields, "days": [row async for row in rows]}
+
 @router.get("/daily", response_model=DailyFoodLogResponse)
 async def get_daily_food_log(
+    request: Request,
+    response: Response,
     target_date: Optional[date] = Query(None, description="Date to get logs for (defaults to today)"),
     user_id: str = Depends(get_current_user_id)
 ):
@@ -239,12 +303,18 @@ async def get_daily_food_log(
     
     # Convert date to datetime for MongoDB compatibility
     log_datetime = datetime.combine(log_date, datetime.min.time())
+    query = {"user_id": user_id, "date": log_datetime}
+    
+    # Conditional GET: check the version with a tiny projection before loading the log
+    if has_conditional(request):
+        head = await food_logs_collection.find_one(query, {"_id": 1, "version": 1, "updated_at": 1})
+        etag = _daily_etag(log_date, head)
+        if etag_matches(request, etag):
+            return not_modified(etag)
     
     # Find daily log
-    daily_log = await food_logs_collection.find_one({
-        "user_id": user_id,
-        "date": log_datetime
-    })
+    daily_log = await food_logs_collection.find_one(query)
+    set_etag(response, _daily_etag(log_date, daily_log))
     
     if not daily_log:
         # Return empty log for the date
@@ -261,7 +331,7 @@ async def get_daily_food_log(
             water_ml=0.0
         )
         
-        return DailyFoodLogResponse(
+        return model_response(DailyFoodLogResponse(
             id="",
             user_id=user_id,
             date=log_date,  # Return original date for API response
@@ -270,9 +340,9 @@ async def get_daily_food_log(
             water_ml=empty_log.water_ml,
             created_at=empty_log.created_at,
             updated_at=empty_log.updated_at
-        )
+        ), response=response)
     
-    return DailyFoodLogResponse(
+    return model_response(DailyFoodLogResponse(
         id=str(daily_log["_id"]),
         user_id=daily_log["user_id"],
         date=log_date,  # Return original date for API response
@@ -281,7 +351,7 @@ async def get_daily_food_log(
         water_ml=daily_log.get("water_ml", 0.0),
         created_at=daily_log["created_at"],
         updated_at=daily_log["updated_at"]
-    )
+    ), response=response)
 
 @router.delete("/log/{log_id}")
 async def delete_food_log(
@@ -325,12 +395,20 @@ async def delete_food_log(
             
             daily_log["total_macros"] = total_macros
             daily_log["updated_at"] = removed_item["logged_at"]
+            daily_log["version"] = daily_log.get("version", 0) + 1
             
             # Update in database
             await food_logs_collection.replace_one(
                 {"_id": daily_log["_id"]},
                 daily_log
             )
+            log_date = daily_log["date"].date() if isinstance(daily_log["date"], datetime) else daily_log["date"]
+            await event_bus.publish(user_id, "food_totals_changed", {
+                "log_id": str(daily_log["_id"]),
+                "date": log_date.isoformat(),
+                "total_macros": total_macros,
+                "water_ml": daily_log.get("water_ml", 0.0)
+            })
             
             return {"message": "Food log entry deleted successfully"}
         else:
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.core.security import get_current_user_id
 from app.db.mongodb import get_database
+from app.services.user_service import invalidate_user
+from app.services.event_bus import event_bus
 from app.models.health_profile import HealthProfileIn, DiseaseAwareness, HealthSyncDataIn, HealthSyncStatus
 from datetime import datetime
 from bson import ObjectId
@@ -128,6 +130,7 @@ async def save_health_profile(profile: HealthProfileIn, user_id: str = Depends(g
     except Exception:
         # Ignore failures updating user document
         pass
+    invalidate_user(user_id)
 
     return {"status": "ok", "bmi": bmi}
 
@@ -249,6 +252,12 @@ async def sync_health_data(data: HealthSyncDataIn, user_id: str = Depends(get_cu
     
     # Store as new record (append-only for audit trail)
     result = await coll.insert_one(doc)
+    await event_bus.publish(user_id, "sync_completed", {
+        "source": data.source,
+        "avg_steps": data.avg_steps,
+        "avg_sleep_hours": data.avg_sleep_hours,
+        "resting_heart_rate": data.resting_heart_rate
+    })
     
     return {
         "status": "synced",
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from datetime import datetime, date, timedelta
-from typing import List
+from typing import List, Optional
 
 from app.core.security import get_current_user_id
+from app.core.log import get_logger
 from app.db.mongodb import get_database
-from bson import ObjectId
+from app.services.user_service import get_current_user, load_user
 from app.models.health_insights import (
     HealthProfileResponse,
     HealthAwarenessResponse,
@@ -14,11 +15,11 @@ from app.models.health_insights import (
 )
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 
-async def _get_user_goals(db, user_id: str):
+async def _get_user_goals(db, user_id: str, user: Optional[dict] = None):
     plans_collection = db["plans"]
-    users_collection = db["users"]
     plan = await plans_collection.find_one({"user_id": user_id}, sort=[("created_at", -1)])
     defaults = {"calories": 2000.0, "protein": 75.0, "workouts_per_week": 3}
 
@@ -32,12 +33,8 @@ async def _get_user_goals(db, user_id: str):
         return {"calories": float(calories), "protein": float(protein), "workouts_per_week": float(workouts_per_week)}
 
     # Fallback: attempt to read from user profile
-    user = await users_collection.find_one({"_id": user_id})
-    try:
-        if not user:
-            user = await users_collection.find_one({"user_id": user_id})
-    except Exception:
-        pass
+    if user is None:
+        user = await load_user(user_id)
 
     if user:
         calories = user.get("calories_goal") or defaults["calories"]
@@ -61,21 +58,15 @@ def _bmi_category(bmi: float) -> str:
 
 
 @router.get("/profile", response_model=HealthProfileResponse)
-async def get_health_profile(user_id: str = Depends(get_current_user_id)):
+async def get_health_profile(
+    user_id: str = Depends(get_current_user_id),
+    user: Optional[dict] = Depends(get_current_user)
+):
     """Derive an explainable health profile from user, food_logs and workout_logs."""
     db = get_database()
-    users = db["users"]
     food = db["food_logs"]
     workout = db["workout_logs"]
 
-    user = None
-    # try common id shapes
-    try:
-        user = await users.find_one({"_id": ObjectId(user_id)})
-    except Exception:
-        user = await users.find_one({"_id": user_id})
-    if not user:
-        user = await users.find_one({"user_id": user_id})
     # best-effort fields
     weight = user.get("weight") if user else None
     height_cm = user.get("height_cm") if user else None
@@ -123,7 +114,7 @@ async def get_health_profile(user_id: str = Depends(get_current_user_id)):
     weekly_minutes = round(total_seconds / 60.0, 1)
 
     # adherence: reuse analytics weighting for last 14 days
-    goals = await _get_user_goals(db, user_id)
+    goals = await _get_user_goals(db, user_id, user)
     cal_goal = max(1.0, goals.get("calories", 2000.0))
     protein_goal = max(1.0, goals.get("protein", 75.0))
     workouts_per_week = max(0.0, goals.get("workouts_per_week", 3.0))
@@ -196,23 +187,16 @@ async def get_health_profile(user_id: str = Depends(get_current_user_id)):
 
 
 @router.get("/awareness", response_model=HealthAwarenessResponse)
-async def get_health_awareness(user_id: str = Depends(get_current_user_id)):
+async def get_health_awareness(
+    user_id: str = Depends(get_current_user_id),
+    user: Optional[dict] = Depends(get_current_user)
+):
     """Compute comprehensive health awareness indicators using lifestyle data."""
     db = get_database()
-    users = db["users"]
     food = db["food_logs"]
     workout = db["workout_logs"]
     wearable = db["wearable_daily_summary"]
 
-    # Get user profile
-    user = None
-    try:
-        user = await users.find_one({"_id": ObjectId(user_id)})
-    except Exception:
-        user = await users.find_one({"_id": user_id})
-    if not user:
-        user = await users.find_one({"user_id": user_id})
-
     # Basic profile data
     weight = user.get("weight") if user else None
     height_cm = user.get("height_cm") if user else None
@@ -228,7 +212,7 @@ async def get_health_awareness(user_id: str = Depends(get_current_user_id)):
             bmi = None
 
     # Get user goals
-    goals = await _get_user_goals(db, user_id)
+    goals = await _get_user_goals(db, user_id, user)
     cal_goal = max(1.0, goals.get("calories", 2000.0))
     protein_goal = max(1.0, goals.get("protein", 75.0))
 
@@ -369,10 +353,13 @@ async def get_health_awareness(user_id: str = Depends(get_current_user_id)):
     sleep_from_health_profile = health_profile_sleep_hrs if health_profile_sleep_hrs > 0 else None
 
     # Debug: log whether wearable or health sync data is used (helps troubleshoot missing page issues)
-    try:
-        print(f"[health.awareness] user={user_id} wearable_available={wearable_data_available} healthsync_used={healthsync_used} avg_steps={avg_steps:.0f} avg_sleep={sleep_from_wearable:.1f}")
-    except Exception:
-        pass
+    logger.debug("awareness_sources", extra={
+        "user_id": user_id,
+        "wearable_available": wearable_data_available,
+        "healthsync_used": healthsync_used,
+        "avg_steps": avg_steps,
+        "avg_sleep": sleep_from_wearable,
+    })
 
     # Late meals detection (simplified - would need timestamp data)
     late_meals_count = 0  # Placeholder
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+
+from app.core.security import get_current_user_id
+from app.models.job import JobResponse
+from app.services.job_queue import get_job, list_jobs
+
+router = APIRouter()
+
+@router.get("/", response_model=List[JobResponse])
+async def get_my_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Most recent jobs of the current user (results included once finished)."""
+    return [JobResponse.from_doc(doc) for doc in await list_jobs(user_id, limit)]
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(
+    job_id: str,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Poll a job; `result` is set once `status` is "succeeded"."""
+    job = await get_job(user_id, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return JobResponse.from_doc(job)
@@ -0,0 +1,30 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from app.core.config import settings
+from app.core.metrics import render
+
+router = APIRouter()
+
+optional_bearer = HTTPBearer(auto_error=False)
+
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)) -> None:
+    """When METRICS_TOKEN is set, scrapers must send it as a Bearer token."""
+    if not settings.METRICS_TOKEN:
+        return
+    if credentials is None or not hmac.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(_: None = Depends(require_metrics_token)):
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,13 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.models.plan import PlanCreate, PlanResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from app.models.plan import PlanCreate, PlanResponse, PlanSummary, PlanSummaryPage, PlanSections, PlanDaySection
 from app.core.security import get_current_user_id
+from app.core.http_cache import make_etag, has_conditional, etag_matches, not_modified, set_etag
+from app.core.responses import model_response
 from app.db.mongodb import get_database
+from app.services.plan_storage import encode_plan_text, load_plan_sections, read_plan_text, PREVIEW_CHARS
+from app.services.plan_parser import SECTIONS_VERSION, day_name
 from bson import ObjectId
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
+import base64
 
 router = APIRouter()
 
+# Fields that identify a plan revision; enough to compute ETags without plan_text
+_VERSION_FIELDS = {"_id": 1, "created_at": 1, "updated_at": 1}
+
+
+def _plan_etag(plan: dict) -> str:
+    return make_etag("plan", plan["_id"], plan.get("created_at"), plan.get("updated_at"))
+
+
+def _plans_list_etag(user_id: str, plans: List[dict]) -> str:
+    return make_etag("plans", user_id, *[(p["_id"], p.get("updated_at")) for p in plans])
+
+
+
+def _encode_cursor(created_at: datetime, plan_id: ObjectId) -> str:
+    raw = f"{created_at.isoformat()}|{plan_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, plan_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), ObjectId(plan_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 @router.post("/", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
 async def create_plan(
     plan_data: PlanCreate,
@@ -21,7 +55,7 @@ async def create_plan(
         "user_id": user_id,
         "user_inputs": plan_data.user_inputs,
         "classifier_label": plan_data.classifier_label,
-        "plan_text": plan_data.plan_text,
+        **encode_plan_text(plan_data.plan_text),
         "created_at": datetime.utcnow()
     }
     
@@ -33,65 +67,248 @@ async def create_plan(
         user_id=user_id,
         user_inputs=plan_dict["user_inputs"],
         classifier_label=plan_dict["classifier_label"],
-        plan_text=plan_dict["plan_text"],
+        plan_text=plan_data.plan_text,
         created_at=plan_dict["created_at"]
     )
 
 @router.get("/", response_model=List[PlanResponse])
-async def get_user_plans(user_id: str = Depends(get_current_user_id)):
+async def get_user_plans(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user_id)
+):
     """Get all plans for current user."""
     db = get_database()
     plans_collection = db["plans"]
     
+    # Conditional GET: compare against the list of plan versions before loading any plan_text
+    if has_conditional(request):
+        heads = await plans_collection.find({"user_id": user_id}, _VERSION_FIELDS).sort("created_at", -1).to_list(length=100)
+        etag = _plans_list_etag(user_id, heads)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
     cursor = plans_collection.find({"user_id": user_id}).sort("created_at", -1)
     plans = await cursor.to_list(length=100)
+    set_etag(response, _plans_list_etag(user_id, plans))
     
-    return [
+    return model_response([
         PlanResponse(
             id=str(plan["_id"]),
             user_id=plan["user_id"],
             user_inputs=plan["user_inputs"],
             classifier_label=plan["classifier_label"],
-            plan_text=plan["plan_text"],
+            plan_text=await read_plan_text(plan),
             created_at=plan["created_at"]
         )
         for plan in plans
+    ], List[PlanResponse], response)
+
+@router.get("/summary", response_model=PlanSummaryPage)
+async def get_user_plan_summaries(
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """List plans without plan_text, newest first, using keyset pagination.
+
+    Each entry carries a short preview and the full text length; fetch
+    /plans/{id} for the complete plan.
+    """
+    db = get_database()
+    plans_collection = db["plans"]
+    
+    match = {"user_id": user_id}
+    if cursor:
+        created_at, last_id = _decode_cursor(cursor)
+        match["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+    
+    # Compressed plans store preview/length at write time; older plain-text plans
+    # get them computed server-side so plan_text never leaves MongoDB
+    text = {"$ifNull": ["$plan_text", ""]}
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {
+            "classifier_label": 1,
+            "created_at": 1,
+            "goal": "$user_inputs.goal",
+            "preview": {"$ifNull": ["$plan_preview", {"$substrCP": [text, 0, PREVIEW_CHARS]}]},
+            "plan_length": {"$ifNull": ["$plan_length", {"$strLenCP": text}]}
+        }}
     ]
+    rows = await plans_collection.aggregate(pipeline).to_list(length=limit + 1)
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]["created_at"], rows[-1]["_id"])
+    
+    return PlanSummaryPage(
+        items=[
+            PlanSummary(
+                id=str(row["_id"]),
+                classifier_label=row.get("classifier_label", ""),
+                goal=row.get("goal"),
+                preview=row.get("preview", ""),
+                plan_length=row.get("plan_length", 0),
+                created_at=row["created_at"]
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor
+    )
 
 @router.get("/{plan_id}", response_model=PlanResponse)
 async def get_plan(
     plan_id: str,
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id)
 ):
     """Get a specific plan by ID."""
     db = get_database()
     plans_collection = db["plans"]
     
-    try:
-        plan = await plans_collection.find_one({
-            "_id": ObjectId(plan_id),
-            "user_id": user_id
-        })
-    except:
+    if not ObjectId.is_valid(plan_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid plan ID"
         )
+    query = {"_id": ObjectId(plan_id), "user_id": user_id}
+    
+    # Conditional GET: check the plan's version before loading plan_text
+    if has_conditional(request):
+        head = await plans_collection.find_one(query, _VERSION_FIELDS)
+        if head:
+            etag = _plan_etag(head)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+    
+    plan = await plans_collection.find_one(query)
     
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Plan not found"
         )
+    set_etag(response, _plan_etag(plan))
     
-    return PlanResponse(
+    return model_response(PlanResponse(
         id=str(plan["_id"]),
         user_id=plan["user_id"],
         user_inputs=plan["user_inputs"],
         classifier_label=plan["classifier_label"],
-        plan_text=plan["plan_text"],
+        plan_text=await read_plan_text(plan),
         created_at=plan["created_at"]
-    )
+    ), response=response)
+
+def _plan_object_id(plan_id: str) -> ObjectId:
+    if not ObjectId.is_valid(plan_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid plan ID"
+        )
+    return ObjectId(plan_id)
+
+
+async def _load_sections(user_id: str, plan_id: str, paths: Optional[List[str]] = None) -> dict:
+    plan = await load_plan_sections(user_id, _plan_object_id(plan_id), paths)
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan not found"
+        )
+    return plan
+
+
+def _sections_etag(plan: dict, *parts) -> str:
+    return make_etag("plan-sections", SECTIONS_VERSION, _plan_etag(plan), *parts)
+
+@router.get("/{plan_id}/sections", response_model=PlanSections)
+async def get_plan_sections(
+    plan_id: str,
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get a plan parsed into targets, meals and workouts by day, tips and variations."""
+    plan = await _load_sections(user_id, plan_id)
+    etag = _sections_etag(plan)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    sections = plan["plan_sections"]
+    return model_response(PlanSections(
+        plan_id=plan_id,
+        snapshot=sections.get("snapshot") or [],
+        targets=sections.get("targets") or {},
+        meals=sections.get("meals") or {},
+        workouts=sections.get("workouts") or {},
+        tips=sections.get("tips") or [],
+        variations=sections.get("variations") or {}
+    ), response=response)
+
+@router.get("/{plan_id}/meals/today", response_model=PlanDaySection)
+async def get_plan_meals_today(
+    plan_id: str,
+    request: Request,
+    response: Response,
+    target_date: Optional[date] = Query(None, description="Date to get meals for (defaults to today)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get one day of a plan's meal plan, with the daily nutrition targets.
+
+    Only that day and the targets are read from MongoDB.
+    """
+    day_date = target_date or date.today()
+    day = day_name(day_date.weekday())
+    plan = await _load_sections(user_id, plan_id, [f"meals.{day}", "targets"])
+    etag = _sections_etag(plan, "meals", day_date)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    sections = plan["plan_sections"]
+    return model_response(PlanDaySection(
+        plan_id=plan_id,
+        date=day_date,
+        day=day,
+        targets=sections.get("targets") or {},
+        items=(sections.get("meals") or {}).get(day) or {}
+    ), response=response)
+
+@router.get("/{plan_id}/workout/today", response_model=PlanDaySection)
+async def get_plan_workout_today(
+    plan_id: str,
+    request: Request,
+    response: Response,
+    target_date: Optional[date] = Query(None, description="Date to get the workout for (defaults to today)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get one day of a plan's workout plan.
+
+    Only that day is read from MongoDB.
+    """
+    day_date = target_date or date.today()
+    day = day_name(day_date.weekday())
+    plan = await _load_sections(user_id, plan_id, [f"workouts.{day}"])
+    etag = _sections_etag(plan, "workouts", day_date)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    
+    return model_response(PlanDaySection(
+        plan_id=plan_id,
+        date=day_date,
+        day=day,
+        items=(plan["plan_sections"].get("workouts") or {}).get(day) or {}
+    ), response=response)
 
 @router.delete("/{plan_id}")
 async def delete_plan(
@@ -1,19 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from app.models.user import UserResponse, UserUpdate
 from app.core.security import get_current_user_id
 from app.db.mongodb import get_database
-from bson import ObjectId
-from datetime import datetime
+from app.services import user_service
+from app.services.data_export import COLLECTIONS, open_export
+from app.core.responses import NDJSON_MEDIA_TYPE
+from typing import List, Optional
+from datetime import date, datetime
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(user_id: str = Depends(get_current_user_id)):
+async def get_current_user(user: Optional[dict] = Depends(user_service.get_current_user)):
     """Get current user profile."""
-    db = get_database()
-    users_collection = db["users"]
-    
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -55,9 +56,10 @@ async def update_current_user(
     
     # Update user
     result = await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
+        user_service.user_query(user_id),
         {"$set": update_data}
     )
+    user_service.invalidate_user(user_id)
     
     if result.matched_count == 0:
         raise HTTPException(
@@ -66,7 +68,7 @@ async def update_current_user(
         )
     
     # Fetch updated user
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_collection.find_one(user_service.user_query(user_id))
     
     return UserResponse(
         id=str(user["_id"]),
@@ -82,3 +84,35 @@ async def update_current_user(
         created_at=user["created_at"]
     )
 
+
+@router.get("/me/export")
+async def export_my_data(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    collections: Optional[List[str]] = Query(None, description="Collections to include (default: all; exactly one for csv)"),
+    gzip: bool = Query(True, description="gzip the download"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Download the current user's data, streamed straight from the database."""
+    names = collections or list(COLLECTIONS)
+    unknown = [name for name in names if name not in COLLECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown collections: {', '.join(unknown)}"
+        )
+    if format == "csv" and len(names) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV exports take exactly one collection"
+        )
+
+    stem = f"fitai-export-{date.today().isoformat()}" if format == "ndjson" else names[0]
+    filename = f"{stem}.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else (NDJSON_MEDIA_TYPE if format == "ndjson" else "text/csv")
+    body, release = open_export(user_id, format, names, gzip)
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        background=BackgroundTask(release)
+    )
@@ -1,5 +1,4 @@
-import traceback
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from typing import Optional, List
 from datetime import date, datetime
 from app.models.workout import (
@@ -7,22 +6,35 @@ from app.models.workout import (
     WorkoutLog, DailyWorkoutLog, WorkoutStreak, Exercise
 )
 from app.core.security import get_current_user_id
+from app.core.http_cache import make_etag, has_conditional, etag_matches, not_modified, set_etag
+from app.core.responses import model_response, ndjson_response, NDJSON_MEDIA_TYPE
+from app.core.log import get_logger
 from app.db.mongodb import get_database
+from app.services.log_ranges import iter_daily_logs, validate_range
 from app.services.workout_service import (
-    get_exercises_by_muscle_group, get_all_muscle_groups,
-    search_exercises, calculate_workout_streak
+    get_exercises_by_muscle_group, search_exercises, calculate_workout_streak
 )
+from app.services.exercise_catalog import get_catalog
+from app.services.event_bus import event_bus
 from bson import ObjectId
 
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+
+def _daily_etag(log_date: date, doc: Optional[dict]) -> str:
+    if not doc:
+        return make_etag("workout", log_date, "empty")
+    return make_etag("workout", doc["_id"], doc.get("version", 0), doc.get("updated_at"))
+
 
 @router.get("/muscle-groups")
 async def get_muscle_groups(user_id: str = Depends(get_current_user_id)):
     """Get all available muscle groups with exercises"""
     try:
-        muscle_groups = get_all_muscle_groups()
-        return {"muscle_groups": muscle_groups}
+        # Payload is serialized once when the catalog is loaded
+        return Response(content=get_catalog().muscle_groups_json, media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -36,8 +48,8 @@ async def get_exercises_by_muscle(
 ):
     """Get exercises for a specific muscle group"""
     try:
-        # Convert muscle_group to lowercase for consistent lookup in EXERCISES_DATABASE
-        exercises = get_exercises_by_muscle_group(muscle_group.lower()) # <-- FIX APPLIED HERE
+        # Convert muscle_group to lowercase for consistent lookup in the exercise catalog
+        exercises = get_exercises_by_muscle_group(muscle_group.lower())
         if not exercises:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -89,14 +101,18 @@ async def log_workout(
     workout_logs_collection = db["workout_logs"]
 
     try:
-        # Log incoming request
-        print(f"[WORKOUT LOG] user_id={user_id}")
-        print(f"[WORKOUT LOG] exercise={workout_log.exercise_name}, muscle={workout_log.muscle_group}, duration={workout_log.duration}s, date={workout_log.date}")
+        logger.info("workout_logged", extra={
+            "user_id": user_id,
+            "exercise": workout_log.exercise_name,
+            "muscle_group": workout_log.muscle_group,
+            "duration_s": workout_log.duration,
+            "date": workout_log.date,
+        })
         
         # Set date to today if not provided
         log_date = workout_log.date or date.today()
 
-        # Validate muscle group (ensure consistency with EXERCISES_DATABASE keys)
+        # Validate muscle group (catalog groups plus coarser groups and cardio types)
         # Assuming workout_log.muscle_group is already lowercase or will be handled by service
         valid_muscle_groups = [
             "chest", "back", "arms", "legs", "shoulders", "core", "cardio", 
@@ -146,11 +162,23 @@ async def log_workout(
             existing_log["total_weight"] = total_weight
             existing_log["total_duration"] = total_duration
             existing_log["updated_at"] = log_entry.logged_at
+            existing_log["version"] = existing_log.get("version", 0) + 1
 
             await workout_logs_collection.replace_one(
                 {"_id": existing_log["_id"]},
                 existing_log
             )
+            await event_bus.publish(user_id, "workout_logged", {
+                "log_id": str(existing_log["_id"]),
+                "date": log_date.isoformat(),
+                "exercise_name": log_entry.exercise_name,
+                "muscle_group": log_entry.muscle_group,
+                "total_sets": total_sets,
+                "total_reps": total_reps,
+                "total_weight": total_weight,
+                "total_duration": total_duration,
+                "workout_count": len(existing_log["workouts"])
+            })
 
             return DailyWorkoutLogResponse(
                 id=str(existing_log["_id"]),
@@ -186,6 +214,17 @@ async def log_workout(
             log_dict = new_log.dict(by_alias=True)
             result = await workout_logs_collection.insert_one(log_dict)
             log_dict["_id"] = result.inserted_id
+            await event_bus.publish(user_id, "workout_logged", {
+                "log_id": str(result.inserted_id),
+                "date": log_date.isoformat(),
+                "exercise_name": log_entry.exercise_name,
+                "muscle_group": log_entry.muscle_group,
+                "total_sets": log_dict["total_sets"],
+                "total_reps": log_dict["total_reps"],
+                "total_weight": log_dict["total_weight"],
+                "total_duration": log_dict["total_duration"],
+                "workout_count": 1
+            })
 
             return DailyWorkoutLogResponse(
                 id=str(result.inserted_id),
@@ -200,15 +239,35 @@ async def log_workout(
                 updated_at=log_dict["updated_at"]
             )
     except Exception as e:
-        print(f"Error logging workout: {e}")
-        print(traceback.format_exc())
+        logger.exception("workout_log_failed", extra={"user_id": user_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to log workout: {str(e)}"
         )
 
+@router.get("/range")
+async def get_workout_log_range(
+    request: Request,
+    start: date = Query(..., description="First day (inclusive)"),
+    end: date = Query(..., description="Last day (inclusive)"),
+    fields: str = Query("totals", pattern="^(totals|full)$", description="totals: per-day totals only; full: every entry"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams one day per line"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get daily workout logs for a date range in one query; days without a log are omitted.
+
+    Send `format=ndjson` (or `Accept: application/x-ndjson`) to stream long ranges.
+    """
+    validate_range(start, end)
+    rows = iter_daily_logs("workout", user_id, start, end, fields)
+    if format == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return ndjson_response(rows)
+    return {"start": start, "end": end, "fields": fields, "days": [row async for row in rows]}
+
 @router.get("/daily", response_model=DailyWorkoutLogResponse)
 async def get_daily_workout_log(
+    request: Request,
+    response: Response,
     target_date: Optional[date] = Query(None, description="Date to get logs for (defaults to today)"),
     user_id: str = Depends(get_current_user_id)
 ):
@@ -221,12 +280,18 @@ async def get_daily_workout_log(
 
     # Convert date to datetime for MongoDB compatibility
     log_datetime = datetime.combine(log_date, datetime.min.time())
+    query = {"user_id": user_id, "date": log_datetime}
+
+    # Conditional GET: check the version with a tiny projection before loading the log
+    if has_conditional(request):
+        head = await workout_logs_collection.find_one(query, {"_id": 1, "version": 1, "updated_at": 1})
+        etag = _daily_etag(log_date, head)
+        if etag_matches(request, etag):
+            return not_modified(etag)
 
     # Find daily log
-    daily_log = await workout_logs_collection.find_one({
-        "user_id": user_id,
-        "date": log_datetime
-    })
+    daily_log = await workout_logs_collection.find_one(query)
+    set_etag(response, _daily_etag(log_date, daily_log))
 
     if not daily_log:
         # Return empty log for the date
@@ -240,7 +305,7 @@ async def get_daily_workout_log(
             total_duration=0
         )
 
-        return DailyWorkoutLogResponse(
+        return model_response(DailyWorkoutLogResponse(
             id="",
             user_id=user_id,
             date=log_date,
@@ -251,9 +316,9 @@ async def get_daily_workout_log(
             total_duration=0,
             created_at=empty_log.created_at,
             updated_at=empty_log.updated_at
-        )
+        ), response=response)
 
-    return DailyWorkoutLogResponse(
+    return model_response(DailyWorkoutLogResponse(
         id=str(daily_log["_id"]),
         user_id=daily_log["user_id"],
         date=log_date,  # Return original date for API response
@@ -264,7 +329,7 @@ async def get_daily_workout_log(
         total_duration=daily_log["total_duration"],
         created_at=daily_log["created_at"],
         updated_at=daily_log["updated_at"]
-    )
+    ), response=response)
 
 @router.get("/streak", response_model=WorkoutStreak)
 async def get_workout_streak(user_id: str = Depends(get_current_user_id)):
@@ -353,12 +418,23 @@ async def delete_workout_log(
             daily_log["total_weight"] = total_weight
             daily_log["total_duration"] = total_duration
             daily_log["updated_at"] = removed_workout["logged_at"]
+            daily_log["version"] = daily_log.get("version", 0) + 1
 
             # Update in database
             await workout_logs_collection.replace_one(
                 {"_id": daily_log["_id"]},
                 daily_log
             )
+            log_date = daily_log["date"].date() if isinstance(daily_log["date"], datetime) else daily_log["date"]
+            await event_bus.publish(user_id, "workout_totals_changed", {
+                "log_id": str(daily_log["_id"]),
+                "date": log_date.isoformat(),
+                "total_sets": total_sets,
+                "total_reps": total_reps,
+                "total_weight": total_weight,
+                "total_duration": total_duration,
+                "workout_count": len(daily_log["workouts"])
+            })
 
             return {"message": "Workout log entry deleted successfully"}
         else:
@@ -20,6 +20,19 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    # "jose" (python-jose) or "pyjwt" (PyJWT, faster, HS256-compatible)
+    JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose")
+    # Verified-token cache: token digest -> (sub, exp)
+    TOKEN_CACHE_SIZE: int = 4096
+    TOKEN_CACHE_TTL_SECONDS: float = 300.0
+
+    # bcrypt runs in a dedicated pool so it never blocks the event loop
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # waiting calls beyond this get a 503
+
+    # User document cache (shared across requests, invalidated on profile update)
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_MAX_SIZE: int = 10000
     
     # Google Gemini
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
@@ -32,9 +45,117 @@ class Settings(BaseSettings):
         "http://127.0.0.1:5173"
     ]
     
+    # Live updates (SSE). "memory" fans out within one worker; "mongo" also
+    # relays events between workers through a capped collection.
+    EVENTS_BROKER: str = os.getenv("EVENTS_BROKER", "memory")
+    EVENTS_CAPPED_SIZE_BYTES: int = 16 * 1024 * 1024
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    # Lifetime of the stream-only tokens EventSource clients put in the URL
+    EVENTS_TOKEN_EXPIRE_SECONDS: int = int(os.getenv("EVENTS_TOKEN_EXPIRE_SECONDS", "60"))
+
+    # Plan text storage: "zstd" (dictionary-compressed), "zlib" or "none"
+    PLAN_COMPRESSION: str = os.getenv("PLAN_COMPRESSION", "zstd")
+    PLAN_ZSTD_LEVEL: int = 10
+    PLAN_DICT_SIZE: int = 16 * 1024
+
+    # Exercise catalog
+    EXERCISE_CATALOG_PATH: str = os.getenv(
+        "EXERCISE_CATALOG_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "exercises.json")
+    )
+
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000
+    # Comma-separated "event_or_logger=rate" pairs, e.g. "workout_logged=0.1"
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+    # Include full aggregation rows in debug logs (large; off by default)
+    LOG_DUMP_AGGREGATES: bool = os.getenv("LOG_DUMP_AGGREGATES", "false").lower() == "true"
+
+    # Metrics: if set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+    # Profiling (off by default; see app/core/profiling.py)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_PATHS: str = os.getenv("PROFILING_PATHS", "")  # comma-separated path prefixes for sampling
+    PROFILING_SECRET: str = os.getenv("PROFILING_SECRET", "")  # signs X-Debug-Profile headers
+    PROFILING_BUFFER_SIZE: int = 50
+
+    # Admin endpoints require "Authorization: Bearer <ADMIN_TOKEN>"; disabled when empty
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
+    # Vision model inference (see app/services/inference.py)
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "eager")  # eager | torchscript | onnx
+    INFERENCE_MODEL_DIR: str = os.getenv("INFERENCE_MODEL_DIR", "models")
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "0"))  # concurrent inference calls; 0 = cores // 4
+    INFERENCE_INTRA_OP_THREADS: int = int(os.getenv("INFERENCE_INTRA_OP_THREADS", "0"))  # 0 = cores // workers
+    INFERENCE_INTEROP_THREADS: int = int(os.getenv("INFERENCE_INTEROP_THREADS", "1"))
+    INFERENCE_MAX_QUEUE: int = int(os.getenv("INFERENCE_MAX_QUEUE", "16"))  # waiting calls beyond this get a 503
+    INFERENCE_RETRY_AFTER_SECONDS: int = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "2"))
+    VIT_QUANTIZATION: str = os.getenv("VIT_QUANTIZATION", "none")  # none | int8 (eager backend, CPU)
+
+    # Background jobs (see app/services/job_queue.py)
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "2"))  # concurrent jobs per API process; 0 disables
+    JOBS_LEASE_SECONDS: int = int(os.getenv("JOBS_LEASE_SECONDS", "60"))
+    JOBS_MAX_ATTEMPTS: int = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))
+    # Failed jobs wait JOBS_RETRY_BACKOFF_SECONDS * 2^(attempt-1), up to the max, before running again
+    JOBS_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOBS_RETRY_BACKOFF_SECONDS", "10"))
+    JOBS_RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("JOBS_RETRY_BACKOFF_MAX_SECONDS", "300"))
+    JOBS_MAX_ACTIVE_PER_USER: int = int(os.getenv("JOBS_MAX_ACTIVE_PER_USER", "2"))
+    JOBS_POLL_SECONDS: float = float(os.getenv("JOBS_POLL_SECONDS", "2"))
+    JOBS_RESULT_TTL_SECONDS: int = int(os.getenv("JOBS_RESULT_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Chat memory (see app/services/chat_memory.py)
+    CHAT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))  # summary + recent turns
+    CHAT_KEEP_TURNS: int = int(os.getenv("CHAT_KEEP_TURNS", "6"))  # turns kept verbatim when folding
+    CHAT_SUMMARY_MAX_TOKENS: int = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+    CHAT_SESSION_CACHE_SIZE: int = 5000
+    CHAT_SESSION_CACHE_TTL_SECONDS: float = 900.0
+    CHAT_SESSION_RETENTION_SECONDS: int = int(os.getenv("CHAT_SESSION_RETENTION_SECONDS", str(30 * 24 * 3600)))
+
+    # Semantic cache for chat answers (see app/services/semantic_cache.py)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    # "hashing" (deterministic, no model) or a sentence-transformers model name such as
+    # "sentence-transformers/all-MiniLM-L6-v2" (requires `pip install sentence-transformers`)
+    SEMANTIC_CACHE_EMBEDDER: str = os.getenv("SEMANTIC_CACHE_EMBEDDER", "hashing")
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))  # cosine similarity
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))  # per plan category
+    SEMANTIC_CACHE_TTL_SECONDS: float = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+    # LLM backends (see app/services/llm.py)
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "groq")  # groq | local
+    LLM_FALLBACK: str = os.getenv("LLM_FALLBACK", "none")  # none | local | groq
+    LLM_REMOTE_TIMEOUT_SECONDS: float = float(os.getenv("LLM_REMOTE_TIMEOUT_SECONDS", "60"))
+    LLM_LOCAL_MODEL: str = os.getenv("LLM_LOCAL_MODEL", "Qwen/Qwen2.5-1.5B-Instruct")
+    LLM_LOCAL_MAX_BATCH: int = int(os.getenv("LLM_LOCAL_MAX_BATCH", "8"))
+    LLM_LOCAL_BATCH_WAIT_MS: float = float(os.getenv("LLM_LOCAL_BATCH_WAIT_MS", "25"))
+    LLM_LOCAL_MAX_INPUT_TOKENS: int = int(os.getenv("LLM_LOCAL_MAX_INPUT_TOKENS", "2048"))
+    # max_new_tokens caps per request tier on the local backend
+    LLM_LOCAL_MAX_NEW_TOKENS_PLAN: int = int(os.getenv("LLM_LOCAL_MAX_NEW_TOKENS_PLAN", "768"))
+    LLM_LOCAL_MAX_NEW_TOKENS_CHAT: int = int(os.getenv("LLM_LOCAL_MAX_NEW_TOKENS_CHAT", "256"))
+    LLM_LOCAL_MAX_NEW_TOKENS_SUMMARY: int = int(os.getenv("LLM_LOCAL_MAX_NEW_TOKENS_SUMMARY", "200"))
+    # Circuit breaker in front of the primary backend when a fallback is set
+    LLM_BREAKER_WINDOW: int = int(os.getenv("LLM_BREAKER_WINDOW", "20"))  # most recent calls considered
+    LLM_BREAKER_MIN_CALLS: int = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+    LLM_BREAKER_ERROR_RATE: float = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+    LLM_BREAKER_LATENCY_SECONDS: float = float(os.getenv("LLM_BREAKER_LATENCY_SECONDS", "20"))  # median
+    LLM_BREAKER_COOLDOWN_SECONDS: float = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+    # Food and workout log range reads (see app/services/log_ranges.py)
+    LOG_RANGE_MAX_DAYS: int = int(os.getenv("LOG_RANGE_MAX_DAYS", "366"))
+    LOG_RANGE_BATCH_SIZE: int = 100
+
+    # Account data export (see app/services/data_export.py)
+    EXPORT_BATCH_SIZE: int = 500  # Mongo cursor batch
+    EXPORT_CHUNK_BYTES: int = 64 * 1024  # response chunk size
+    EXPORT_MAX_CONCURRENT: int = int(os.getenv("EXPORT_MAX_CONCURRENT", "4"))  # per process; more get a 503
+
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_IMAGE_PIXELS: int = int(os.getenv("MAX_IMAGE_PIXELS", str(40_000_000)))  # width x height, checked from the header
     
     # Nutrition API (Optional - for Edamam)
     EDAMAM_APP_ID: str = os.getenv("EDAMAM_APP_ID", "")
@@ -0,0 +1,175 @@
+"""Queue-backed structured logging.
+
+Handlers in request paths only build a LogRecord and push it onto a bounded
+in-memory queue; a background listener thread formats and writes it. When
+the queue is full the record is dropped and counted instead of blocking.
+
+Usage:
+
+    from app.core.log import get_logger
+    logger = get_logger(__name__)
+    logger.info("workout_logged", extra={"user_id": user_id, "exercise": name})
+
+Per-event sampling (LOG_SAMPLE_RATES="workout_logged=0.1,app.api.routes.food=0.5")
+applies to records below WARNING; keys match the message/event name or a
+logger name prefix.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else came in through `extra`.
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+log_stats = {"dropped": 0}
+_stats_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the record's `extra` fields inlined."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable format for local development (LOG_FORMAT=text)."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = {k: v for k, v in record.__dict__.items() if k not in _RESERVED}
+        if extras:
+            line += " " + " ".join(f"{k}={v}" for k, v in extras.items())
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a configured fraction of low-severity records per event or logger."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def _rate(self, record: logging.LogRecord) -> float:
+        if not self.rates:
+            return 1.0
+        if isinstance(record.msg, str) and record.msg in self.rates:
+            return self.rates[record.msg]
+        name = record.name
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: full queue means the record is dropped."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with _stats_lock:
+                log_stats["dropped"] += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve what cannot cross threads safely (args, tracebacks);
+        # JSON formatting happens on the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Shutdown may block until the writer drains a full queue.
+        self.queue.put(self._sentinel)
+
+
+def parse_sample_rates(raw: str) -> Dict[str, float]:
+    rates = {}
+    for item in raw.split(","):
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            continue
+        try:
+            rates[key.strip()] = max(0.0, min(1.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+def setup_logging() -> None:
+    """Route the root logger through the queue. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(TextFormatter() if settings.LOG_FORMAT == "text" else JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(parse_sample_rates(settings.LOG_SAMPLE_RATES)))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # Let uvicorn's loggers share the same pipeline instead of writing directly.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uv = logging.getLogger(name)
+        uv.handlers = []
+        uv.propagate = True
+
+    _listener = _Listener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
@@ -0,0 +1,268 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Dependency-free on purpose: counters and histograms are plain dicts keyed by
+label values, so everything can be exercised offline and scraped from
+/metrics without a Prometheus client library.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_REGISTRY: List["_Metric"] = []
+# Callables returning (name, type, help, [(labels, value), ...]) for values
+# that live elsewhere (cache counters, pool stats) and are read at scrape time.
+_COLLECTORS: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(k))} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(k))} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+def register_collector(fn: Callable) -> None:
+    _COLLECTORS.append(fn)
+
+
+def render() -> str:
+    """Render every metric and collector in the Prometheus text format."""
+    lines = []
+    for metric in _REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render())
+    for collector in _COLLECTORS:
+        for name, kind, help, samples in collector():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+# ── Application metrics ────────────────────────────────────────────────
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+MONGO_OP_SECONDS = Histogram(
+    "mongo_operation_duration_seconds", "MongoDB operation latency", ("collection", "operation"))
+MONGO_OP_ERRORS = Counter(
+    "mongo_operation_errors_total", "MongoDB operations that raised", ("collection", "operation"))
+
+IMAGE_PREPROCESS_SECONDS = Histogram(
+    "image_preprocess_duration_seconds", "Upload decode and tensor preparation for the vision models")
+INFERENCE_SECONDS = Histogram(
+    "model_inference_duration_seconds", "Model forward latency", ("model", "backend"))
+INFERENCE_BATCH_SIZE = Histogram(
+    "model_inference_batch_size", "Images per inference call", ("model",), buckets=(1, 2, 4, 8, 16, 32, 64))
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds", "LLM call latency", ("provider", "outcome"),
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0))
+LLM_TOKENS_TOTAL = Counter("llm_tokens_total", "LLM tokens reported by the provider", ("provider", "kind"))
+
+
+def observe_mongo(collection: str, operation: str, seconds: float, error: bool = False) -> None:
+    MONGO_OP_SECONDS.observe(seconds, collection=collection, operation=operation)
+    if error:
+        MONGO_OP_ERRORS.inc(collection=collection, operation=operation)
+
+
+def _collect_caches():
+    from app.core.cache import CACHES
+
+    stats = {name: cache.stats() for name, cache in CACHES.items()}
+    yield ("cache_hits_total", "counter", "In-process cache hits",
+           [({"cache": n}, s["hits"]) for n, s in stats.items()])
+    yield ("cache_misses_total", "counter", "In-process cache misses",
+           [({"cache": n}, s["misses"]) for n, s in stats.items()])
+    yield ("cache_hit_ratio", "gauge", "In-process cache hit ratio since start",
+           [({"cache": n}, s["hit_ratio"]) for n, s in stats.items()])
+    yield ("cache_entries", "gauge", "Entries currently held by the cache",
+           [({"cache": n}, s["size"]) for n, s in stats.items()])
+
+
+def _collect_runtime():
+    from app.core.log import log_stats
+    from app.core.security import password_pool_stats
+
+    stats = dict(password_pool_stats)
+    yield ("password_hash_calls_total", "counter", "bcrypt calls run in the password pool",
+           [({}, stats["calls"])])
+    yield ("password_hash_rejected_total", "counter", "bcrypt calls rejected because the pool queue was full",
+           [({}, stats["rejected"])])
+    yield ("password_hash_wait_seconds_total", "counter", "Time bcrypt calls spent queued for the pool",
+           [({}, stats["wait_seconds_total"])])
+    yield ("log_records_dropped_total", "counter", "Log records dropped because the log queue was full",
+           [({}, log_stats["dropped"])])
+
+
+register_collector(_collect_caches)
+register_collector(_collect_runtime)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route template.
+
+    The route template (e.g. /api/plans/{plan_id}) is read from the scope
+    after routing, so path parameters don't explode label cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template: Optional[str] = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, route=template)
+            HTTP_REQUESTS_TOTAL.inc(method=method, route=template, status=str(status_code))
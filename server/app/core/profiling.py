@@ -0,0 +1,196 @@
+"""Opt-in per-request profiling.
+
+With PROFILING_ENABLED=true, ProfilingMiddleware profiles a sampled fraction
+of requests (PROFILING_SAMPLE_RATE, optionally limited to PROFILING_PATHS)
+and any request carrying a valid signed X-Debug-Profile header. Each result
+holds the profiler report plus every Mongo call made by the request and is
+kept in a bounded in-memory ring buffer served by /api/admin/profiles.
+
+When profiling is disabled the middleware is not installed at all; the only
+remaining cost is a ContextVar lookup per Mongo call.
+
+Issue a debug header value (valid for 10 minutes):
+
+    python -m app.core.profiling sign 600
+"""
+import cProfile
+import contextvars
+import hashlib
+import hmac
+import io
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+try:
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:
+    _Pyinstrument = None
+
+DEBUG_HEADER = b"x-debug-profile"
+
+# Mongo calls of the request being profiled, if any
+_current_calls: contextvars.ContextVar[Optional[List[dict]]] = contextvars.ContextVar("profile_calls", default=None)
+
+PROFILES: Deque[dict] = deque(maxlen=settings.PROFILING_BUFFER_SIZE)
+
+# cProfile hooks the whole thread, so only one request can use it at a time
+_cprofile_lock = threading.Lock()
+
+
+def record_mongo_call(collection: str, operation: str, seconds: float) -> None:
+    calls = _current_calls.get()
+    if calls is not None:
+        calls.append({
+            "collection": collection,
+            "operation": operation,
+            "ms": round(seconds * 1000, 3),
+            "at": time.perf_counter(),
+        })
+
+
+def sign_debug_token(ttl_seconds: int = 600) -> str:
+    """Return an X-Debug-Profile header value valid for `ttl_seconds`."""
+    expires = str(int(time.time()) + ttl_seconds)
+    digest = hmac.new(settings.PROFILING_SECRET.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+
+
+def verify_debug_token(token: str) -> bool:
+    if not settings.PROFILING_SECRET:
+        return False
+    expires, _, digest = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(settings.PROFILING_SECRET.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+class _Session:
+    """One running profiler; pyinstrument when installed, cProfile otherwise."""
+
+    def __init__(self):
+        self.kind = None
+        self._profiler = None
+
+    def start(self) -> bool:
+        if _Pyinstrument is not None:
+            # async_mode follows the request's task across awaits
+            self._profiler = _Pyinstrument(async_mode="enabled")
+            self._profiler.start()
+            self.kind = "pyinstrument"
+            return True
+        if not _cprofile_lock.acquire(blocking=False):
+            return False
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        self.kind = "cprofile"
+        return True
+
+    def stop(self) -> str:
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_html()
+        self._profiler.disable()
+        _cprofile_lock.release()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(80)
+        return out.getvalue()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.paths = [p.strip() for p in settings.PROFILING_PATHS.split(",") if p.strip()]
+
+    def _trigger(self, scope) -> Optional[str]:
+        token = _header(scope, DEBUG_HEADER)
+        if token is not None and verify_debug_token(token):
+            return "header"
+        if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            if not self.paths or any(scope["path"].startswith(p) for p in self.paths):
+                return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = _Session()
+        if not session.start():
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        calls: List[dict] = []
+        token = _current_calls.set(calls)
+        status_code = 500
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            _current_calls.reset(token)
+            report = session.stop()
+            for call in calls:
+                call["offset_ms"] = round((call.pop("at") - start) * 1000, 3)
+            PROFILES.append({
+                "id": profile_id,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status": status_code,
+                "trigger": trigger,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round(duration * 1000, 3),
+                "mongo_calls": calls,
+                "mongo_ms": round(sum(c["ms"] for c in calls), 3),
+                "profiler": session.kind,
+                "report": report,
+            })
+
+
+def list_profiles() -> List[Dict]:
+    return [{k: v for k, v in p.items() if k not in ("report", "mongo_calls")} for p in reversed(PROFILES)]
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    for profile in PROFILES:
+        if profile["id"] == profile_id:
+            return profile
+    return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "sign":
+        if not settings.PROFILING_SECRET:
+            sys.exit("PROFILING_SECRET is not set")
+        print(sign_debug_token(int(sys.argv[2]) if len(sys.argv) > 2 else 600))
+    else:
+        print("usage: python -m app.core.profiling sign [ttl_seconds]")
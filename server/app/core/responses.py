@@ -0,0 +1,68 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, AsyncIterable, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively (datetime/date/UUID are native)."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    """orjson with the fallbacks above (ObjectId, models, Decimal, sets)."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed JSON response, used as the application default."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+@lru_cache(maxsize=64)
+def _adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def model_response(content: Any, tp: Any = None, response: Optional[Response] = None) -> Response:
+    """Serialize already-built pydantic models straight to JSON bytes.
+
+    Returning a Response skips FastAPI's response_model re-validation and
+    jsonable_encoder pass; pydantic-core writes the JSON directly. Pass `tp`
+    (e.g. List[PlanResponse]) for containers of models, and the injected
+    `response` to carry over headers such as ETag.
+    """
+    body = _adapter(tp if tp is not None else type(content)).dump_json(content)
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_response(rows: AsyncIterable[Any], headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream `rows` as newline-delimited JSON, one orjson-encoded row per line."""
+    async def body():
+        async for row in rows:
+            yield dumps_json(row) + b"\n"
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
@@ -1,14 +1,28 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 import bcrypt
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
+try:
+    import jwt as pyjwt  # PyJWT, optional faster backend
+except ImportError:
+    pyjwt = None
+
 security = HTTPBearer()
 
+# Recently verified tokens: sha256(token) -> (sub, exp)
+_token_cache = TTLCache("tokens", maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
     return bcrypt.checkpw(
@@ -23,6 +37,61 @@ def get_password_hash(password: str) -> str:
         bcrypt.gensalt()
     ).decode("utf-8")
 
+# bcrypt releases the GIL, so a small thread pool is enough to keep hashing
+# off the event loop without oversubscribing the CPU.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+_password_lock = threading.Lock()
+_password_pending = 0
+
+# Simple counters, read by the metrics endpoint and benchmarks.
+password_pool_stats = {
+    "calls": 0,
+    "rejected": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+async def _run_in_password_pool(fn, *args):
+    """Run a bcrypt call in the bounded pool, rejecting work when the queue is full."""
+    global _password_pending
+    with _password_lock:
+        if _password_pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+            password_pool_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests, please retry",
+                headers={"Retry-After": "1"},
+            )
+        _password_pending += 1
+
+    submitted = time.perf_counter()
+
+    def _job():
+        waited = time.perf_counter() - submitted
+        with _password_lock:
+            password_pool_stats["calls"] += 1
+            password_pool_stats["wait_seconds_total"] += waited
+            password_pool_stats["wait_seconds_max"] = max(password_pool_stats["wait_seconds_max"], waited)
+        return fn(*args)
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_executor, _job)
+    finally:
+        with _password_lock:
+            _password_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await _run_in_password_pool(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -34,28 +103,65 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 def decode_token(token: str) -> dict:
     """Decode a JWT token."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
+        if settings.JWT_BACKEND == "pyjwt" and pyjwt is not None:
+            return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
+    except Exception as e:
+        if pyjwt is not None and isinstance(e, pyjwt.PyJWTError):
+            raise _credentials_exception()
+        raise
+
+def create_scoped_token(user_id: str, scope: str, expires_delta: timedelta) -> str:
+    """Short-lived token that only authenticates endpoints requiring `scope`."""
+    return create_access_token({"sub": user_id, "scope": scope}, expires_delta)
+
+def verify_token(token: str, scope: Optional[str] = None) -> Tuple[str, Optional[float]]:
+    """Return (sub, exp) for a token, reusing a cached verification when possible.
+
+    Login tokens carry no scope; a token is only accepted where its scope
+    matches `scope`, so scoped tokens can't be used as login tokens or vice versa.
+    Cached entries never outlive the token's own `exp` claim.
+    """
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _token_cache.get(digest)
+    if cached is not None:
+        sub, exp, token_scope = cached
+        if exp is None or exp > time.time():
+            if token_scope != scope:
+                raise _credentials_exception()
+            return sub, exp
+        _token_cache.pop(digest)
+
+    payload = decode_token(token)
+    sub = payload.get("sub")
+    if sub is None:
+        raise _credentials_exception()
+    exp = payload.get("exp")
+    exp = float(exp) if exp is not None else None
+    token_scope = payload.get("scope")
+
+    deadline = None
+    if exp is not None:
+        deadline = time.monotonic() + (exp - time.time())
+    _token_cache.set(digest, (sub, exp, token_scope), expires_at=deadline)
+    if token_scope != scope:
+        raise _credentials_exception()
+    return sub, exp
 
 async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Get current user ID from token."""
-    token = credentials.credentials
-    payload = decode_token(token)
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user_id, _ = verify_token(credentials.credentials)
     return user_id
 
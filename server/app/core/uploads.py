@@ -0,0 +1,149 @@
+"""Bounded image uploads.
+
+Two layers keep a large or hostile upload from exhausting a worker:
+
+- UploadLimitMiddleware rejects multipart bodies over MAX_UPLOAD_SIZE with
+  413 while they stream in, before the form parser spools them anywhere
+  (Content-Length is checked up front, chunked bodies are counted as they
+  arrive).
+- read_image_upload() reads the file part chunk by chunk under the same cap,
+  sniffs the magic bytes of the first chunk, and reads the image dimensions
+  from the header (PIL's lazy open, no pixel decode) so decompression bombs
+  are rejected before anything is decoded.
+"""
+import json
+from io import BytesIO
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile, status
+
+from app.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+# Multipart boundaries and the other form fields of /generate-plan
+FORM_OVERHEAD = 64 * 1024
+
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+)
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """Return the PIL format name for the leading bytes of an image, or None."""
+    for signature, fmt in _SIGNATURES:
+        if head.startswith(signature):
+            return fmt
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the {settings.MAX_UPLOAD_SIZE // (1024 * 1024)} MB upload limit"
+    )
+
+
+def check_image_header(data: bytes, expected_format: str) -> tuple:
+    """Parse the header only and enforce MAX_IMAGE_PIXELS; returns (width, height)."""
+    from PIL import Image
+
+    try:
+        with Image.open(BytesIO(data)) as image:
+            fmt, (width, height) = image.format, image.size
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is not a valid image")
+    if fmt != expected_format:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is not a valid image")
+    if width * height > settings.MAX_IMAGE_PIXELS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image dimensions {width}x{height} exceed the {settings.MAX_IMAGE_PIXELS} pixel limit"
+        )
+    return width, height
+
+
+async def read_image_upload(file: UploadFile, max_bytes: Optional[int] = None) -> bytes:
+    """Read an image upload with the size cap, type sniffing and dimension checks applied."""
+    max_bytes = max_bytes or settings.MAX_UPLOAD_SIZE
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be an image"
+        )
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large()
+
+    buffer = bytearray()
+    fmt = None
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        if fmt is None:
+            fmt = sniff_image_format(chunk)
+            if fmt is None:
+                raise HTTPException(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    detail="Unsupported image type (JPEG, PNG, WebP or GIF expected)"
+                )
+        if len(buffer) + len(chunk) > max_bytes:
+            raise _too_large()
+        buffer += chunk
+
+    if fmt is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+    data = bytes(buffer)
+    check_image_header(data, fmt)
+    return data
+
+
+class UploadLimitMiddleware:
+    """Reject multipart request bodies larger than MAX_UPLOAD_SIZE while they stream in."""
+
+    def __init__(self, app, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = (max_bytes or settings.MAX_UPLOAD_SIZE) + FORM_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            # Raised inside the form parser; FastAPI passes HTTPExceptions
+            # through, so the client gets the 413 instead of a parse error.
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": _too_large().detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,125 @@
+"""Thin Motor wrappers that time every operation by collection and name.
+
+get_database() hands out an InstrumentedDatabase; collections and cursors
+obtained from it report to app.core.metrics, and to the request profile
+when one is being captured. Anything not wrapped here is delegated to the
+underlying Motor object unchanged.
+"""
+import time
+
+from app.core.metrics import observe_mongo
+from app.core.profiling import record_mongo_call
+
+
+def _observe(collection: str, operation: str, seconds: float, error: bool = False) -> None:
+    observe_mongo(collection, operation, seconds, error)
+    record_mongo_call(collection, operation, seconds)
+
+
+# Collection coroutines that are timed directly
+_TIMED_METHODS = frozenset({
+    "find_one", "insert_one", "insert_many", "update_one", "update_many",
+    "replace_one", "delete_one", "delete_many", "count_documents",
+    "estimated_document_count", "find_one_and_update", "find_one_and_replace",
+    "find_one_and_delete", "bulk_write", "distinct", "create_index",
+})
+# Collection methods that return a cursor
+_CURSOR_METHODS = frozenset({"find", "aggregate"})
+
+
+class InstrumentedCursor:
+    """Wraps a Motor cursor; time spent awaiting results is recorded once the cursor is drained."""
+
+    def __init__(self, cursor, collection: str, operation: str):
+        self._cursor = cursor
+        self._collection = collection
+        self._operation = operation
+        self._elapsed = 0.0
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # Builder methods (sort, limit, skip, ...) return the cursor itself
+            return self if result is self._cursor else result
+        return call
+
+    async def to_list(self, length=None):
+        start = time.perf_counter()
+        error = False
+        try:
+            return await self._cursor.to_list(length=length)
+        except Exception:
+            error = True
+            raise
+        finally:
+            _observe(self._collection, self._operation, time.perf_counter() - start, error)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        start = time.perf_counter()
+        try:
+            doc = await self._cursor.__anext__()
+        except StopAsyncIteration:
+            self._elapsed += time.perf_counter() - start
+            _observe(self._collection, self._operation, self._elapsed)
+            self._elapsed = 0.0
+            raise
+        except Exception:
+            self._elapsed += time.perf_counter() - start
+            _observe(self._collection, self._operation, self._elapsed, error=True)
+            self._elapsed = 0.0
+            raise
+        self._elapsed += time.perf_counter() - start
+        return doc
+
+
+class InstrumentedCollection:
+    def __init__(self, collection):
+        self._collection = collection
+        self._name = collection.name
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name in _CURSOR_METHODS:
+            def cursor_call(*args, **kwargs):
+                return InstrumentedCursor(attr(*args, **kwargs), self._name, name)
+            return cursor_call
+        if name in _TIMED_METHODS:
+            async def timed_call(*args, **kwargs):
+                start = time.perf_counter()
+                error = False
+                try:
+                    return await attr(*args, **kwargs)
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    _observe(self._name, name, time.perf_counter() - start, error)
+            return timed_call
+        return attr
+
+
+class InstrumentedDatabase:
+    def __init__(self, database):
+        self._database = database
+        self._collections = {}
+
+    def __getitem__(self, name: str) -> InstrumentedCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = InstrumentedCollection(self._database[name])
+        return collection
+
+    def get_collection(self, name: str, **kwargs):
+        if kwargs:
+            return InstrumentedCollection(self._database.get_collection(name, **kwargs))
+        return self[name]
+
+    def __getattr__(self, name):
+        return getattr(self._database, name)
@@ -1,5 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.log import get_logger
+from app.db.instrumented import InstrumentedDatabase
+
+logger = get_logger(__name__)
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -9,16 +13,49 @@ db = Database()
 
 async def connect_to_mongo():
     """Connect to MongoDB."""
-    print("Connecting to MongoDB...")
+    logger.info("Connecting to MongoDB...")
     db.client = AsyncIOMotorClient(settings.MONGODB_URL)
-    db.db = db.client[settings.MONGODB_DB_NAME]
-    print("Connected to MongoDB successfully")
+    db.db = InstrumentedDatabase(db.client[settings.MONGODB_DB_NAME])
+    logger.info("Connected to MongoDB successfully")
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.warning("could not create indexes", extra={"error": str(e)})
+
+async def ensure_indexes():
+    """Create the indexes used by hot queries (idempotent)."""
+    await db.db["plans"].create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+
+    # Daily logs: per-day lookups and date-range reads (app/services/log_ranges.py)
+    await db.db["food_logs"].create_index([("user_id", 1), ("date", 1)])
+    await db.db["workout_logs"].create_index([("user_id", 1), ("date", 1)])
+
+    # Job queue (app/services/job_queue.py): claim order (skipping backed-off
+    # retries), lease expiry, per-user listing, one active job per input hash,
+    # per-user active slots, and expiry of finished jobs.
+    jobs = db.db["jobs"]
+    await jobs.create_index([("status", 1), ("created_at", 1), ("not_before", 1)])
+    await jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+    await jobs.create_index([("user_id", 1), ("created_at", -1)])
+    await jobs.create_index(
+        [("user_id", 1), ("active_key", 1)], unique=True,
+        partialFilterExpression={"active_key": {"$exists": True}},
+    )
+    await jobs.create_index(
+        [("user_id", 1), ("active_slot", 1)], unique=True,
+        partialFilterExpression={"active_slot": {"$exists": True}},
+    )
+    await jobs.create_index("finished_at", expireAfterSeconds=settings.JOBS_RESULT_TTL_SECONDS)
+
+    # Chat sessions are dropped after a period of inactivity
+    await db.db["chat_sessions"].create_index(
+        "updated_at", expireAfterSeconds=settings.CHAT_SESSION_RETENTION_SECONDS)
 
 async def close_mongo_connection():
     """Close MongoDB connection."""
-    print("Closing MongoDB connection...")
+    logger.info("Closing MongoDB connection...")
     db.client.close()
-    print("MongoDB connection closed")
+    logger.info("MongoDB connection closed")
 
 def get_database():
     """Get database instance."""
@@ -79,6 +79,8 @@ class DailyFoodLog(BaseModel):
     }
     # Track daily water intake (milliliters)
     water_ml: float = 0.0
+    # Bumped on every write; used for ETags
+    version: int = 0
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
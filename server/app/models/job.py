@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    attempts: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "JobResponse":
+        return cls(
+            id=str(doc["_id"]),
+            kind=doc["kind"],
+            status=doc["status"],
+            attempts=doc.get("attempts", 0),
+            result=doc.get("result"),
+            error=doc.get("error"),
+            created_at=doc["created_at"],
+            updated_at=doc.get("updated_at", doc["created_at"]),
+            finished_at=doc.get("finished_at"),
+        )
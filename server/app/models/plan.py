@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List
+from datetime import date, datetime
 from bson import ObjectId
 
 class PyObjectId(ObjectId):
@@ -45,6 +45,37 @@ class PlanResponse(BaseModel):
     plan_text: str
     created_at: datetime
 
+class PlanSummary(BaseModel):
+    """Plan list entry without the full plan_text."""
+    id: str
+    classifier_label: str
+    goal: Optional[str] = None
+    preview: str
+    plan_length: int
+    created_at: datetime
+
+class PlanSummaryPage(BaseModel):
+    items: List[PlanSummary]
+    next_cursor: Optional[str] = None
+
+class PlanSections(BaseModel):
+    """Plan text parsed into sections (see app.services.plan_parser)."""
+    plan_id: str
+    snapshot: List[str] = []
+    targets: Dict[str, str] = {}
+    meals: Dict[str, Dict[str, str]] = {}
+    workouts: Dict[str, Dict[str, str]] = {}
+    tips: List[str] = []
+    variations: Dict[str, str] = {}
+
+class PlanDaySection(BaseModel):
+    """One day of a plan's meals or workouts; `items` is empty if the plan has nothing for that day."""
+    plan_id: str
+    date: date
+    day: str
+    targets: Dict[str, str] = {}
+    items: Dict[str, str] = {}
+
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
     content: str
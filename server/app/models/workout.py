@@ -62,6 +62,8 @@ class DailyWorkoutLog(BaseModel):
     total_reps: int = 0
     total_weight: float = 0.0
     total_duration: int = 0  # in seconds
+    # Bumped on every write; used for ETags
+    version: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
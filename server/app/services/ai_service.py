@@ -1,16 +1,22 @@
-from PIL import Image
-from io import BytesIO
 import torch
 import torch.nn as nn
 from transformers.models.resnet import ResNetForImageClassification
 from transformers import AutoImageProcessor, ViTImageProcessor, ViTModel, ViTConfig
 from huggingface_hub import hf_hub_download
 from app.core.config import settings
-from typing import Dict, Any, Optional
+from app.services.image_pipeline import prepare_image
+from app.services.inference import get_backend, run_inference
+from app.services.job_queue import register_handler
+from app.services.llm import get_llm
+from app.services.chat_memory import build_messages, get_plan_context, load_session, record_exchange
+from app.services.semantic_cache import asks_about_plan, get_semantic_cache, is_standalone, plan_scope, scope_context
+from app.core.log import get_logger
+from app.core.metrics import IMAGE_PREPROCESS_SECONDS, INFERENCE_SECONDS, INFERENCE_BATCH_SIZE
+from typing import Dict, Any, List, Optional
 import asyncio
 from functools import lru_cache
-import os
-import requests
+
+logger = get_logger(__name__)
 
 # Label mapping
 LABEL_MAP = {
@@ -22,14 +28,15 @@ LABEL_MAP = {
     5: "Skinny Fat"
 }
 
-# Groq API settings
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+@lru_cache(maxsize=1)
+def load_image_processor():
+    """Load and cache the preprocessing config of the image classifier."""
+    return AutoImageProcessor.from_pretrained('glazzova/body_complexion')
 
 @lru_cache(maxsize=1)
 def load_image_model():
     """Load and cache the image classification model."""
-    processor = AutoImageProcessor.from_pretrained('glazzova/body_complexion')
+    processor = load_image_processor()
     model = ResNetForImageClassification.from_pretrained('glazzova/body_complexion')
     model.eval()
     return processor, model
@@ -83,10 +90,9 @@ class ViTRegression(nn.Module):
         weight = self.weight_head(features)
         return {"height": height, "weight": weight}
 
-@lru_cache(maxsize=1)
-def load_vit_model():
-    """Download and cache the finetuned ViT model for height/weight prediction."""
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+def build_vit_model(device: Optional[torch.device] = None):
+    """Download the finetuned ViT checkpoint and build the fp32 regressor (uncached)."""
+    device = device or torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model_path = hf_hub_download(repo_id=VIT_MODEL_ID, filename="best_model.pt")
     
     # Load checkpoint
@@ -103,48 +109,93 @@ def load_vit_model():
     model.load_state_dict(new_state_dict, strict=False) # strict=False to allow for minor misses like pooler
     model.to(device)
     model.eval()
-        
-    processor = ViTImageProcessor.from_pretrained("google/vit-base-patch16-224")
+    return model, dataset_stats, device
+
+def quantize_int8(model: nn.Module) -> nn.Module:
+    """Dynamic INT8 quantization of every Linear layer (weights int8, activations quantized per call)."""
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+@lru_cache(maxsize=1)
+def load_vit_model():
+    """Download and cache the finetuned ViT model for height/weight prediction.
+
+    With VIT_QUANTIZATION=int8 on CPU only the quantized copy is kept.
+    """
+    model, dataset_stats, device = build_vit_model()
+    if settings.VIT_QUANTIZATION == "int8":
+        if device.type == "cpu":
+            model = quantize_int8(model)
+        else:
+            logger.warning("vit_quantization_skipped", extra={"reason": "dynamic quantization is CPU-only"})
+    processor = load_vit_processor()
     return model, processor, dataset_stats, device
 
+@lru_cache(maxsize=1)
+def load_vit_processor():
+    """Load and cache the preprocessing config of the ViT regressor."""
+    return ViTImageProcessor.from_pretrained("google/vit-base-patch16-224")
+
+def _prepare(image_bytes: bytes, classifier: bool = True, regressor: bool = True):
+    """Decode once and build inputs only for the models that will run."""
+    with IMAGE_PREPROCESS_SECONDS.time():
+        return prepare_image(
+            image_bytes,
+            classifier_processor=load_image_processor() if classifier else None,
+            regressor_processor=load_vit_processor() if regressor else None,
+        )
+
+def _regress(backend, pixel_values) -> dict:
+    dataset_stats = backend.dataset_stats()
+    with INFERENCE_SECONDS.time(model="vit_regressor", backend=backend.name):
+        height, weight = backend.regress(pixel_values)
+    INFERENCE_BATCH_SIZE.observe(pixel_values.shape[0], model="vit_regressor")
+
+    height_norm = height.item()
+    weight_norm = weight.item()
+
+    height_cm = height_norm * dataset_stats.get("height_std", 1.0) + dataset_stats.get("height_mean", 0.0)
+    weight_kg = weight_norm * dataset_stats.get("weight_std", 1.0) + dataset_stats.get("weight_mean", 0.0)
+
+    return {
+        "height_cm": round(height_cm, 1),
+        "weight_kg": round(weight_kg, 1),
+    }
+
+def _classify(backend, pixel_values) -> str:
+    with INFERENCE_SECONDS.time(model="body_classifier", backend=backend.name):
+        logits = backend.classify(pixel_values)
+    INFERENCE_BATCH_SIZE.observe(pixel_values.shape[0], model="body_classifier")
+    label_id = int(logits.argmax(-1).item())
+    return LABEL_MAP.get(label_id, "Unknown")
+
 async def predict_height_weight(image_bytes: bytes) -> dict:
     """Predict height (cm) and weight (kg) from an image using the finetuned ViT model."""
     def _predict():
-        model, processor, dataset_stats, device = load_vit_model()
-        
-        image = Image.open(BytesIO(image_bytes)).convert("RGB")
-        inputs = processor(images=image, return_tensors="pt").to(device)
-        with torch.no_grad():
-            outputs = model(inputs["pixel_values"])
-            
-        height_norm = outputs["height"].item()
-        weight_norm = outputs["weight"].item()
-            
-        height_cm = height_norm * dataset_stats.get("height_std", 1.0) + dataset_stats.get("height_mean", 0.0)
-        weight_kg = weight_norm * dataset_stats.get("weight_std", 1.0) + dataset_stats.get("weight_mean", 0.0)
-        
-        return {
-            "height_cm": round(height_cm, 1),
-            "weight_kg": round(weight_kg, 1),
-        }
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _predict)
+        prepared = _prepare(image_bytes, classifier=False)
+        return _regress(get_backend(), prepared.regressor_input)
+
+    return await run_inference(_predict)
 
 # ── Body-type classifier ───────────────────────────────────────────────
 async def classify_body_image(image_bytes: bytes) -> str:
     """Classify body type from image bytes."""
-    def _classify():
-        image = Image.open(BytesIO(image_bytes)).convert("RGB")
-        processor, model = load_image_model()
-        inputs = processor(image, return_tensors="pt")
-        with torch.no_grad():
-            logits = model(**inputs).logits
-            label_id = int(logits.argmax(-1).item())
-            label = LABEL_MAP.get(label_id, "Unknown")
-        return label
+    def _run():
+        prepared = _prepare(image_bytes, regressor=False)
+        return _classify(get_backend(), prepared.classifier_input)
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _classify)
+    return await run_inference(_run)
+
+async def analyze_image(image_bytes: bytes) -> dict:
+    """Body-type label plus height/weight estimate from a single decode of the upload."""
+    def _analyze():
+        prepared = _prepare(image_bytes)
+        backend = get_backend()
+        return {
+            "classifier_label": _classify(backend, prepared.classifier_input),
+            **_regress(backend, prepared.regressor_input),
+        }
+
+    return await run_inference(_analyze)
 
 def compute_bmi(weight_kg: float, height_cm: float) -> Optional[float]:
     h_m = height_cm / 100.0
@@ -310,27 +361,17 @@ Give **day-wise workouts** with clarity and motivation.
 """.strip()
     return prompt
 
+async def chat_completion(messages: List[Dict[str, str]], max_tokens: Optional[int] = None,
+                          tier: str = "chat") -> str:
+    """Run a chat completion on the configured LLM backend (see app.services.llm)."""
+    return await get_llm().complete(messages, max_tokens=max_tokens, tier=tier)
+
 async def generate_with_groq(prompt: str) -> str:
     """Generate text using Groq API."""
-    def _generate():
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": "openai/gpt-oss-20b",  # Example Groq model
-            "messages": [
-                {"role": "system", "content": "You are a helpful nutrition and fitness coach."},
-                {"role": "user", "content": prompt}
-            ]
-        }
-        response = requests.post(GROQ_API_URL, headers=headers, json=data)
-        response.raise_for_status()
-        res_json = response.json()
-        return res_json["choices"][0]["message"]["content"]
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, _generate)
+    return await chat_completion([
+        {"role": "system", "content": "You are a helpful nutrition and fitness coach."},
+        {"role": "user", "content": prompt}
+    ], tier="plan")
 
 async def generate_personalized_plan(user_inputs: Dict[str, Any], classifier_label: str) -> str:
     """Generate personalized fitness plan using Groq API."""
@@ -338,32 +379,65 @@ async def generate_personalized_plan(user_inputs: Dict[str, Any], classifier_lab
     plan_text = await generate_with_groq(prompt)
     return plan_text
 
+async def _generate_plan_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler behind POST /api/ai/generate-plan/jobs."""
+    classifier_label = await classify_body_image(payload["image"])
+    plan_text = await generate_personalized_plan(payload["user_inputs"], classifier_label)
+    return {"classifier_label": classifier_label, "user_inputs": payload["user_inputs"], "plan_text": plan_text}
+
+register_handler("generate_plan", _generate_plan_job)
+
+CHAT_SYSTEM_PROMPT = "You are a certified nutritionist and strength & conditioning coach."
+
+async def summarize_turns(previous_summary: str, turns: List[Dict[str, Any]]) -> str:
+    """Fold older chat turns into the running summary of a session."""
+    transcript = "\n".join(f"{t['role'].capitalize()}: {t['content']}" for t in turns)
+    prompt = f"""Update the running summary of a coaching conversation.
+Keep every fact about the user (goals, injuries, preferences, progress, constraints) and the advice already given.
+Write plain sentences, at most {settings.CHAT_SUMMARY_MAX_TOKENS * 3 // 4} words.
+
+Current summary:
+{previous_summary or "(none)"}
+
+New exchanges:
+{transcript}
+
+Updated summary:"""
+    return await chat_completion(
+        [{"role": "user", "content": prompt}], max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS, tier="summary"
+    )
+
 async def chat_with_history(message: str, plan_id: Optional[str], user_id: str) -> str:
-    """Chat with AI assistant using Groq API."""
-    prompt = f"User: {message}\nAssistant:"
-    
-    if plan_id:
-        from app.db.mongodb import get_database
-        from bson import ObjectId
-        
-        db = get_database()
-        plans_collection = db["plans"]
-        
-        try:
-            plan = await plans_collection.find_one({
-                "_id": ObjectId(plan_id),
-                "user_id": user_id
-            })
-            
-            if plan:
-                prompt = f"""You are a certified nutritionist and strength & conditioning coach.
-The user has a personalized plan. Here's their plan summary:
-{plan['plan_text'][:500]}
-
-User question: {message}
-Assistant:"""
-        except:
-            pass
-    
-    response = await generate_with_groq(prompt)
+    """Chat with AI assistant using Groq API, with the session's history and plan digest as context.
+
+    The first message of a session may be answered from the semantic cache; that answer is
+    generated from the plan's scope (goal, body type, targets) rather than the user's digest,
+    because it is shared with other users in the same scope. Questions about the user's own
+    plan ("what's my Monday workout?") always get the digest and skip the cache.
+    """
+    plan = await get_plan_context(user_id, plan_id) if plan_id else None
+    if not plan:
+        plan_id = None
+
+    session = await load_session(user_id, plan_id)
+    loop = asyncio.get_event_loop()
+    # The embedder model is loaded on first use; keep that off the event loop
+    cacheable = is_standalone(session) and not (plan and asks_about_plan(message))
+    cache = await loop.run_in_executor(None, get_semantic_cache) if cacheable else None
+
+    if cache is not None:
+        scope = plan_scope(plan)
+        response = await loop.run_in_executor(None, cache.lookup, scope, message)
+        if response is None:
+            response = await chat_completion([
+                {"role": "system", "content": CHAT_SYSTEM_PROMPT + scope_context(plan)},
+                {"role": "user", "content": message},
+            ])
+            await loop.run_in_executor(None, cache.store, scope, message, response)
+    else:
+        system_prompt = CHAT_SYSTEM_PROMPT
+        if plan:
+            system_prompt += f"\nThe user has a personalized plan. Here's their plan summary:\n{plan['digest']}"
+        response = await chat_completion(build_messages(system_prompt, session, message))
+    await record_exchange(session, message, response, summarize_turns)
     return response
@@ -0,0 +1,196 @@
+"""Chat sessions with bounded prompts.
+
+A session (one per user and plan, plus one without a plan) keeps the recent
+turns verbatim and a running summary of everything older. Once the turns
+and summary together exceed CHAT_HISTORY_TOKEN_BUDGET, the oldest turns are
+folded into the summary by the LLM (after the reply has been sent), keeping
+the last CHAT_KEEP_TURNS as they are. Prompt building also stops adding turns at
+the budget, so prompts stay bounded even before a fold completes.
+
+Sessions live in the `chat_sessions` collection and in a per-process LRU
+(TTLCache) of active sessions. Every write increments the document's
+`version`; a cached copy is used only while its version matches the stored
+one, so sessions stay consistent across API workers. Folds re-read the
+document and only apply if no other fold has run since (`folded` counts the
+turns folded so far), dropping exactly the turns they summarized.
+
+Plan context comes from the `plan_digest` stored with each plan (computed
+once, at save time, or on first use for older plans).
+"""
+import asyncio
+import weakref
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.log import get_logger
+from app.db.mongodb import get_database
+from app.services.plan_storage import build_plan_digest, read_plan_text
+
+logger = get_logger(__name__)
+
+COLLECTION = "chat_sessions"
+CHARS_PER_TOKEN = 4
+
+_sessions = TTLCache("chat_sessions", maxsize=settings.CHAT_SESSION_CACHE_SIZE,
+                     ttl=settings.CHAT_SESSION_CACHE_TTL_SECONDS)
+_digests = TTLCache("plan_digests", maxsize=settings.CHAT_SESSION_CACHE_SIZE, ttl=3600)
+_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+# Strong references to in-flight summary tasks so they aren't garbage collected
+_background: set = set()
+
+Summarizer = Callable[[str, List[Dict[str, Any]]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _session_id(user_id: str, plan_id: Optional[str]) -> str:
+    return f"{user_id}:{plan_id or '-'}"
+
+
+def _lock(session_id: str) -> asyncio.Lock:
+    lock = _locks.get(session_id)
+    if lock is None:
+        lock = _locks[session_id] = asyncio.Lock()
+    return lock
+
+
+def _history_tokens(session: dict) -> int:
+    return estimate_tokens(session["summary"]) + sum(estimate_tokens(t["content"]) for t in session["turns"])
+
+
+async def load_session(user_id: str, plan_id: Optional[str]) -> dict:
+    """The session, from the process cache if it is still at the stored version."""
+    session_id = _session_id(user_id, plan_id)
+    coll = get_database()[COLLECTION]
+    session = _sessions.get(session_id)
+    if session is not None:
+        current = await coll.find_one({"_id": session_id}, {"version": 1})
+        if (current or {}).get("version", 0) == session["version"]:
+            return session
+    session = await coll.find_one({"_id": session_id}) or {
+        "_id": session_id, "user_id": user_id, "plan_id": plan_id, "summary": "", "turns": [], "folded": 0,
+    }
+    session.setdefault("version", 0)
+    _sessions.set(session_id, session)
+    return session
+
+
+async def get_plan_context(user_id: str, plan_id: str) -> Optional[Dict[str, Any]]:
+    """The plan's stored digest plus its goal, body type and daily targets; the digest is computed
+    and saved once for plans that predate it."""
+    key = (user_id, plan_id)
+    context = _digests.get(key)
+    if context is not None:
+        return context
+    if not ObjectId.is_valid(plan_id):
+        return None
+    plans = get_database()["plans"]
+    plan = await plans.find_one(
+        {"_id": ObjectId(plan_id), "user_id": user_id},
+        {"plan_digest": 1, "user_inputs.goal": 1, "classifier_label": 1, "plan_sections.targets": 1},
+    )
+    if not plan:
+        return None
+    digest = plan.get("plan_digest")
+    if digest is None:
+        full = await plans.find_one({"_id": plan["_id"]})
+        digest = build_plan_digest(await read_plan_text(full))
+        await plans.update_one({"_id": plan["_id"]}, {"$set": {"plan_digest": digest}})
+    context = {
+        "digest": digest,
+        "user_inputs": plan.get("user_inputs") or {},
+        "classifier_label": plan.get("classifier_label"),
+        "targets": (plan.get("plan_sections") or {}).get("targets") or {},
+    }
+    _digests.set(key, context)
+    return context
+
+
+def build_messages(system_prompt: str, session: dict, message: str) -> List[Dict[str, str]]:
+    """System prompt, running summary, as many recent turns as fit the budget, then the new message."""
+    messages = [{"role": "system", "content": system_prompt}]
+    budget = settings.CHAT_HISTORY_TOKEN_BUDGET
+    if session["summary"]:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{session['summary']}"})
+        budget -= estimate_tokens(session["summary"])
+    recent = []
+    for turn in reversed(session["turns"]):
+        cost = estimate_tokens(turn["content"])
+        if cost > budget:
+            break
+        budget -= cost
+        recent.append({"role": turn["role"], "content": turn["content"]})
+    messages.extend(reversed(recent))
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+async def record_exchange(session: dict, message: str, reply: str, summarize: Summarizer) -> None:
+    """Append a user/assistant exchange, then fold old turns in the background if over budget."""
+    now = datetime.utcnow()
+    turns = [{"role": "user", "content": message, "at": now}, {"role": "assistant", "content": reply, "at": now}]
+    async with _lock(session["_id"]):
+        session["turns"].extend(turns)
+        # If another worker wrote in between, the stored version moves past ours and the next
+        # load_session re-reads the document
+        session["version"] += 1
+        await get_database()[COLLECTION].update_one(
+            {"_id": session["_id"]},
+            {
+                "$push": {"turns": {"$each": turns}},
+                "$inc": {"version": 1},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"user_id": session["user_id"], "plan_id": session["plan_id"], "summary": "",
+                                 "folded": 0},
+            },
+            upsert=True,
+        )
+    if (_history_tokens(session) > settings.CHAT_HISTORY_TOKEN_BUDGET
+            and len(session["turns"]) > settings.CHAT_KEEP_TURNS and not session.get("_folding")):
+        session["_folding"] = True
+        task = asyncio.create_task(_fold(session, summarize))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+
+async def _fold(session: dict, summarize: Summarizer) -> None:
+    # Folds from the stored document, which may hold turns written by other workers. The LLM
+    # call runs without the lock so new turns are never held up by it; the update only applies
+    # if no other fold ran meanwhile, and drops exactly the turns that were summarized.
+    coll = get_database()[COLLECTION]
+    try:
+        doc = await coll.find_one({"_id": session["_id"]}, {"summary": 1, "turns": 1, "folded": 1})
+        if not doc or len(doc["turns"]) <= settings.CHAT_KEEP_TURNS:
+            return
+        folded = doc["turns"][:-settings.CHAT_KEEP_TURNS]
+        try:
+            summary = await summarize(doc["summary"], folded)
+        except Exception as e:
+            logger.warning("chat_summary_failed", extra={"session": session["_id"], "error": str(e)})
+            return
+        async with _lock(session["_id"]):
+            result = await coll.update_one(
+                {"_id": session["_id"], "folded": doc.get("folded", 0)},
+                [{"$set": {
+                    "summary": summary,
+                    "turns": {"$slice": ["$turns", len(folded), {"$max": [{"$size": "$turns"}, 1]}]},
+                    "folded": {"$add": [{"$ifNull": ["$folded", 0]}, len(folded)]},
+                    "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+                    "updated_at": datetime.utcnow(),
+                }}],
+            )
+            # The cached copy is now behind; the next load_session re-reads it
+            session["version"] = -1
+        if not result.modified_count:
+            logger.debug("chat_summary_superseded", extra={"session": session["_id"]})
+            return
+        logger.debug("chat_summary_updated", extra={
+            "session": session["_id"], "folded_turns": len(folded), "summary_tokens": estimate_tokens(summary)})
+    finally:
+        session.pop("_folding", None)
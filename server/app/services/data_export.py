@@ -0,0 +1,262 @@
+"""Streaming export of a user's data.
+
+Documents are read from Motor cursors in batches of EXPORT_BATCH_SIZE,
+encoded row by row, optionally gzip-compressed on the fly and yielded in
+chunks of about EXPORT_CHUNK_BYTES, so memory stays flat however long the
+history is.
+
+    ndjson   one line per document: {"collection": "food_logs", "data": {...}}
+    csv      one collection per file; a fixed set of columns per collection,
+             nested values (meals, workouts, user_inputs) as JSON
+
+Served by GET /api/users/me/export. For many users at once, run the batch
+command from the server directory:
+
+    python -m app.services.data_export --users <id> [<id> ...] --out ./exports
+    python -m app.services.data_export --all --format csv --out ./exports
+"""
+import argparse
+import asyncio
+import csv
+import io
+import os
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import Counter
+from app.core.responses import dumps_json
+from app.db.mongodb import get_database
+from app.services.plan_storage import read_plan_text
+
+logger = get_logger(__name__)
+
+EXPORT_ROWS_TOTAL = Counter("export_rows_total", "Documents written by data exports", ("collection", "format"))
+
+# Collection -> (sort order, CSV columns as dotted paths)
+COLLECTIONS: Dict[str, Tuple[List[Tuple[str, int]], List[str]]] = {
+    "food_logs": ([("date", 1)], [
+        "date", "water_ml", "total_macros.calories", "total_macros.protein", "total_macros.carbs",
+        "total_macros.fat", "total_macros.fiber", "meals", "updated_at",
+    ]),
+    "workout_logs": ([("date", 1)], [
+        "date", "total_sets", "total_reps", "total_weight", "total_duration", "workouts", "updated_at",
+    ]),
+    "plans": ([("created_at", 1)], [
+        "id", "created_at", "classifier_label", "user_inputs", "plan_text",
+    ]),
+    "health_profiles": ([("_id", 1)], [
+        "age", "gender", "height", "weight", "bmi", "activity_level", "family_history", "sugar_intake",
+        "sleep_hours", "stress_level", "created_at",
+    ]),
+    "health_sync": ([("synced_at", 1)], [
+        "synced_at", "source", "avg_steps", "avg_sleep_hours", "resting_heart_rate", "confidence_score",
+    ]),
+    "wearable_daily_summary": ([("date", 1)], [
+        "date", "source", "steps", "sleep_minutes", "resting_heart_rate", "active_minutes", "calories_burned",
+    ]),
+}
+
+# Storage details of plans that are not part of the user's data
+_PLAN_INTERNAL_FIELDS = ("plan_text_z", "plan_codec", "plan_dict_id", "plan_preview", "plan_digest")
+
+
+async def iter_documents(user_id: str, collections: Iterable[str]) -> AsyncIterator[Tuple[str, dict]]:
+    """Yield (collection, document) for the user's documents, one collection after another."""
+    db = get_database()
+    for name in collections:
+        sort, _ = COLLECTIONS[name]
+        cursor = db[name].find({"user_id": user_id}, {"user_id": 0}).sort(sort).batch_size(settings.EXPORT_BATCH_SIZE)
+        async for doc in cursor:
+            doc["id"] = str(doc.pop("_id"))
+            if name == "plans":
+                doc["plan_text"] = await read_plan_text(doc)
+                for field in _PLAN_INTERNAL_FIELDS:
+                    doc.pop(field, None)
+            yield name, doc
+
+
+async def iter_ndjson(user_id: str, collections: Iterable[str]) -> AsyncIterator[bytes]:
+    async for name, doc in iter_documents(user_id, collections):
+        EXPORT_ROWS_TOTAL.inc(collection=name, format="ndjson")
+        yield dumps_json({"collection": name, "data": doc}) + b"\n"
+
+
+def _lookup(doc: dict, path: str) -> Any:
+    value: Any = doc
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return dumps_json(value).decode("utf-8")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+async def iter_csv(user_id: str, collection: str) -> AsyncIterator[bytes]:
+    _, columns = COLLECTIONS[collection]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for _, doc in iter_documents(user_id, [collection]):
+        writer.writerow([_cell(_lookup(doc, path)) for path in columns])
+        EXPORT_ROWS_TOTAL.inc(collection=collection, format="csv")
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def encode_stream(rows: AsyncIterator[bytes], gzip: bool = True) -> AsyncIterator[bytes]:
+    """Coalesce encoded rows into chunks of about EXPORT_CHUNK_BYTES, gzip-compressing as they arrive."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+    pending = bytearray()
+    async for row in rows:
+        pending += compressor.compress(row) if compressor else row
+        if len(pending) >= settings.EXPORT_CHUNK_BYTES:
+            yield bytes(pending)
+            pending.clear()
+    if compressor:
+        pending += compressor.flush()
+    if pending:
+        yield bytes(pending)
+
+
+def export_stream(user_id: str, fmt: str, collections: List[str], gzip: bool = True) -> AsyncIterator[bytes]:
+    """The export body for `fmt` ("ndjson", or "csv" with exactly one collection)."""
+    rows = iter_ndjson(user_id, collections) if fmt == "ndjson" else iter_csv(user_id, collections[0])
+    return encode_stream(rows, gzip)
+
+
+_active_exports = 0
+
+
+def open_export(user_id: str, fmt: str, collections: List[str],
+                gzip: bool = True) -> Tuple[AsyncIterator[bytes], Callable[[], Awaitable[None]]]:
+    """export_stream for an HTTP response, plus a release callback; 503 once EXPORT_MAX_CONCURRENT
+    exports are open.
+
+    The slot is taken here and freed by whichever comes first: the body finishing, or `release`
+    (run it as the response's background task, so a response that never starts can't leak a slot).
+    """
+    global _active_exports
+    if _active_exports >= settings.EXPORT_MAX_CONCURRENT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many exports in progress",
+            headers={"Retry-After": "30"},
+        )
+    _active_exports += 1
+    released = False
+
+    async def release() -> None:
+        nonlocal released
+        global _active_exports
+        if not released:
+            released = True
+            _active_exports -= 1
+
+    async def body():
+        try:
+            async for chunk in export_stream(user_id, fmt, collections, gzip):
+                yield chunk
+        finally:
+            await release()
+
+    return body(), release
+
+
+async def export_user_to_dir(user_id: str, out_dir: str, fmt: str, collections: List[str], gzip: bool = True) -> int:
+    """Write one user's export under `out_dir`; returns bytes written."""
+    suffix = ".gz" if gzip else ""
+    if fmt == "ndjson":
+        targets = [(os.path.join(out_dir, f"{user_id}.ndjson{suffix}"), collections)]
+    else:
+        user_dir = os.path.join(out_dir, user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        targets = [(os.path.join(user_dir, f"{name}.csv{suffix}"), [name]) for name in collections]
+    written = 0
+    for path, names in targets:
+        with open(path + ".part", "wb") as f:
+            async for chunk in export_stream(user_id, fmt, names, gzip):
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(path + ".part", path)
+    return written
+
+
+async def _all_user_ids() -> AsyncIterator[str]:
+    async for user in get_database()["users"].find({}, {"_id": 1}).batch_size(settings.EXPORT_BATCH_SIZE):
+        yield str(user["_id"])
+
+
+async def run_batch(user_ids: AsyncIterator[str], out_dir: str, fmt: str, collections: List[str],
+                    gzip: bool, concurrency: int) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def export_one(user_id: str) -> None:
+        try:
+            written = await export_user_to_dir(user_id, out_dir, fmt, collections, gzip)
+            print(f"{user_id}: {written} bytes")
+        except Exception as e:
+            logger.exception("export_failed", extra={"user_id": user_id})
+            print(f"{user_id}: failed ({e})")
+        finally:
+            slots.release()
+
+    # Users are read lazily; at most `concurrency` exports are in flight
+    async for user_id in user_ids:
+        await slots.acquire()
+        task = asyncio.create_task(export_one(user_id))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def _main(args) -> None:
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection
+    from app.services.plan_storage import load_dictionaries
+
+    async def listed():
+        for user_id in args.users:
+            yield user_id
+
+    await connect_to_mongo()
+    try:
+        await load_dictionaries()
+        await run_batch(_all_user_ids() if args.all else listed(), args.out, args.format,
+                        args.collections, not args.no_gzip, args.concurrency)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--users", nargs="+", help="user ids to export")
+    who.add_argument("--all", action="store_true", help="export every user")
+    parser.add_argument("--out", default="exports", help="output directory")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--collections", nargs="+", choices=list(COLLECTIONS), default=list(COLLECTIONS))
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=4, help="users exported at once")
+    asyncio.run(_main(parser.parse_args()))
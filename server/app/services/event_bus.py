@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Set, Optional, Any
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import register_collector
+from app.db.mongodb import get_database
+
+logger = get_logger(__name__)
+
+# Identifies this worker process so it can skip its own events on the broker.
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+QUEUE_SIZE = 100
+
+
+class EventBus:
+    """In-process per-user pub/sub used to push live updates over SSE.
+
+    With EVENTS_BROKER=mongo, events are also written to a capped collection
+    that every worker tails, so subscribers on other workers see them too.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._tail_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(q) for q in self._subscribers.values())
+
+    def _deliver(self, user_id: str, event: dict) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                # Slow consumer: drop the oldest event rather than block publishers
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+
+    async def publish(self, user_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Publish an event to every subscriber of `user_id`. Never raises."""
+        event = {"type": event_type, "data": data or {}, "at": datetime.utcnow().isoformat()}
+        self._deliver(user_id, event)
+        if settings.EVENTS_BROKER != "mongo":
+            return
+        try:
+            await get_database()["events"].insert_one({
+                "user_id": user_id,
+                "origin": WORKER_ID,
+                "event": json.loads(json.dumps(event, default=str)),
+                "created_at": datetime.utcnow(),
+            })
+        except Exception as e:
+            logger.warning("event_broker_publish_failed", extra={"error": str(e)})
+
+    async def start(self) -> None:
+        """Start tailing the broker collection when the mongo broker is enabled."""
+        if settings.EVENTS_BROKER != "mongo" or self._tail_task is not None:
+            return
+        db = get_database()
+        try:
+            await db.create_collection("events", capped=True, size=settings.EVENTS_CAPPED_SIZE_BYTES)
+        except CollectionInvalid:
+            pass
+        self._tail_task = asyncio.create_task(self._tail_broker())
+
+    async def stop(self) -> None:
+        if self._tail_task is not None:
+            self._tail_task.cancel()
+            try:
+                await self._tail_task
+            except asyncio.CancelledError:
+                pass
+            self._tail_task = None
+
+    async def _tail_broker(self) -> None:
+        coll = get_database()["events"]
+        last_id = None
+        started_at = datetime.utcnow()
+        while True:
+            query: Dict[str, Any] = {"origin": {"$ne": WORKER_ID}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            else:
+                query["created_at"] = {"$gte": started_at}
+            try:
+                cursor = coll.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for doc in cursor:
+                        last_id = doc["_id"]
+                        self._deliver(doc["user_id"], doc["event"])
+                    await asyncio.sleep(0.5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("event_broker_tail_error", extra={"error": str(e)})
+            await asyncio.sleep(1)
+
+
+event_bus = EventBus()
+
+register_collector(lambda: [(
+    "sse_subscribers", "gauge", "Open Server-Sent Events subscriptions on this worker",
+    [({}, event_bus.subscriber_count())],
+)])
+
+
+def format_sse(event: dict) -> str:
+    """Serialize an event as a Server-Sent Events frame."""
+    payload = json.dumps(event, default=str)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
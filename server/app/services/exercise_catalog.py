@@ -0,0 +1,161 @@
+"""Immutable exercise catalog loaded from a JSON data file.
+
+Exercises are stored once by id; muscle groups only hold lists of ids.
+Everything derived from the catalog (per-group lists, the serialized
+/muscle-groups payload and the search index) is built once at load time.
+
+Data file format (see app/data/exercises.json):
+
+    {
+      "exercises": [{"id": "push-ups", "name": "Push-ups", ...}],
+      "muscle_groups": [{"name": "chest", "display_name": "Chest", "exercise_ids": ["push-ups"]}]
+    }
+"""
+import bisect
+import json
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.models.workout import Exercise, MuscleGroup
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Relative importance of a query token matching each field
+FIELD_WEIGHTS = {
+    "name": 5.0,
+    "description": 2.0,
+    "muscle_group": 1.5,
+    "equipment": 1.5,
+    "instructions": 1.0,
+    "tips": 0.5,
+}
+# A query token that is only a prefix of an indexed token scores less than an exact match
+PREFIX_FACTOR = 0.6
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class ExerciseCatalog:
+    def __init__(self, exercises: Dict[str, Exercise], groups: List[Tuple[str, str, List[str]]]):
+        self.exercises = exercises
+        self.group_names = [name for name, _, _ in groups]
+        self.group_ids: Dict[str, frozenset] = {}
+        self._group_order: Dict[str, Tuple[str, ...]] = {}
+        self._by_group: Dict[str, Tuple[Exercise, ...]] = {}
+        muscle_groups = []
+        for name, display_name, ids in groups:
+            members = tuple(exercises[i] for i in ids)
+            self._by_group[name] = members
+            self.group_ids[name] = frozenset(ids)
+            self._group_order[name] = tuple(ids)
+            muscle_groups.append(MuscleGroup(name=name, display_name=display_name, exercises=list(members)))
+        self.muscle_groups: Tuple[MuscleGroup, ...] = tuple(muscle_groups)
+        self.muscle_groups_json: bytes = TypeAdapter(Dict[str, List[MuscleGroup]]).dump_json(
+            {"muscle_groups": list(muscle_groups)}
+        )
+        self._build_index()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExerciseCatalog":
+        exercises = {}
+        for item in data["exercises"]:
+            item = dict(item)
+            exercise_id = item.pop("id")
+            exercises[exercise_id] = Exercise(**item)
+        groups = [
+            (g["name"], g.get("display_name") or g["name"].capitalize(), list(g["exercise_ids"]))
+            for g in data["muscle_groups"]
+        ]
+        return cls(exercises, groups)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ExerciseCatalog":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def _build_index(self) -> None:
+        index: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for exercise_id, exercise in self.exercises.items():
+            fields = {
+                "name": [exercise.name],
+                "description": [exercise.description],
+                "muscle_group": [exercise.muscle_group],
+                "equipment": [exercise.equipment or ""],
+                "instructions": exercise.instructions,
+                "tips": exercise.tips,
+            }
+            for field, texts in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for text in texts:
+                    for token in tokenize(text):
+                        postings = index[token]
+                        if postings.get(exercise_id, 0.0) < weight:
+                            postings[exercise_id] = weight
+        self._index = dict(index)
+        self._tokens = sorted(self._index)
+
+    def _token_scores(self, token: str) -> Dict[str, float]:
+        """Best score per exercise for one query token (exact or prefix match)."""
+        scores = dict(self._index.get(token, {}))
+        start = bisect.bisect_left(self._tokens, token)
+        for indexed in self._tokens[start:]:
+            if not indexed.startswith(token):
+                break
+            if indexed == token:
+                continue
+            for exercise_id, weight in self._index[indexed].items():
+                prefix_weight = weight * PREFIX_FACTOR
+                if scores.get(exercise_id, 0.0) < prefix_weight:
+                    scores[exercise_id] = prefix_weight
+        return scores
+
+    def by_group(self, muscle_group: str) -> List[Exercise]:
+        return list(self._by_group.get(muscle_group.lower(), ()))
+
+    def search(self, query: str, muscle_group: Optional[str] = None, limit: Optional[int] = None) -> List[Exercise]:
+        """Rank exercises matching every query token, best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        allowed = self.group_ids.get(muscle_group.lower(), frozenset()) if muscle_group else None
+
+        totals: Optional[Dict[str, float]] = None
+        for token in dict.fromkeys(tokens):
+            scores = self._token_scores(token)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {i: totals[i] + s for i, s in scores.items() if i in totals}
+            if not totals:
+                return []
+
+        ranked = sorted(
+            (i for i in totals if allowed is None or i in allowed),
+            key=lambda i: (-totals[i], self.exercises[i].name),
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.exercises[i] for i in ranked]
+
+    def to_dict(self) -> dict:
+        """Inverse of from_dict, in the data file format."""
+        return {
+            "exercises": [{"id": i, **e.model_dump()} for i, e in self.exercises.items()],
+            "muscle_groups": [
+                {"name": g.name, "display_name": g.display_name, "exercise_ids": list(self._group_order[g.name])}
+                for g in self.muscle_groups
+            ],
+        }
+
+
+@lru_cache(maxsize=1)
+def get_catalog() -> ExerciseCatalog:
+    """Load the catalog once per process from EXERCISE_CATALOG_PATH."""
+    return ExerciseCatalog.from_file(settings.EXERCISE_CATALOG_PATH)
@@ -2,8 +2,11 @@ import httpx
 from typing import List, Dict, Any
 from app.models.food import FoodItem, FoodSearchResponse
 from app.core.config import settings
+from app.core.log import get_logger
 import asyncio
 
+logger = get_logger(__name__)
+
 class NutritionAPI:
     """Service for fetching food nutrition data"""
     
@@ -56,7 +59,7 @@ class NutritionAPI:
                 )
                 
             except Exception as e:
-                print(f"Nutrition API error: {e}")
+                logger.warning("nutrition_api_error", extra={"error": str(e)})
                 # Fallback to mock data
                 return await self._mock_search_food(query, limit)
     
@@ -0,0 +1,65 @@
+"""Single-decode image preprocessing shared by both vision models.
+
+An upload is decoded once, at reduced resolution: JPEGs use PIL's `draft()`
+so libjpeg decodes straight to 1/2, 1/4 or 1/8 scale, and other formats are
+box-reduced right after decoding. Both models take 224px inputs, so nothing
+above DECODE_MIN_SIDE is ever materialized for a 12-megapixel phone photo.
+
+The decoded RGB array is then handed to the image processor of each model
+the caller will run, and only those: single-model endpoints pass one
+processor. When both are requested and configured identically, the
+normalized tensor is built once and shared.
+"""
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+import numpy as np
+import torch
+from PIL import Image
+
+from app.core.config import settings
+
+# Second line of defence behind the header check in app.core.uploads
+Image.MAX_IMAGE_PIXELS = settings.MAX_IMAGE_PIXELS
+
+# Shortest side kept after decoding: the classifier resizes to 256 before its
+# 224 center crop, and a little headroom keeps the final resize sharp.
+DECODE_MIN_SIDE = 448
+
+
+def decode_image(image_bytes: bytes, min_side: int = DECODE_MIN_SIDE) -> Image.Image:
+    """Decode to RGB with the shortest side reduced toward `min_side` (never below it)."""
+    image = Image.open(BytesIO(image_bytes))
+    if image.format == "JPEG":
+        image.draft("RGB", (min_side, min_side))
+    image = image.convert("RGB")
+    factor = min(image.size) // min_side
+    if factor >= 2:
+        image = image.reduce(factor)
+    return image
+
+
+@dataclass
+class PreparedImage:
+    """Normalized `pixel_values` for each requested model, from one decode (None if not requested)."""
+
+    classifier_input: Optional[torch.Tensor]
+    regressor_input: Optional[torch.Tensor]
+    decoded_size: tuple
+
+
+def prepare_image(image_bytes: bytes, classifier_processor=None, regressor_processor=None) -> PreparedImage:
+    image = decode_image(image_bytes)
+    pixels = np.asarray(image)
+    classifier_input = regressor_input = None
+    if classifier_processor is not None:
+        classifier_input = classifier_processor(images=pixels, return_tensors="pt")["pixel_values"]
+    if regressor_processor is not None:
+        if classifier_input is not None and (
+                regressor_processor is classifier_processor
+                or regressor_processor.to_dict() == classifier_processor.to_dict()):
+            regressor_input = classifier_input
+        else:
+            regressor_input = regressor_processor(images=pixels, return_tensors="pt")["pixel_values"]
+    return PreparedImage(classifier_input, regressor_input, image.size)
@@ -0,0 +1,357 @@
+"""Pluggable CPU inference backends for the vision models.
+
+INFERENCE_BACKEND selects how the body-type classifier and the ViT
+height/weight regressor run:
+
+    eager        Hugging Face / PyTorch modules as loaded by ai_service (default)
+    torchscript  frozen TorchScript graphs exported from the eager models
+    onnx         ONNX Runtime sessions exported from the eager models
+
+Compiled backends read their artifacts from INFERENCE_MODEL_DIR, produced once with:
+
+    python -m app.services.inference export --format onnx
+    python -m app.services.inference export --format torchscript
+
+If the artifacts (or onnxruntime) are missing, the eager backend is used.
+Verify numerical parity with `python -m benchmarks.check_inference_parity`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+import torch.nn as nn
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import register_collector
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+logger = get_logger(__name__)
+
+CLASSIFIER = "body_classifier"
+REGRESSOR = "vit_regressor"
+META_FILE = "meta.json"
+# Input resolution of both checkpoints
+IMAGE_SIZE = 224
+
+
+class VisionBackend:
+    """Runs both vision models on preprocessed `pixel_values` batches (N, 3, 224, 224)."""
+
+    name = "base"
+
+    def classify(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """Return classifier logits of shape (N, num_labels)."""
+        raise NotImplementedError
+
+    def regress(self, pixel_values: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Return normalized (height, weight) predictions, each of shape (N, 1)."""
+        raise NotImplementedError
+
+    def dataset_stats(self) -> Dict[str, float]:
+        raise NotImplementedError
+
+
+class _ClassifierGraph(nn.Module):
+    """Export wrapper: HF model output object -> plain logits tensor."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model(pixel_values=pixel_values).logits
+
+
+class _RegressorGraph(nn.Module):
+    """Export wrapper: {"height", "weight"} dict -> tuple."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        outputs = self.model(pixel_values)
+        return outputs["height"], outputs["weight"]
+
+
+class EagerBackend(VisionBackend):
+    name = "eager"
+
+    def classify(self, pixel_values):
+        from app.services import ai_service
+
+        _, model = ai_service.load_image_model()
+        with torch.no_grad():
+            return model(pixel_values=pixel_values).logits
+
+    def regress(self, pixel_values):
+        from app.services import ai_service
+
+        model, _, _, device = ai_service.load_vit_model()
+        with torch.no_grad():
+            outputs = model(pixel_values.to(device))
+        return outputs["height"].cpu(), outputs["weight"].cpu()
+
+    def dataset_stats(self):
+        from app.services import ai_service
+
+        return ai_service.load_vit_model()[2]
+
+
+def _read_meta(model_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(model_dir, META_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TorchScriptBackend(VisionBackend):
+    name = "torchscript"
+
+    def __init__(self, model_dir: str):
+        meta = _read_meta(model_dir)
+        self._stats = meta["dataset_stats"]
+        self._classifier = torch.jit.load(os.path.join(model_dir, f"{CLASSIFIER}.ts"), map_location="cpu").eval()
+        self._regressor = torch.jit.load(os.path.join(model_dir, f"{REGRESSOR}.ts"), map_location="cpu").eval()
+
+    def classify(self, pixel_values):
+        with torch.inference_mode():
+            return self._classifier(pixel_values)
+
+    def regress(self, pixel_values):
+        with torch.inference_mode():
+            height, weight = self._regressor(pixel_values)
+        return height, weight
+
+    def dataset_stats(self):
+        return self._stats
+
+
+class OnnxBackend(VisionBackend):
+    name = "onnx"
+
+    def __init__(self, model_dir: str):
+        meta = _read_meta(model_dir)
+        self._stats = meta["dataset_stats"]
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads()
+        options.inter_op_num_threads = 1
+        providers = ["CPUExecutionProvider"]
+        self._classifier = onnxruntime.InferenceSession(
+            os.path.join(model_dir, f"{CLASSIFIER}.onnx"), options, providers=providers)
+        self._regressor = onnxruntime.InferenceSession(
+            os.path.join(model_dir, f"{REGRESSOR}.onnx"), options, providers=providers)
+
+    def classify(self, pixel_values):
+        (logits,) = self._classifier.run(["logits"], {"pixel_values": pixel_values.numpy()})
+        return torch.from_numpy(logits)
+
+    def regress(self, pixel_values):
+        height, weight = self._regressor.run(["height", "weight"], {"pixel_values": pixel_values.numpy()})
+        return torch.from_numpy(height), torch.from_numpy(weight)
+
+    def dataset_stats(self):
+        return self._stats
+
+
+def inference_workers() -> int:
+    """Concurrent inference calls: INFERENCE_WORKERS, or a quarter of the cores when 0."""
+    return settings.INFERENCE_WORKERS or max(1, (os.cpu_count() or 1) // 4)
+
+
+def intra_op_threads() -> int:
+    """Threads per inference call: INFERENCE_INTRA_OP_THREADS, or the cores split across workers when 0."""
+    return settings.INFERENCE_INTRA_OP_THREADS or max(1, (os.cpu_count() or 1) // inference_workers())
+
+
+def configure_torch_threads() -> None:
+    """Size torch's thread pools so workers x intra-op threads matches the core count."""
+    torch.set_num_threads(intra_op_threads())
+    try:
+        torch.set_interop_threads(settings.INFERENCE_INTEROP_THREADS)
+    except RuntimeError:
+        # Only settable before the first parallel op in the process
+        logger.warning("torch_interop_threads_not_set", extra={"requested": settings.INFERENCE_INTEROP_THREADS})
+
+
+_backend: Optional[VisionBackend] = None
+_backend_lock = threading.Lock()
+
+
+def build_backend(name: str, model_dir: Optional[str] = None) -> VisionBackend:
+    model_dir = model_dir or settings.INFERENCE_MODEL_DIR
+    if name == "torchscript":
+        return TorchScriptBackend(model_dir)
+    if name == "onnx":
+        if onnxruntime is None:
+            raise RuntimeError("onnxruntime is not installed")
+        return OnnxBackend(model_dir)
+    return EagerBackend()
+
+
+def get_backend() -> VisionBackend:
+    """Return the configured backend, falling back to eager if it cannot be loaded."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                try:
+                    _backend = build_backend(settings.INFERENCE_BACKEND)
+                except Exception as e:
+                    logger.warning("inference_backend_fallback", extra={
+                        "requested": settings.INFERENCE_BACKEND, "error": str(e)})
+                    _backend = EagerBackend()
+                logger.info("inference_backend_loaded", extra={
+                    "backend": _backend.name, "workers": inference_workers(), "intra_op_threads": intra_op_threads()})
+    return _backend
+
+
+# Inference runs in its own small pool rather than the loop's default
+# executor, with torch threads per call sized to match, so concurrent
+# requests queue here instead of oversubscribing the cores.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+# Simple counters, read by the metrics endpoint and benchmarks.
+inference_pool_stats = {
+    "calls": 0,
+    "rejected": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                configure_torch_threads()
+                _executor = ThreadPoolExecutor(max_workers=inference_workers(), thread_name_prefix="inference")
+    return _executor
+
+
+async def run_inference(fn, *args):
+    """Run a blocking inference call in the bounded pool, rejecting work when the queue is full."""
+    global _pending
+    executor = _get_executor()
+    with _executor_lock:
+        if _pending >= inference_workers() + settings.INFERENCE_MAX_QUEUE:
+            inference_pool_stats["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Image analysis is busy, please retry",
+                headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_SECONDS)},
+            )
+        _pending += 1
+
+    submitted = time.perf_counter()
+
+    def _job():
+        waited = time.perf_counter() - submitted
+        with _executor_lock:
+            inference_pool_stats["calls"] += 1
+            inference_pool_stats["wait_seconds_total"] += waited
+            inference_pool_stats["wait_seconds_max"] = max(inference_pool_stats["wait_seconds_max"], waited)
+        return fn(*args)
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, _job)
+    finally:
+        with _executor_lock:
+            _pending -= 1
+
+
+def _collect_pool():
+    stats = dict(inference_pool_stats)
+    yield ("inference_calls_total", "counter", "Inference calls run in the inference pool", [({}, stats["calls"])])
+    yield ("inference_rejected_total", "counter", "Inference calls rejected because the queue was full",
+           [({}, stats["rejected"])])
+    yield ("inference_wait_seconds_total", "counter", "Time inference calls spent queued for the pool",
+           [({}, stats["wait_seconds_total"])])
+    yield ("inference_queue_depth", "gauge", "Inference calls running or queued", [({}, _pending)])
+
+
+register_collector(_collect_pool)
+
+
+def export(fmt: str, model_dir: Optional[str] = None, opset: int = 17) -> str:
+    """Export both eager models to `fmt` ("onnx" or "torchscript") under `model_dir`."""
+    from app.services import ai_service
+
+    model_dir = model_dir or settings.INFERENCE_MODEL_DIR
+    os.makedirs(model_dir, exist_ok=True)
+    _, classifier = ai_service.load_image_model()
+    # Always the fp32 regressor: load_vit_model() returns the INT8 copy under VIT_QUANTIZATION=int8,
+    # and dynamically quantized Linear layers don't export to ONNX or trace to the same graph
+    regressor, dataset_stats, _ = ai_service.build_vit_model(torch.device("cpu"))
+    graphs = {
+        CLASSIFIER: (_ClassifierGraph(classifier.cpu()).eval(), ["logits"]),
+        REGRESSOR: (_RegressorGraph(regressor.cpu()).eval(), ["height", "weight"]),
+    }
+    size = ai_service.load_vit_processor().size.get("height", IMAGE_SIZE)
+    dummy = torch.randn(1, 3, size, size)
+
+    for name, (graph, outputs) in graphs.items():
+        if fmt == "onnx":
+            path = os.path.join(model_dir, f"{name}.onnx")
+            torch.onnx.export(
+                graph, (dummy,), path,
+                input_names=["pixel_values"], output_names=outputs,
+                dynamic_axes={"pixel_values": {0: "batch"}, **{o: {0: "batch"} for o in outputs}},
+                opset_version=opset,
+            )
+        elif fmt == "torchscript":
+            path = os.path.join(model_dir, f"{name}.ts")
+            with torch.no_grad():
+                traced = torch.jit.trace(graph, dummy, strict=False)
+                frozen = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+            frozen.save(path)
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+        print(f"Exported {name} -> {path}")
+
+    meta_path = os.path.join(model_dir, META_FILE)
+    meta = _read_meta(model_dir) if os.path.exists(meta_path) else {}
+    meta.update({
+        "dataset_stats": {k: float(v) for k, v in dataset_stats.items()},
+        "image_size": size,
+        "torch_version": torch.__version__,
+        "exported_at": datetime.utcnow().isoformat(),
+    })
+    meta.setdefault("formats", [])
+    if fmt not in meta["formats"]:
+        meta["formats"].append(fmt)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return model_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the vision models for compiled inference backends")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export")
+    exp.add_argument("--format", choices=["onnx", "torchscript"], required=True)
+    exp.add_argument("--model-dir", default=None)
+    exp.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    if args.command == "export":
+        export(args.format, args.model_dir, args.opset)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Mongo-backed job queue for slow AI work (plan generation).
+
+Submitting inserts a `jobs` document and returns immediately; JobWorker
+tasks in every API process claim queued jobs with an atomic
+find_one_and_update that sets a lease, renew the lease while the handler
+runs, and write the result back. A job whose lease expires (worker crashed
+or was redeployed) is claimed again, up to JOBS_MAX_ATTEMPTS. A job whose
+handler failed is re-queued with exponential backoff (`not_before`), so an
+outage of the LLM API doesn't use up every attempt within seconds.
+
+Job document:
+
+    user_id, kind, payload, status     queued | running | succeeded | failed
+    dedup_key                          hash of the inputs; identical active jobs are shared
+    active_key                         dedup_key while queued/running, unset after (unique per user)
+    active_slot                        0 .. JOBS_MAX_ACTIVE_PER_USER-1 while queued/running, unset
+                                       after (unique per user, so the cap holds across processes)
+    attempts, lease_owner, lease_expires_at
+    not_before                         queued jobs are not claimed before this time
+    result, error, created_at, updated_at, finished_at
+
+Clients poll GET /api/jobs/{id} or listen for `job_completed` / `job_failed`
+on the SSE stream.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import Counter, Histogram
+from app.db.mongodb import get_database
+from app.services.event_bus import event_bus
+
+logger = get_logger(__name__)
+
+COLLECTION = "jobs"
+ACTIVE = ("queued", "running")
+
+JOBS_TOTAL = Counter("jobs_total", "Jobs finished by kind and outcome", ("kind", "outcome"))
+JOB_SECONDS = Histogram(
+    "job_duration_seconds", "Time from claim to completion", ("kind",),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0))
+JOB_QUEUE_SECONDS = Histogram(
+    "job_queue_wait_seconds", "Time jobs spent queued before a worker claimed them", ("kind",))
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+_handlers: Dict[str, Handler] = {}
+
+
+def register_handler(kind: str, handler: Handler) -> None:
+    _handlers[kind] = handler
+
+
+def dedup_key(*parts: Any) -> str:
+    """Stable hash of a job's inputs (bytes are hashed as-is, everything else as sorted JSON)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray)):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before re-running a job that has failed `attempts` times: doubles each time, capped."""
+    return min(settings.JOBS_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.JOBS_RETRY_BACKOFF_MAX_SECONDS)
+
+
+def _conflict(e: DuplicateKeyError) -> str:
+    """The unique index a failed insert ran into: "active_key" or "active_slot"."""
+    pattern = (e.details or {}).get("keyPattern") or {}
+    return "active_slot" if "active_slot" in pattern or "active_slot" in str(e) else "active_key"
+
+
+async def submit_job(user_id: str, kind: str, payload: Dict[str, Any], key: str) -> Tuple[dict, bool]:
+    """Queue a job, or return the caller's identical active job. Returns (job, created)."""
+    coll = get_database()[COLLECTION]
+    existing = await coll.find_one({"user_id": user_id, "active_key": key}, {"payload": 0})
+    if existing:
+        return existing, False
+
+    # Each active job holds one of the user's slots; the unique index on (user_id, active_slot)
+    # makes the per-user cap exact even when submissions race
+    taken = await coll.distinct("active_slot", {"user_id": user_id, "active_slot": {"$exists": True}})
+    now = datetime.utcnow()
+    job = {
+        "user_id": user_id, "kind": kind, "payload": payload, "status": "queued",
+        "dedup_key": key, "active_key": key, "attempts": 0,
+        "not_before": now, "created_at": now, "updated_at": now,
+    }
+    for slot in range(settings.JOBS_MAX_ACTIVE_PER_USER):
+        if slot in taken:
+            continue
+        job["active_slot"] = slot
+        try:
+            result = await coll.insert_one(job)
+        except DuplicateKeyError as e:
+            if _conflict(e) == "active_slot":
+                continue
+            # Lost a race with an identical submission
+            existing = await coll.find_one({"user_id": user_id, "active_key": key}, {"payload": 0})
+            if existing:
+                return existing, False
+            raise
+        job["_id"] = result.inserted_id
+        job_worker.wake()
+        return job, True
+
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"At most {settings.JOBS_MAX_ACTIVE_PER_USER} jobs can run at once",
+        headers={"Retry-After": "10"},
+    )
+
+
+async def get_job(user_id: str, job_id: str) -> Optional[dict]:
+    if not ObjectId.is_valid(job_id):
+        return None
+    return await get_database()[COLLECTION].find_one(
+        {"_id": ObjectId(job_id), "user_id": user_id}, {"payload": 0})
+
+
+async def list_jobs(user_id: str, limit: int = 20) -> List[dict]:
+    cursor = get_database()[COLLECTION].find({"user_id": user_id}, {"payload": 0}).sort("created_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+class JobWorker:
+    """Claims and runs queued jobs; JOBS_WORKERS concurrent slots per process."""
+
+    def __init__(self):
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._tasks or settings.JOBS_WORKERS <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(slot)) for slot in range(settings.JOBS_WORKERS)]
+        logger.info("job_worker_started", extra={"worker_id": self.worker_id, "slots": settings.JOBS_WORKERS})
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def claim(self) -> Optional[dict]:
+        now = datetime.utcnow()
+        lease = timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+        return await get_database()[COLLECTION].find_one_and_update(
+            {"$or": [
+                # $not/$gt also matches jobs queued before not_before existed
+                {"status": "queued", "not_before": {"$not": {"$gt": now}}},
+                {"status": "running", "lease_expires_at": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": "running", "lease_owner": self.worker_id,
+                         "lease_expires_at": now + lease, "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _renew_lease(self, job_id: ObjectId) -> None:
+        coll = get_database()[COLLECTION]
+        while True:
+            await asyncio.sleep(settings.JOBS_LEASE_SECONDS / 3)
+            now = datetime.utcnow()
+            await coll.update_one(
+                {"_id": job_id, "lease_owner": self.worker_id, "status": "running"},
+                {"$set": {"lease_expires_at": now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+                          "updated_at": now}},
+            )
+
+    async def _finish(self, job: dict, update: Dict[str, Any], unset_active: bool) -> bool:
+        now = datetime.utcnow()
+        change: Dict[str, Any] = {"$set": {**update, "updated_at": now}}
+        change["$unset"] = {"lease_owner": "", "lease_expires_at": ""}
+        if unset_active:
+            change["$set"]["finished_at"] = now
+            change["$unset"].update({"active_key": "", "active_slot": "", "payload": ""})
+        result = await get_database()[COLLECTION].update_one(
+            {"_id": job["_id"], "lease_owner": self.worker_id}, change)
+        return result.modified_count == 1
+
+    async def process(self, job: dict) -> None:
+        kind = job["kind"]
+        JOB_QUEUE_SECONDS.observe((datetime.utcnow() - job["created_at"]).total_seconds(), kind=kind)
+        handler = _handlers.get(kind)
+        if job["attempts"] > settings.JOBS_MAX_ATTEMPTS:
+            # Reclaimed after its last lease expired: the worker keeps dying on it
+            if await self._finish(job, {"status": "failed", "error": "Job exceeded its retry limit"}, unset_active=True):
+                JOBS_TOTAL.inc(kind=kind, outcome="failed")
+                await event_bus.publish(job["user_id"], "job_failed", {"job_id": str(job["_id"]), "kind": kind})
+            return
+        renew = asyncio.create_task(self._renew_lease(job["_id"]))
+        started = asyncio.get_running_loop().time()
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler for job kind {kind!r}")
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            retry = job["attempts"] < settings.JOBS_MAX_ATTEMPTS and handler is not None
+            if retry:
+                delay = retry_delay(job["attempts"])
+                await self._finish(job, {"status": "queued", "error": error,
+                                         "not_before": datetime.utcnow() + timedelta(seconds=delay)},
+                                   unset_active=False)
+                logger.warning("job_retry", extra={"job_id": str(job["_id"]), "kind": kind, "error": error,
+                                                   "retry_in_seconds": delay})
+                return
+            if await self._finish(job, {"status": "failed", "error": error}, unset_active=True):
+                JOBS_TOTAL.inc(kind=kind, outcome="failed")
+                logger.warning("job_failed", extra={"job_id": str(job["_id"]), "kind": kind, "error": error})
+                await event_bus.publish(job["user_id"], "job_failed", {"job_id": str(job["_id"]), "kind": kind,
+                                                                       "error": error})
+            return
+        finally:
+            renew.cancel()
+            JOB_SECONDS.observe(asyncio.get_running_loop().time() - started, kind=kind)
+
+        if await self._finish(job, {"status": "succeeded", "result": result, "error": None}, unset_active=True):
+            JOBS_TOTAL.inc(kind=kind, outcome="succeeded")
+            await event_bus.publish(job["user_id"], "job_completed", {"job_id": str(job["_id"]), "kind": kind})
+        else:
+            # Lease expired and another worker took over; its result wins
+            logger.warning("job_lease_lost", extra={"job_id": str(job["_id"]), "kind": kind})
+
+    async def _run(self, slot: int) -> None:
+        while True:
+            try:
+                job = await self.claim()
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOBS_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self.process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("job_worker_error", extra={"slot": slot})
+                await asyncio.sleep(settings.JOBS_POLL_SECONDS)
+
+
+job_worker = JobWorker()
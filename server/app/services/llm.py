@@ -0,0 +1,356 @@
+"""Pluggable LLM backends with circuit-breaker failover.
+
+LLM_BACKEND selects the primary backend and LLM_FALLBACK an optional second
+one:
+
+    groq   Groq's OpenAI-compatible chat completions API (default)
+    local  a causal LM on this host's CPU (LLM_LOCAL_MODEL, Qwen2.5-1.5B-Instruct
+           by default), batching concurrent prompts into padded generate() calls
+
+With a fallback configured, a CircuitBreaker watches the primary's recent
+calls. Once their error rate or median latency crosses the configured limits
+it opens and requests go straight to the fallback. After
+LLM_BREAKER_COOLDOWN_SECONDS a single trial call is let through to decide
+whether to close it again.
+
+Every request names a tier (plan, chat, summary); the local backend caps
+max_new_tokens per tier so a short chat answer never waits on a full plan.
+"""
+import asyncio
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import (
+    Counter, Histogram, LLM_REQUEST_SECONDS, LLM_TOKENS_TOTAL, register_collector,
+)
+
+logger = get_logger(__name__)
+
+# Groq API settings
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROQ_MODEL = "openai/gpt-oss-20b"
+
+LLM_FAILOVERS_TOTAL = Counter("llm_failovers_total", "Requests served by the fallback LLM backend", ("reason",))
+LLM_BATCH_SIZE = Histogram(
+    "llm_local_batch_size", "Prompts per local generate() call", buckets=(1, 2, 4, 8, 16, 32))
+
+Messages = List[Dict[str, str]]
+
+
+def tier_max_new_tokens(tier: str) -> int:
+    return {
+        "plan": settings.LLM_LOCAL_MAX_NEW_TOKENS_PLAN,
+        "summary": settings.LLM_LOCAL_MAX_NEW_TOKENS_SUMMARY,
+    }.get(tier, settings.LLM_LOCAL_MAX_NEW_TOKENS_CHAT)
+
+
+class LLMBackend:
+    name = "base"
+
+    async def complete(self, messages: Messages, max_tokens: Optional[int] = None, tier: str = "chat") -> str:
+        """Return the assistant reply to `messages`."""
+        raise NotImplementedError
+
+
+class GroqBackend(LLMBackend):
+    name = "groq"
+
+    async def complete(self, messages, max_tokens=None, tier="chat"):
+        def _generate():
+            headers = {
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            }
+            data = {"model": GROQ_MODEL, "messages": messages}
+            if max_tokens:
+                data["max_tokens"] = max_tokens
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                response = requests.post(GROQ_API_URL, headers=headers, json=data,
+                                         timeout=settings.LLM_REMOTE_TIMEOUT_SECONDS)
+                response.raise_for_status()
+                res_json = response.json()
+                outcome = "ok"
+            finally:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider="groq", outcome=outcome)
+            usage = res_json.get("usage") or {}
+            LLM_TOKENS_TOTAL.inc(usage.get("prompt_tokens", 0), provider="groq", kind="prompt")
+            LLM_TOKENS_TOTAL.inc(usage.get("completion_tokens", 0), provider="groq", kind="completion")
+            return res_json["choices"][0]["message"]["content"]
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, _generate)
+
+
+def _load_causal_lm(model_id: str):
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id, use_fast=True)
+    model = AutoModelForCausalLM.from_pretrained(model_id)
+    model.eval()
+    return tokenizer, model
+
+
+class LocalBackend(LLMBackend):
+    """CPU causal LM; concurrent requests are batched into one padded generate() call.
+
+    Requests arriving within LLM_LOCAL_BATCH_WAIT_MS of each other (up to
+    LLM_LOCAL_MAX_BATCH) share a call; within a batch, requests are grouped
+    by their max_new_tokens so each group stops at its own cap.
+    """
+
+    name = "local"
+
+    def __init__(self, model_id: Optional[str] = None, loader=None):
+        self.model_id = model_id or settings.LLM_LOCAL_MODEL
+        self._loader = loader or (lambda: _load_causal_lm(self.model_id))
+        self._loaded = None
+        self._load_lock = threading.Lock()
+        # One generate() at a time: it already uses every core through torch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-llm")
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+
+    def _load(self):
+        if self._loaded is None:
+            with self._load_lock:
+                if self._loaded is None:
+                    tokenizer, model = self._loader()
+                    tokenizer.padding_side = "left"
+                    tokenizer.truncation_side = "left"
+                    if tokenizer.pad_token is None:
+                        tokenizer.pad_token = tokenizer.eos_token
+                    self._loaded = tokenizer, model
+                    logger.info("local_llm_loaded", extra={"model": self.model_id})
+        return self._loaded
+
+    @staticmethod
+    def _format(tokenizer, messages: Messages) -> str:
+        if getattr(tokenizer, "chat_template", None):
+            return tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        lines = [f"{m['role'].capitalize()}: {m['content']}" for m in messages]
+        return "\n".join(lines) + "\nAssistant:"
+
+    def _generate(self, batch: List[Messages], max_new_tokens: int) -> List[str]:
+        import torch
+
+        tokenizer, model = self._load()
+        prompts = [self._format(tokenizer, messages) for messages in batch]
+        inputs = tokenizer(prompts, return_tensors="pt", padding=True, truncation=True,
+                           max_length=settings.LLM_LOCAL_MAX_INPUT_TOKENS)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            with torch.inference_mode():
+                outputs = model.generate(
+                    **inputs, max_new_tokens=max_new_tokens, do_sample=False, pad_token_id=tokenizer.pad_token_id)
+            outcome = "ok"
+        finally:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, provider="local", outcome=outcome)
+        new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+        LLM_BATCH_SIZE.observe(len(batch))
+        LLM_TOKENS_TOTAL.inc(int(inputs["attention_mask"].sum()), provider="local", kind="prompt")
+        LLM_TOKENS_TOTAL.inc(int((new_tokens != tokenizer.pad_token_id).sum()), provider="local", kind="completion")
+        return [text.strip() for text in tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+
+    async def complete(self, messages, max_tokens=None, tier="chat"):
+        cap = tier_max_new_tokens(tier)
+        max_new_tokens = min(max_tokens, cap) if max_tokens else cap
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._batch_loop())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((messages, max_new_tokens, future))
+        return await future
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        wait = settings.LLM_LOCAL_BATCH_WAIT_MS / 1000
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + wait
+            while len(batch) < settings.LLM_LOCAL_MAX_BATCH:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: Dict[int, list] = {}
+            for item in batch:
+                groups.setdefault(item[1], []).append(item)
+            for max_new_tokens, items in sorted(groups.items()):
+                try:
+                    texts = await loop.run_in_executor(
+                        self._executor, self._generate, [messages for messages, _, _ in items], max_new_tokens)
+                except Exception as e:
+                    logger.exception("local_llm_generate_failed")
+                    for _, _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, _, future), text in zip(items, texts):
+                    if not future.done():
+                        future.set_result(text)
+
+
+class CircuitBreaker:
+    """Opens when the error rate or median latency over the last `window` calls crosses a limit.
+
+    `allow()` hands out a ticket that the caller passes back to `record()` or `cancel()`: 0 for
+    calls made while closed, or the trial number for the single trial call made when half-open.
+    Only the current trial decides whether the circuit closes; a trial that has not reported
+    within the cooldown is replaced by a new one.
+    """
+
+    def __init__(self, window: int, min_calls: int, max_error_rate: float, max_latency_seconds: float,
+                 cooldown_seconds: float):
+        self.window = window
+        self.min_calls = min_calls
+        self.max_error_rate = max_error_rate
+        self.max_latency_seconds = max_latency_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self._calls: deque = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial = 0
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[int]:
+        """A ticket if the next call may go to the protected backend, else None."""
+        with self._lock:
+            if self.state == "closed":
+                return 0
+            now = time.monotonic()
+            if ((self.state == "open" and now - self._opened_at >= self.cooldown_seconds)
+                    or (self.state == "half_open" and now - self._trial_started_at >= self.cooldown_seconds)):
+                self.state = "half_open"  # exactly one trial call at a time
+                self._trial += 1
+                self._trial_started_at = now
+                return self._trial
+            return None
+
+    def record(self, ticket: int, ok: bool, seconds: float) -> None:
+        with self._lock:
+            if ticket:
+                if self.state != "half_open" or ticket != self._trial:
+                    return  # a trial that was already replaced
+                if ok and seconds < self.max_latency_seconds:
+                    self.state = "closed"
+                    self._calls.clear()
+                    logger.info("llm_circuit_closed")
+                else:
+                    self._open()
+                return
+            # Calls started while closed that finish after the circuit opened say nothing new
+            if self.state != "closed":
+                return
+            self._calls.append((ok, seconds))
+            if len(self._calls) < self.min_calls:
+                return
+            error_rate = sum(1 for success, _ in self._calls if not success) / len(self._calls)
+            median = statistics.median(s for _, s in self._calls)
+            if error_rate >= self.max_error_rate or median >= self.max_latency_seconds:
+                self._open()
+                logger.warning("llm_circuit_opened", extra={
+                    "error_rate": round(error_rate, 3), "median_seconds": round(median, 3)})
+
+    def cancel(self, ticket: int) -> None:
+        """The call was cancelled before it finished; a cancelled trial re-opens the circuit."""
+        with self._lock:
+            if ticket and self.state == "half_open" and ticket == self._trial:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+
+
+class FailoverBackend(LLMBackend):
+    """Primary backend behind a circuit breaker, with a fallback when it errors or the circuit is open."""
+
+    name = "failover"
+
+    def __init__(self, primary: LLMBackend, fallback: LLMBackend, breaker: CircuitBreaker):
+        self.primary = primary
+        self.fallback = fallback
+        self.breaker = breaker
+
+    async def complete(self, messages, max_tokens=None, tier="chat"):
+        ticket = self.breaker.allow()
+        if ticket is None:
+            LLM_FAILOVERS_TOTAL.inc(reason="circuit_open")
+            return await self.fallback.complete(messages, max_tokens=max_tokens, tier=tier)
+        start = time.perf_counter()
+        try:
+            text = await self.primary.complete(messages, max_tokens=max_tokens, tier=tier)
+        except Exception as e:
+            self.breaker.record(ticket, False, time.perf_counter() - start)
+            logger.warning("llm_failover", extra={"primary": self.primary.name, "error": str(e)})
+            LLM_FAILOVERS_TOTAL.inc(reason="error")
+            return await self.fallback.complete(messages, max_tokens=max_tokens, tier=tier)
+        except BaseException:
+            # Cancelled (client gone, shutdown): not a backend failure, but a trial must not stay pending
+            self.breaker.cancel(ticket)
+            raise
+        self.breaker.record(ticket, True, time.perf_counter() - start)
+        return text
+
+
+def build_backend(name: str) -> LLMBackend:
+    if name == "local":
+        return LocalBackend()
+    if name == "groq":
+        return GroqBackend()
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+
+_llm: Optional[LLMBackend] = None
+_llm_lock = threading.Lock()
+
+
+def get_llm() -> LLMBackend:
+    """The configured backend, wrapped in FailoverBackend when LLM_FALLBACK is set."""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                backend = build_backend(settings.LLM_BACKEND)
+                if settings.LLM_FALLBACK not in ("", "none"):
+                    backend = FailoverBackend(backend, build_backend(settings.LLM_FALLBACK), CircuitBreaker(
+                        window=settings.LLM_BREAKER_WINDOW,
+                        min_calls=settings.LLM_BREAKER_MIN_CALLS,
+                        max_error_rate=settings.LLM_BREAKER_ERROR_RATE,
+                        max_latency_seconds=settings.LLM_BREAKER_LATENCY_SECONDS,
+                        cooldown_seconds=settings.LLM_BREAKER_COOLDOWN_SECONDS,
+                    ))
+                _llm = backend
+    return _llm
+
+
+def set_llm(backend: Optional[LLMBackend]) -> None:
+    """Replace the process-wide backend (benchmarks and offline runs)."""
+    global _llm
+    _llm = backend
+
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+register_collector(lambda: [(
+    "llm_circuit_state", "gauge", "LLM circuit breaker state (0 closed, 1 half-open, 2 open)",
+    [({}, _BREAKER_STATES[_llm.breaker.state])] if isinstance(_llm, FailoverBackend) else [],
+)])
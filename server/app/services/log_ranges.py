@@ -0,0 +1,66 @@
+"""Date-range reads of daily food and workout logs.
+
+One indexed query on (user_id, date) replaces a request per day. `fields`
+selects the projection:
+
+    totals   date, id and the day's totals (calendar and chart views)
+    full     the whole day, including every food or workout entry
+
+Rows come back in date order; days without a log are omitted.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.db.mongodb import get_database
+
+COLLECTIONS = {"food": "food_logs", "workout": "workout_logs"}
+FIELDS = ("totals", "full")
+
+_PROJECTIONS: Dict[Tuple[str, str], Dict[str, Any]] = {
+    ("food", "totals"): {"date": 1, "total_macros": 1, "water_ml": 1},
+    ("food", "full"): {"date": 1, "meals": 1, "total_macros": 1, "water_ml": 1, "created_at": 1, "updated_at": 1},
+    ("workout", "totals"): {
+        "date": 1, "total_sets": 1, "total_reps": 1, "total_weight": 1, "total_duration": 1,
+        "workout_count": {"$size": {"$ifNull": ["$workouts", []]}},
+    },
+    ("workout", "full"): {
+        "date": 1, "workouts": 1, "total_sets": 1, "total_reps": 1, "total_weight": 1, "total_duration": 1,
+        "created_at": 1, "updated_at": 1,
+    },
+}
+
+
+def validate_range(start: date, end: date) -> None:
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
+    if (end - start).days + 1 > settings.LOG_RANGE_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Ranges are limited to {settings.LOG_RANGE_MAX_DAYS} days"
+        )
+
+
+def _row(doc: dict) -> dict:
+    doc["id"] = str(doc.pop("_id"))
+    if isinstance(doc.get("date"), datetime):
+        doc["date"] = doc["date"].date()
+    return doc
+
+
+async def iter_daily_logs(kind: str, user_id: str, start: date, end: date,
+                          fields: str = "totals") -> AsyncIterator[dict]:
+    """Yield the user's `kind` ("food" or "workout") logs from `start` to `end` inclusive."""
+    query = {
+        "user_id": user_id,
+        "date": {"$gte": datetime.combine(start, time.min), "$lt": datetime.combine(end + timedelta(days=1), time.min)},
+    }
+    cursor = get_database()[COLLECTIONS[kind]].find(query, _PROJECTIONS[(kind, fields)])
+    cursor = cursor.sort("date", 1).batch_size(settings.LOG_RANGE_BATCH_SIZE)
+    async for doc in cursor:
+        yield _row(doc)
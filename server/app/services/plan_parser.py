@@ -0,0 +1,185 @@
+"""Parse generated plan text into structured sections.
+
+Plans follow the layout requested by `build_plan_prompt`: `---`-separated
+sections with an emoji header line, day sub-headers such as `**Monday 🥗**`,
+and `• Label: value` bullets. LLM output drifts from that layout (markdown
+headings, `-` bullets, missing separators), so headers are recognised by
+keyword and bullets by their `label:` prefix. The parsed form:
+
+    version     SECTIONS_VERSION; stored plans with an older version are re-parsed
+    snapshot    list of summary lines
+    targets     {"calories": "2200 kcal", "protein": "140 g (25%)", ...}
+    meals       {"monday": {"breakfast": ..., "lunch": ..., "dinner": ..., "snack": ...}, ...}
+    workouts    {"monday": {"focus": ..., "exercises": ..., "sets_reps": ..., "rest": ..., "coach_tip": ...}, ...}
+    tips        list of hydration and safety tips
+    variations  {"beginner_version": ..., "advanced_version": ...}
+
+Sections that are missing from the text are left empty.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+SECTIONS_VERSION = 1
+
+DAYS = ("sunday", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday")
+
+# Header keyword -> section, checked in order
+_SECTION_KEYWORDS = (
+    ("snapshot", "snapshot"),
+    ("target", "targets"),
+    ("meal", "meals"),
+    ("workout", "workouts"),
+    ("training", "workouts"),
+    ("hydration", "tips"),
+    ("safety", "tips"),
+    ("tip", "tips"),
+    ("variation", "variations"),
+    ("profile", "profile"),
+)
+
+_KEY_ALIASES = {
+    "snacks": "snack",
+    "sets_x_reps": "sets_reps",
+    "sets_reps": "sets_reps",
+    "sets": "sets_reps",
+    "tip": "coach_tip",
+    "fat": "fats",
+}
+
+_BULLET = re.compile(r"^\s*(?:[•\-*▪●◦]|\d+[.)])\s+")
+_DECORATION = re.compile(r"[*_#`>]+")
+_DAY = re.compile(r"\b(" + "|".join(DAYS) + r")\b", re.IGNORECASE)
+
+
+def _clean(text: str) -> str:
+    """Strip markdown emphasis, heading marks and emoji."""
+    text = "".join(c for c in text if unicodedata.category(c) not in ("So", "Cf") and c != "\ufe0f")
+    return re.sub(r"\s{2,}", " ", _DECORATION.sub("", text)).strip()
+
+
+def _slug(label: str) -> str:
+    words = re.findall(r"[a-z0-9]+", label.lower())
+    key = "_".join(words)
+    return _KEY_ALIASES.get(key, key)
+
+
+def _section_for_header(line: str) -> Optional[str]:
+    """The section a header line opens, or None if `line` is not a section header."""
+    text = _clean(line)
+    letters = re.sub(r"[^A-Za-z ]", "", text).strip()
+    if not letters or _BULLET.match(line) or ":" in text.rstrip(":"):
+        return None
+    # Section headers are upper case (or markdown headings); day headers are not
+    if not (letters.isupper() or line.lstrip().startswith("#")):
+        return None
+    lowered = letters.lower()
+    for keyword, section in _SECTION_KEYWORDS:
+        if keyword in lowered:
+            return section
+    return None
+
+
+def _day_for_header(line: str) -> Optional[str]:
+    """The weekday a day sub-header names (`**Monday 🥗**`, `### Monday - Push`, `Monday:`)."""
+    if _BULLET.match(line):
+        return None
+    text = _clean(line).rstrip(":")
+    match = _DAY.search(text)
+    if not match or len(text) > 60 or (":" in text and not text.lower().startswith(match.group(1).lower())):
+        return None
+    return match.group(1).lower()
+
+
+def _split_bullet(line: str):
+    """`• Breakfast 🍳: Oats` -> ("breakfast", "Oats"); plain lines give (None, text)."""
+    text = _clean(_BULLET.sub("", line, count=1))
+    if ":" in text:
+        label, value = text.split(":", 1)
+        key = _slug(label)
+        if key and len(label) <= 40:
+            return key, value.strip()
+    return None, text
+
+
+def _add(entries: Dict[str, str], key: str, value: str, sep: str = "; ") -> None:
+    if entries.get(key):
+        entries[key] = f"{entries[key]}{sep}{value}" if value else entries[key]
+    else:
+        entries[key] = value
+
+
+def _parse_entries(lines: List[str]) -> Dict[str, str]:
+    """Label: value bullets; indented or unlabelled lines continue the previous entry
+    (sub-bullets joined with "; ", wrapped lines with a space)."""
+    entries: Dict[str, str] = {}
+    last = None
+    for line in lines:
+        indented = len(line) - len(line.lstrip()) >= 2
+        key, value = _split_bullet(line)
+        if last is not None and (indented or key is None):
+            if value:
+                sep = "; " if _BULLET.match(line) else " "
+                _add(entries, last, _clean(_BULLET.sub("", line, count=1)), sep)
+            continue
+        if key is None:
+            continue
+        _add(entries, key, value)
+        last = key
+    return entries
+
+
+def _parse_days(lines: List[str]) -> Dict[str, Dict[str, str]]:
+    days: Dict[str, List[str]] = {}
+    current = None
+    for line in lines:
+        day = _day_for_header(line)
+        if day is not None:
+            current = day
+            days.setdefault(day, [])
+        elif current is not None:
+            days[current].append(line)
+    return {day: _parse_entries(day_lines) for day, day_lines in days.items()}
+
+
+def _parse_list(lines: List[str]) -> List[str]:
+    """One item per line; numbered labels like `Tip 1:` are dropped."""
+    items = []
+    for line in lines:
+        key, value = _split_bullet(line)
+        if key is not None and not re.fullmatch(r"(coach_)?tip(_\d+)?|\d+", key):
+            value = _clean(_BULLET.sub("", line, count=1))
+        if value:
+            items.append(value)
+    return items
+
+
+def parse_plan(text: str) -> Dict[str, Any]:
+    """Split `text` into the sections described in the module docstring."""
+    blocks: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        if not line.strip() or set(line.strip()) <= set("-=_*"):
+            continue
+        # Day headers come first: "### Monday - Upper body workout" is not a section
+        section = None if _day_for_header(line) else _section_for_header(line)
+        if section is not None:
+            current = section
+            blocks.setdefault(section, [])
+        elif current is not None:
+            blocks[current].append(line)
+
+    return {
+        "version": SECTIONS_VERSION,
+        "snapshot": _parse_list(blocks.get("snapshot", [])),
+        "targets": _parse_entries(blocks.get("targets", [])),
+        "meals": _parse_days(blocks.get("meals", [])),
+        "workouts": _parse_days(blocks.get("workouts", [])),
+        "tips": _parse_list(blocks.get("tips", [])),
+        "variations": _parse_entries(blocks.get("variations", [])),
+    }
+
+
+def day_name(weekday: int) -> str:
+    """Plan day key for a `date.weekday()` value (Monday is 0)."""
+    return DAYS[(weekday + 1) % 7]
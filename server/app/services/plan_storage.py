@@ -0,0 +1,242 @@
+"""Compressed storage for generated plan texts.
+
+Plans are long markdown documents that repeat the same section headers,
+emojis and Sunday-to-Saturday skeleton, so they compress very well with a
+zstd dictionary trained on existing plans. Documents store:
+
+    plan_text_z    compressed bytes
+    plan_codec     "zstd" or "zlib" (stdlib fallback when zstandard is missing)
+    plan_dict_id   zstd dictionary id, or None
+    plan_preview   first PREVIEW_CHARS characters (for list views)
+    plan_length    length of the full text
+    plan_digest    condensed plan for chat prompts (see build_plan_digest)
+    plan_sections  targets, meals and workouts by day, tips (see app.services.plan_parser)
+
+Old documents that still have a plain `plan_text` field are read as-is.
+Maintenance commands (run from the server directory):
+
+    python -m app.services.plan_storage train     # train a dictionary from stored plans
+    python -m app.services.plan_storage migrate   # compress documents that still hold plan_text
+"""
+import asyncio
+import sys
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Any
+
+from bson import Binary, ObjectId
+
+from app.core.config import settings
+from app.db.mongodb import get_database
+from app.services.plan_parser import SECTIONS_VERSION, parse_plan
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PREVIEW_CHARS = 200
+DIGEST_CHARS = 1200
+DIGEST_LINES_PER_SECTION = 6
+
+_dictionaries: Dict[int, Any] = {}
+_active_dict_id: Optional[int] = None
+_compressors: Dict[Optional[int], Any] = {}
+_decompressors: Dict[Optional[int], Any] = {}
+
+
+def _codec() -> str:
+    if settings.PLAN_COMPRESSION == "zstd" and zstandard is None:
+        return "zlib"
+    return settings.PLAN_COMPRESSION
+
+
+def _compressor(dict_id: Optional[int]):
+    if dict_id not in _compressors:
+        kwargs = {"level": settings.PLAN_ZSTD_LEVEL}
+        if dict_id is not None:
+            kwargs["dict_data"] = _dictionaries[dict_id]
+        _compressors[dict_id] = zstandard.ZstdCompressor(**kwargs)
+    return _compressors[dict_id]
+
+
+def _decompressor(dict_id: Optional[int]):
+    if dict_id not in _decompressors:
+        kwargs = {}
+        if dict_id is not None:
+            kwargs["dict_data"] = _dictionaries[dict_id]
+        _decompressors[dict_id] = zstandard.ZstdDecompressor(**kwargs)
+    return _decompressors[dict_id]
+
+
+def build_plan_digest(text: str, max_chars: int = DIGEST_CHARS) -> str:
+    """Condense a plan for chat prompts: each section's header and first bullets."""
+    lines = []
+    for section in text.split("---"):
+        section_lines = [line.strip() for line in section.splitlines() if line.strip()]
+        lines.extend(section_lines[:DIGEST_LINES_PER_SECTION])
+    return "\n".join(lines)[:max_chars]
+
+
+def encode_plan_text(text: str) -> Dict[str, Any]:
+    """Return the document fields used to store `text`."""
+    fields: Dict[str, Any] = {
+        "plan_preview": text[:PREVIEW_CHARS],
+        "plan_length": len(text),
+        "plan_digest": build_plan_digest(text),
+        "plan_sections": parse_plan(text),
+    }
+    codec = _codec()
+    raw = text.encode("utf-8")
+    if codec == "zstd":
+        fields["plan_text_z"] = Binary(_compressor(_active_dict_id).compress(raw))
+        fields["plan_codec"] = "zstd"
+        fields["plan_dict_id"] = _active_dict_id
+    elif codec == "zlib":
+        fields["plan_text_z"] = Binary(zlib.compress(raw, 9))
+        fields["plan_codec"] = "zlib"
+        fields["plan_dict_id"] = None
+    else:
+        fields["plan_text"] = text
+    return fields
+
+
+async def _ensure_dictionary(dict_id: int) -> None:
+    if dict_id in _dictionaries:
+        return
+    doc = await get_database()["plan_dictionaries"].find_one({"_id": dict_id})
+    if not doc:
+        raise ValueError(f"Missing plan compression dictionary {dict_id}")
+    _dictionaries[dict_id] = zstandard.ZstdCompressionDict(bytes(doc["data"]))
+
+
+async def read_plan_text(plan: dict) -> str:
+    """Return the full plan text of a plan document, decompressing if needed."""
+    if "plan_text" in plan:
+        return plan["plan_text"]
+    blob = plan.get("plan_text_z")
+    if blob is None:
+        return ""
+    codec = plan.get("plan_codec")
+    if codec == "zlib":
+        return zlib.decompress(bytes(blob)).decode("utf-8")
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed plans")
+        dict_id = plan.get("plan_dict_id")
+        if dict_id is not None:
+            await _ensure_dictionary(dict_id)
+        return _decompressor(dict_id).decompress(bytes(blob)).decode("utf-8")
+    raise ValueError(f"Unknown plan codec: {codec}")
+
+
+async def load_plan_sections(user_id: str, plan_id: ObjectId,
+                             paths: Optional[Iterable[str]] = None) -> Optional[dict]:
+    """Return the plan's version fields and `plan_sections` (only `paths` below it, if given).
+
+    Plans saved before sections were parsed, or by an older parser, are parsed
+    once here and updated.
+    """
+    plans = get_database()["plans"]
+    projection: Dict[str, Any] = {"created_at": 1, "updated_at": 1}
+    if paths is None:
+        projection["plan_sections"] = 1
+    else:
+        projection["plan_sections.version"] = 1
+        projection.update({f"plan_sections.{path}": 1 for path in paths})
+    plan = await plans.find_one({"_id": plan_id, "user_id": user_id}, projection)
+    if plan is None:
+        return None
+    if (plan.get("plan_sections") or {}).get("version") != SECTIONS_VERSION:
+        full = await plans.find_one({"_id": plan_id})
+        sections = parse_plan(await read_plan_text(full))
+        await plans.update_one({"_id": plan_id}, {"$set": {"plan_sections": sections}})
+        plan["plan_sections"] = sections
+    return plan
+
+
+async def load_dictionaries() -> None:
+    """Load trained dictionaries and select the newest one for compression."""
+    global _active_dict_id
+    if zstandard is None:
+        return
+    cursor = get_database()["plan_dictionaries"].find({}).sort("created_at", 1)
+    async for doc in cursor:
+        _dictionaries[doc["_id"]] = zstandard.ZstdCompressionDict(bytes(doc["data"]))
+        _active_dict_id = doc["_id"]
+    _compressors.clear()
+
+
+async def train_dictionary(max_samples: int = 2000) -> Optional[int]:
+    """Train a zstd dictionary from stored plans and make it the active one."""
+    global _active_dict_id
+    if zstandard is None:
+        print("zstandard is not installed; nothing to train")
+        return None
+
+    samples = []
+    cursor = get_database()["plans"].find({}, {"plan_text": 1, "plan_text_z": 1, "plan_codec": 1, "plan_dict_id": 1})
+    cursor = cursor.sort("created_at", -1).limit(max_samples)
+    async for plan in cursor:
+        text = await read_plan_text(plan)
+        if text:
+            samples.append(text.encode("utf-8"))
+    if len(samples) < 10:
+        print(f"Only {len(samples)} plans found; need at least 10 to train a dictionary")
+        return None
+
+    trained = zstandard.train_dictionary(settings.PLAN_DICT_SIZE, samples)
+    dict_id = trained.dict_id()
+    await get_database()["plan_dictionaries"].update_one(
+        {"_id": dict_id},
+        {"$set": {"data": Binary(trained.as_bytes()), "samples": len(samples), "created_at": datetime.utcnow()}},
+        upsert=True
+    )
+    _dictionaries[dict_id] = trained
+    _active_dict_id = dict_id
+    print(f"Trained dictionary {dict_id} from {len(samples)} plans")
+    return dict_id
+
+
+async def migrate(batch_size: int = 200, recompress: bool = False) -> int:
+    """Compress plans that still store plain text (or all plans with `recompress`)."""
+    plans = get_database()["plans"]
+    query = {} if recompress else {"plan_text": {"$exists": True}}
+    migrated = 0
+    before = 0
+    after = 0
+    cursor = plans.find(query).batch_size(batch_size)
+    async for plan in cursor:
+        text = await read_plan_text(plan)
+        fields = encode_plan_text(text)
+        if "plan_text" in fields:
+            continue
+        before += len(text.encode("utf-8"))
+        after += len(fields["plan_text_z"])
+        await plans.update_one({"_id": plan["_id"]}, {"$set": fields, "$unset": {"plan_text": ""}})
+        migrated += 1
+    ratio = (before / after) if after else 0
+    print(f"Compressed {migrated} plans: {before} -> {after} bytes ({ratio:.1f}x)")
+    return migrated
+
+
+async def _main(command: str) -> None:
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        await load_dictionaries()
+        if command == "train":
+            await train_dictionary()
+        elif command == "migrate":
+            await migrate()
+        elif command == "recompress":
+            await migrate(recompress=True)
+        else:
+            print("usage: python -m app.services.plan_storage [train|migrate|recompress]")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else ""))
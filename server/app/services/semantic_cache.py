@@ -0,0 +1,253 @@
+"""Semantic answer cache for /api/ai/chat.
+
+Questions are embedded (a small sentence-transformers model, or the
+deterministic HashingEmbedder) and looked up in a per-scope NumPy index of
+previously answered questions. A match with cosine similarity >=
+SEMANTIC_CACHE_THRESHOLD is served without calling the LLM.
+
+Cached answers are shared between users, so they are generated from the
+scope alone: the plan's goal, body type and daily targets (see
+`scope_context`), never the user's plan digest, profile or history. Only the
+first message of a session, with no summary or earlier turns, is cached or
+served from the cache (see `is_standalone`), and in a plan session only if it
+doesn't ask about the user's own plan or schedule (see `asks_about_plan`);
+those are answered from the full plan digest.
+
+Each scope holds at most SEMANTIC_CACHE_MAX_ENTRIES answers; the least
+recently used are evicted first and entries expire after
+SEMANTIC_CACHE_TTL_SECONDS. The index is per process.
+"""
+import json
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import Counter, Histogram, register_collector
+
+logger = get_logger(__name__)
+
+LOOKUPS_TOTAL = Counter("semantic_cache_lookups_total", "Chat semantic cache lookups by outcome", ("outcome",))
+HIT_SIMILARITY = Histogram(
+    "semantic_cache_hit_similarity", "Cosine similarity of served cache hits",
+    buckets=(0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 0.99, 1.0))
+
+_STOPWORDS = frozenset("a an the i me my to of for in on and or is are be do does should can could would".split())
+
+
+class HashingEmbedder:
+    """Deterministic bag of words and bigrams, hashed into `dim` signed buckets."""
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in _STOPWORDS]
+        features = [(w, 1.0) for w in words]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += weight if (h >> 31) & 1 else -weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceEmbedder:
+    """Small CPU sentence-transformers model (all-MiniLM-L6-v2 by default)."""
+
+    name = "sentence"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def build_embedder(spec: str):
+    """`hashing`, or a sentence-transformers model name; falls back to hashing if unavailable."""
+    if spec == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceEmbedder(spec)
+    except Exception as e:
+        logger.warning("semantic_cache_embedder_fallback", extra={"requested": spec, "error": str(e)})
+        return HashingEmbedder()
+
+
+class _ScopeIndex:
+    """Dense matrix of unit vectors plus parallel entry metadata for one scope."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.questions: List[str] = []
+        self.answers: List[str] = []
+        self.created: List[float] = []
+        self.last_used: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def search(self, vector: np.ndarray) -> Tuple[int, float]:
+        if not len(self):
+            return -1, 0.0
+        scores = self.vectors @ vector
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    def add(self, vector: np.ndarray, question: str, answer: str, now: float) -> None:
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+        self.questions.append(question)
+        self.answers.append(answer)
+        self.created.append(now)
+        self.last_used.append(now)
+
+    def remove(self, indices: List[int]) -> None:
+        drop = set(indices)
+        keep = [i for i in range(len(self)) if i not in drop]
+        self.vectors = self.vectors[keep]
+        for name in ("questions", "answers", "created", "last_used"):
+            values = getattr(self, name)
+            setattr(self, name, [values[i] for i in keep])
+
+
+class SemanticCache:
+    def __init__(self, embedder, threshold: float, max_entries: int, ttl: float):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        return self.embedder.embed([text])[0]
+
+    def lookup(self, scope: str, question: str) -> Optional[str]:
+        vector = self._embed(question)
+        now = time.monotonic()
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                LOOKUPS_TOTAL.inc(outcome="miss")
+                return None
+            best, score = index.search(vector)
+            if best < 0 or score < self.threshold:
+                LOOKUPS_TOTAL.inc(outcome="miss")
+                return None
+            if now - index.created[best] > self.ttl:
+                index.remove([best])
+                LOOKUPS_TOTAL.inc(outcome="miss")
+                return None
+            index.last_used[best] = now
+            LOOKUPS_TOTAL.inc(outcome="hit")
+            HIT_SIMILARITY.observe(score)
+            return index.answers[best]
+
+    def store(self, scope: str, question: str, answer: str) -> None:
+        vector = self._embed(question)
+        now = time.monotonic()
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                index = self._scopes[scope] = _ScopeIndex(vector.shape[0])
+            expired = [i for i, created in enumerate(index.created) if now - created > self.ttl]
+            if expired:
+                index.remove(expired)
+            best, score = index.search(vector)
+            if best >= 0 and score >= self.threshold:
+                return  # an equivalent question is already cached
+            if len(index) >= self.max_entries:
+                index.remove([int(np.argmin(index.last_used))])
+            index.add(vector, question, answer, now)
+
+    def size(self) -> int:
+        return sum(len(index) for index in self._scopes.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scopes.clear()
+
+
+def plan_scope(plan: Optional[Dict[str, Any]]) -> str:
+    """Cache scope for a plan context: goal, body type and a hash of its targets ("general" without a plan)."""
+    if not plan:
+        return "general"
+    goal = str((plan.get("user_inputs") or {}).get("goal") or "any").strip().lower()
+    label = (plan.get("classifier_label") or "any").strip().lower()
+    targets = json.dumps(plan.get("targets") or {}, sort_keys=True).encode("utf-8")
+    return f"{goal}|{label}|{zlib.crc32(targets):08x}"
+
+
+def scope_context(plan: Optional[Dict[str, Any]]) -> str:
+    """System prompt addition for cacheable answers; contains only what `plan_scope` keys on."""
+    if not plan:
+        return ""
+    goal = (plan.get("user_inputs") or {}).get("goal") or "not specified"
+    lines = [f"\nThe user has a personalized plan. Goal: {goal}. Body type: {plan.get('classifier_label') or 'unknown'}."]
+    targets = plan.get("targets") or {}
+    if targets:
+        lines.append("Daily targets: " + ", ".join(f"{k}: {v}" for k, v in sorted(targets.items())))
+    return "\n".join(lines)
+
+
+# First-person words, plan and schedule terms and weekdays mark questions whose answer depends on
+# the user's own plan ("what's my Monday workout?") rather than on their goal and body type
+_PLAN_REFERENCE = re.compile(
+    r"\b(i|i'?m|i'?ve|i'?ll|me|my|mine|myself|we|our|us|plan|plans|schedule|program|routine|today|"
+    r"tomorrow|tonight|yesterday|week|weekly|day|days|monday|tuesday|wednesday|thursday|friday|"
+    r"saturday|sunday)\b",
+    re.IGNORECASE,
+)
+
+
+def asks_about_plan(message: str) -> bool:
+    """True when the question refers to the user or their plan, so a scope-level answer won't do."""
+    return _PLAN_REFERENCE.search(message) is not None
+
+
+def is_standalone(session: dict) -> bool:
+    """True when the prompt would carry no per-user history: no summary and no earlier turns."""
+    return not session["summary"] and not session["turns"]
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticCache]:
+    """The process-wide cache, or None when SEMANTIC_CACHE_ENABLED is off."""
+    global _cache
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(
+                    build_embedder(settings.SEMANTIC_CACHE_EMBEDDER),
+                    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                    max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+                    ttl=settings.SEMANTIC_CACHE_TTL_SECONDS,
+                )
+    return _cache
+
+
+register_collector(lambda: [(
+    "semantic_cache_entries", "gauge", "Answers held by the chat semantic cache",
+    [({}, _cache.size() if _cache is not None else 0)],
+)])
@@ -0,0 +1,52 @@
+from typing import Optional, Dict, Any
+from bson import ObjectId
+from fastapi import Depends, Request
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import get_current_user_id
+from app.db.mongodb import get_database
+
+# Short-lived cross-request cache of user documents keyed by the token subject.
+_user_cache = TTLCache("users", maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+def user_query(user_id: str) -> Dict[str, Any]:
+    """Return the single canonical query for a user id.
+
+    Users created through signup have an ObjectId `_id` and the token subject is
+    its hex string. Anything else is treated as a legacy external `user_id`.
+    """
+    if ObjectId.is_valid(user_id):
+        return {"_id": ObjectId(user_id)}
+    return {"user_id": user_id}
+
+
+async def load_user(user_id: str, request: Optional[Request] = None) -> Optional[dict]:
+    """Load a user document once per request, backed by a short TTL cache.
+
+    The returned document is shared; callers must treat it as read-only.
+    """
+    if request is not None and getattr(request.state, "user_doc_id", None) == user_id:
+        return request.state.user_doc
+
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = await get_database()["users"].find_one(user_query(user_id))
+        if user is not None:
+            _user_cache.set(user_id, user)
+
+    if request is not None:
+        request.state.user_doc_id = user_id
+        request.state.user_doc = user
+    return user
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drop a cached user document after it has been modified."""
+    _user_cache.pop(user_id)
+
+
+async def get_current_user(request: Request, user_id: str = Depends(get_current_user_id)) -> Optional[dict]:
+    """FastAPI dependency returning the authenticated user's document (or None)."""
+    return await load_user(user_id, request)
@@ -5,6 +5,7 @@ from typing import Optional, List
 
 from app.core.config import settings
 from app.db.mongodb import get_database
+from app.services.event_bus import event_bus
 
 
 async def exchange_code_for_token(code: str) -> dict:
@@ -112,6 +113,13 @@ async def run_daily_sync_loop(app):
             }
 
             await summary_coll.update_one({"user_id": user_id, "date": d.isoformat()}, {"$set": normalized}, upsert=True)
+            await event_bus.publish(user_id, "sync_completed", {
+                "source": "wearable",
+                "date": d.isoformat(),
+                "steps": normalized["steps"],
+                "sleep_minutes": normalized["sleep_minutes"],
+                "active_minutes": normalized["active_minutes"]
+            })
 
             # Update last_synced_at on token doc for quick status lookup
             try:
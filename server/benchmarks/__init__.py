@@ -0,0 +1,2 @@
+# Offline micro-benchmarks and load tests for the FitAI API.
+# Run from the server directory, e.g. `python -m benchmarks.bench_auth`.
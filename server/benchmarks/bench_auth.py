@@ -0,0 +1,51 @@
+"""Micro-benchmark of per-request auth overhead (get_current_user_id -> verify_token).
+
+Compares a full JWT decode on every call (cold) with the verified-token
+cache (warm), for each available JWT backend.
+
+    python -m benchmarks.bench_auth --iterations 20000
+"""
+import argparse
+import json
+import time
+
+from app.core import security
+from app.core.config import settings
+
+
+def _time_calls(token: str, iterations: int, clear_cache: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if clear_cache:
+            security._token_cache.clear()
+        security.verify_token(token)
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = security.create_access_token({"sub": "64b7f0c2a1b2c3d4e5f60718"})
+
+    backends = ["jose"] + (["pyjwt"] if security.pyjwt is not None else [])
+    original = settings.JWT_BACKEND
+    results = {}
+    try:
+        for backend in backends:
+            settings.JWT_BACKEND = backend
+            results[backend] = {
+                "decode_every_call_us": round(_time_calls(token, args.iterations, True), 2),
+                "cached_us": round(_time_calls(token, args.iterations, False), 2),
+            }
+    finally:
+        settings.JWT_BACKEND = original
+        security._token_cache.clear()
+
+    print(json.dumps({"iterations": args.iterations, "per_call": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
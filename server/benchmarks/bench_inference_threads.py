@@ -0,0 +1,117 @@
+"""Sweep inference concurrency settings: pool workers x torch threads per call.
+
+Each configuration runs in a fresh subprocess (torch thread pools can only
+be sized once per process) and drives analyze_image() with --concurrency
+simultaneous uploads through the bounded inference pool, reporting
+throughput, p50/p95 latency and 503 rejections.
+
+    python -m benchmarks.bench_inference_threads --workers 1 2 4 8 --threads 1 2 4 --concurrency 32
+
+Uses the real checkpoints by default; --tiny swaps in the random-weight
+models from benchmarks.stubs (useful to check the harness, not for tuning).
+Run it on hardware shaped like production: the best setting depends on the
+core count and on what else the pod runs.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def _drive(args) -> dict:
+    from fastapi import HTTPException
+
+    from app.services import ai_service
+    from benchmarks.stubs import install_tiny_models, make_test_image
+
+    if args.tiny:
+        install_tiny_models()
+    images = [make_test_image(size=args.image_size, seed=i) for i in range(8)]
+    await ai_service.analyze_image(images[0])  # load models, size thread pools
+
+    latencies, rejected = [], 0
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        queue.put_nowait(images[i % len(images)])
+
+    async def worker():
+        nonlocal rejected
+        while not queue.empty():
+            image = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                await ai_service.analyze_image(image)
+                latencies.append(time.perf_counter() - start)
+            except HTTPException:
+                rejected += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "completed": len(latencies),
+        "rejected": rejected,
+        "images_per_second": round(len(latencies) / wall, 2),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1) if latencies else None,
+    }
+
+
+def _run_child(args, workers: int, threads: int) -> dict:
+    env = dict(os.environ,
+               INFERENCE_WORKERS=str(workers),
+               INFERENCE_INTRA_OP_THREADS=str(threads),
+               INFERENCE_INTEROP_THREADS=str(args.interop),
+               INFERENCE_MAX_QUEUE=str(args.max_queue))
+    command = [sys.executable, "-m", "benchmarks.bench_inference_threads", "--child",
+               "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+               "--image-size", str(args.image_size)] + (["--tiny"] if args.tiny else [])
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--interop", type=int, default=1)
+    parser.add_argument("--max-queue", type=int, default=1000, help="INFERENCE_MAX_QUEUE (lower it to test 503s)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--image-size", type=int, default=1024, help="side of the synthetic JPEG uploads")
+    parser.add_argument("--tiny", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_drive(args))))
+        return
+
+    results = []
+    for workers, threads in itertools.product(args.workers, args.threads):
+        result = {"workers": workers, "intra_op_threads": threads, **_run_child(args, workers, threads)}
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    best = max(results, key=lambda r: r["images_per_second"])
+    report = {"cpu_count": os.cpu_count(), "concurrency": args.concurrency, "results": results, "best": best}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
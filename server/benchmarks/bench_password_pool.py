@@ -0,0 +1,83 @@
+"""Load test: event-loop latency under a burst of concurrent logins.
+
+A heartbeat task sleeps for a fixed tick and records how late it wakes up.
+The burst is run twice: with bcrypt called inline on the loop (the old
+behaviour) and through the bounded password pool. With the pool the lag
+stays close to zero regardless of the number of concurrent logins.
+
+    python -m benchmarks.bench_password_pool --logins 64
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi import HTTPException
+
+from app.core import security
+
+TICK = 0.005
+
+
+async def _heartbeat(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - start - TICK) * 1000)
+
+
+async def _burst(hashed: str, logins: int, pooled: bool) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(_heartbeat(lags, stop))
+    rejected = 0
+
+    async def _login():
+        nonlocal rejected
+        if pooled:
+            try:
+                await security.verify_password_async("hunter22", hashed)
+            except HTTPException:
+                rejected += 1
+        else:
+            security.verify_password("hunter22", hashed)
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[_login() for _ in range(logins)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+
+    lags.sort()
+    return {
+        "logins": logins,
+        "rejected": rejected,
+        "wall_seconds": round(elapsed, 3),
+        "loop_lag_ms_p50": round(statistics.median(lags), 2) if lags else None,
+        "loop_lag_ms_p99": round(lags[int(len(lags) * 0.99) - 1], 2) if lags else None,
+        "loop_lag_ms_max": round(lags[-1], 2) if lags else None,
+        "heartbeats": len(lags),
+    }
+
+
+async def _main(logins: int):
+    hashed = security.get_password_hash("hunter22")
+    inline = await _burst(hashed, logins, pooled=False)
+    pooled = await _burst(hashed, logins, pooled=True)
+    stats = dict(security.password_pool_stats)
+    if stats["calls"]:
+        stats["wait_seconds_avg"] = round(stats["wait_seconds_total"] / stats["calls"], 4)
+    print(json.dumps({"inline": inline, "pooled": pooled, "pool_stats": stats}, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(_main(args.logins))
+
+
+if __name__ == "__main__":
+    main()
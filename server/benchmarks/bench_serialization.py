@@ -0,0 +1,114 @@
+"""Benchmark JSON serialization of the largest API payloads.
+
+Compares, per payload:
+  stdlib        jsonable_encoder + json.dumps (FastAPI's previous default path)
+  orjson        jsonable_encoder + FastJSONResponse (current default class)
+  model_direct  model_response(): pydantic-core dumps the models straight to bytes
+
+    python -m benchmarks.bench_serialization --iterations 200
+"""
+import argparse
+import json
+import time
+from datetime import datetime, date, timedelta
+from typing import Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse, model_response
+from app.models.food import DailyFoodLogResponse, FoodLogEntry
+from app.models.plan import PlanResponse
+from app.models.workout import MuscleGroup
+from app.services.workout_service import get_all_muscle_groups
+
+DAY_BLOCK = """**{day} 🥗**
+• Breakfast 🍳: Greek yogurt with berries and oats
+• Lunch 🍱: Grilled chicken, brown rice and steamed broccoli
+• Dinner 🍽️: Baked salmon with quinoa and roasted vegetables
+• Snack 🍎: Apple with almond butter
+
+**{day} 🏋️**
+• Focus: Upper body strength
+• Exercises: Bench press, rows, overhead press, pull-ups
+• Sets × Reps: 4 × 8-10
+• Rest: 90 seconds
+• Coach Tip ⚡: Control the eccentric and keep your core braced.
+"""
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def _plan_text() -> str:
+    header = "🔥 PLAN SNAPSHOT\n• Lean bulk with progressive overload\n• Adherence difficulty: **6 / 10** 💪\n\n"
+    return header + "\n".join(DAY_BLOCK.format(day=d) for d in DAYS)
+
+
+def _payloads():
+    now = datetime.utcnow()
+    plans = [
+        PlanResponse(
+            id=f"{i:024x}",
+            user_id="64b7f0c2a1b2c3d4e5f60718",
+            user_inputs={"age": 30, "sex": "male", "weight": 80.0, "height_cm": 180.0,
+                         "activity_level": "moderate", "goal": "muscle gain", "diet_prefs": None},
+            classifier_label="Ordinary",
+            plan_text=_plan_text(),
+            created_at=now - timedelta(days=i),
+        )
+        for i in range(100)
+    ]
+    entry = {"food_name": "Chicken breast", "quantity": 150.0, "meal_type": "lunch",
+             "macros": {"calories": 247.5, "protein": 46.5, "carbs": 0.0, "fat": 5.4, "fiber": 0.0},
+             "logged_at": now}
+    daily = DailyFoodLogResponse(
+        id="64b7f0c2a1b2c3d4e5f60719",
+        user_id="64b7f0c2a1b2c3d4e5f60718",
+        date=date.today(),
+        meals={m: [FoodLogEntry(**{**entry, "meal_type": m}) for _ in range(15)]
+               for m in ["breakfast", "lunch", "snacks", "dinner"]},
+        total_macros={"calories": 14850.0, "protein": 2790.0, "carbs": 0.0, "fat": 324.0, "fiber": 0.0},
+        water_ml=2000.0,
+        created_at=now,
+        updated_at=now,
+    )
+    return {
+        "muscle_groups": ({"muscle_groups": get_all_muscle_groups()}, Dict[str, List[MuscleGroup]]),
+        "plans_list_100": (plans, List[PlanResponse]),
+        "daily_food_log_60": (daily, None),
+    }
+
+
+def _bench(fn, iterations: int):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        size = len(fn())
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / iterations
+    return {
+        "ms_per_call": round(per_call * 1000, 3),
+        "calls_per_sec": round(1 / per_call, 1),
+        "mb_per_sec": round(size / per_call / 1e6, 1),
+        "bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    stdlib = JSONResponse(content=None)
+    fast = FastJSONResponse(content=None)
+    results = {}
+    for name, (payload, tp) in _payloads().items():
+        results[name] = {
+            "stdlib": _bench(lambda: stdlib.render(jsonable_encoder(payload)), args.iterations),
+            "orjson": _bench(lambda: fast.render(jsonable_encoder(payload)), args.iterations),
+            "model_direct": _bench(lambda: model_response(payload, tp).body, args.iterations),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Check compiled inference backends against the eager models.
+
+For every input image, runs the body classifier and the ViT regressor through
+the eager backend and each compiled backend, then compares:
+
+  logits        max absolute difference of the classifier logits
+  label         argmax agreement (must be 100%)
+  height / weight  max absolute difference after denormalization (cm / kg)
+
+and reports mean per-image latency per backend as JSON. Exits 1 if any
+backend is outside tolerance.
+
+    python -m benchmarks.check_inference_parity --backends onnx torchscript --images ./samples
+
+`--tiny` swaps in the random-weight models from benchmarks.stubs and exports
+them into a temporary directory first, so the check runs without downloads.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+from typing import Dict, List
+
+import torch
+from PIL import Image
+
+from app.services import inference
+
+
+def load_images(directory: str, samples: int) -> List[bytes]:
+    if directory:
+        names = sorted(n for n in os.listdir(directory) if n.lower().endswith((".jpg", ".jpeg", ".png", ".webp")))
+        images = []
+        for name in names[:samples]:
+            with open(os.path.join(directory, name), "rb") as f:
+                images.append(f.read())
+        return images
+    from benchmarks.stubs import make_test_image
+
+    return [make_test_image(seed=i) for i in range(samples)]
+
+
+def _inputs(images: List[bytes]):
+    from app.services import ai_service
+
+    classifier_processor = ai_service.load_image_processor()
+    regressor_processor = ai_service.load_vit_processor()
+    batches = []
+    for data in images:
+        image = Image.open(BytesIO(data)).convert("RGB")
+        batches.append((
+            classifier_processor(image, return_tensors="pt")["pixel_values"],
+            regressor_processor(images=image, return_tensors="pt")["pixel_values"],
+        ))
+    return batches
+
+
+def _run(backend: inference.VisionBackend, batches) -> Dict[str, object]:
+    stats = backend.dataset_stats()
+    logits, heights, weights = [], [], []
+    start = time.perf_counter()
+    for classifier_input, regressor_input in batches:
+        logits.append(backend.classify(classifier_input))
+        height, weight = backend.regress(regressor_input)
+        heights.append(height.item() * stats["height_std"] + stats["height_mean"])
+        weights.append(weight.item() * stats["weight_std"] + stats["weight_mean"])
+    elapsed = time.perf_counter() - start
+    return {
+        "logits": torch.cat(logits),
+        "heights": torch.tensor(heights),
+        "weights": torch.tensor(weights),
+        "ms_per_image": round(elapsed / len(batches) * 1000, 3),
+    }
+
+
+def compare(reference: Dict[str, object], candidate: Dict[str, object]) -> Dict[str, float]:
+    return {
+        "logits_max_abs_diff": float((reference["logits"] - candidate["logits"]).abs().max()),
+        "label_agreement": float(
+            (reference["logits"].argmax(-1) == candidate["logits"].argmax(-1)).float().mean()),
+        "height_cm_max_abs_diff": float((reference["heights"] - candidate["heights"]).abs().max()),
+        "weight_kg_max_abs_diff": float((reference["weights"] - candidate["weights"]).abs().max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["onnx", "torchscript"], choices=["onnx", "torchscript"])
+    parser.add_argument("--images", default=None, help="directory of sample images (default: synthetic)")
+    parser.add_argument("--samples", type=int, default=16)
+    parser.add_argument("--model-dir", default=None, help="exported artifacts (default: INFERENCE_MODEL_DIR)")
+    parser.add_argument("--tiny", action="store_true", help="use tiny random-weight models, exported to a temp dir")
+    parser.add_argument("--logit-tol", type=float, default=1e-3)
+    parser.add_argument("--value-tol", type=float, default=0.1, help="cm / kg")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    model_dir = args.model_dir
+    if args.tiny:
+        from benchmarks.stubs import install_tiny_models
+
+        install_tiny_models()
+        model_dir = tempfile.mkdtemp(prefix="fitai-models-")
+        for fmt in args.backends:
+            inference.export(fmt, model_dir)
+
+    batches = _inputs(load_images(args.images, args.samples))
+    eager = inference.EagerBackend()
+    _run(eager, batches[:1])  # warm-up
+    reference = _run(eager, batches)
+    report = {"samples": len(batches), "eager": {"ms_per_image": reference["ms_per_image"]}}
+
+    failed = False
+    for name in args.backends:
+        backend = inference.build_backend(name, model_dir)
+        _run(backend, batches[:1])
+        result = _run(backend, batches)
+        diff = compare(reference, result)
+        ok = (
+            diff["logits_max_abs_diff"] <= args.logit_tol
+            and diff["label_agreement"] == 1.0
+            and diff["height_cm_max_abs_diff"] <= args.value_tol
+            and diff["weight_kg_max_abs_diff"] <= args.value_tol
+        )
+        failed |= not ok
+        report[name] = {"ms_per_image": result["ms_per_image"], **diff, "ok": ok}
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Offline check of the LLM backends in app.services.llm.
+
+Uses the random-weight local model from benchmarks.stubs (no download) and
+scripted primaries, and verifies:
+
+- batching: concurrent requests share generate() calls, and each caller gets
+  back its own reply
+- tier caps: replies never exceed the tier's max_new_tokens
+- failover: a failing or slow primary opens the circuit, requests go to the
+  fallback, and a healthy trial call after the cooldown closes it again
+- stuck trials: a cancelled trial re-opens the circuit, a trial that never
+  reports is replaced after the cooldown, and calls started while closed do
+  not decide a trial
+
+Prints a JSON report and exits 1 if any check fails.
+
+    python -m benchmarks.check_llm_failover --requests 16
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from app.core.config import settings
+from app.services.llm import CircuitBreaker, FailoverBackend, LLMBackend
+from benchmarks.stubs import tiny_local_llm
+
+
+class ScriptedBackend(LLMBackend):
+    name = "scripted"
+
+    def __init__(self, reply: str, fail: bool = False, delay: float = 0.0):
+        self.reply = reply
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+
+    async def complete(self, messages, max_tokens=None, tier="chat"):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("scripted failure")
+        return self.reply
+
+
+def _prompt(i: int):
+    words = " ".join(f"w{i + j}" for j in range(i % 7 + 1))
+    return [{"role": "system", "content": "w1 w2 w3"}, {"role": "user", "content": words}]
+
+
+async def check_batching(n: int) -> dict:
+    settings.LLM_LOCAL_MAX_NEW_TOKENS_CHAT = 8
+    settings.LLM_LOCAL_MAX_NEW_TOKENS_SUMMARY = 4
+    local = tiny_local_llm()
+    calls = []
+    generate = local._generate
+
+    def counted(batch, max_new_tokens):
+        calls.append((len(batch), max_new_tokens))
+        return generate(batch, max_new_tokens)
+
+    local._generate = counted
+
+    sequential = [await local.complete(_prompt(i)) for i in range(n)]
+    sequential_calls = len(calls)
+    calls.clear()
+
+    start = time.perf_counter()
+    tiers = ["chat" if i % 2 else "summary" for i in range(n)]
+    batched = await asyncio.gather(*(local.complete(_prompt(i), tier=tier) for i, tier in enumerate(tiers)))
+    elapsed = time.perf_counter() - start
+
+    tokenizer, _ = local._load()
+    over_cap = [i for i, (text, tier) in enumerate(zip(batched, tiers))
+                if len(tokenizer(text)["input_ids"]) > (8 if tier == "chat" else 4)]
+    chat_matches = sum(batched[i] == sequential[i] for i in range(n) if tiers[i] == "chat")
+    return {
+        "requests": n,
+        "sequential_generate_calls": sequential_calls,
+        "batched_generate_calls": len(calls),
+        "batch_sizes": [size for size, _ in calls],
+        "batched_seconds": round(elapsed, 3),
+        "replies_over_tier_cap": over_cap,
+        "chat_replies_matching_unbatched": f"{chat_matches}/{tiers.count('chat')}",
+        "ok": len(calls) < n and not over_cap,
+    }
+
+
+async def check_failover() -> dict:
+    fallback = ScriptedBackend("local")
+    results = {}
+    for name, primary in (("errors", ScriptedBackend("remote", fail=True)),
+                          ("latency", ScriptedBackend("remote", delay=0.05))):
+        breaker = CircuitBreaker(window=10, min_calls=4, max_error_rate=0.5, max_latency_seconds=0.03,
+                                 cooldown_seconds=0.2)
+        backend = FailoverBackend(primary, fallback, breaker)
+        replies = [await backend.complete(_prompt(i)) for i in range(10)]
+        opened_after = primary.calls
+        state_open = breaker.state
+
+        primary.fail, primary.delay = False, 0.0
+        await asyncio.sleep(0.25)
+        trial = await backend.complete(_prompt(0))
+        results[name] = {
+            "primary_calls_before_open": opened_after,
+            "fallback_replies": replies.count("local"),
+            "state_after_burst": state_open,
+            "trial_reply": trial,
+            "state_after_trial": breaker.state,
+            "ok": opened_after == 4 and state_open == "open" and trial == "remote" and breaker.state == "closed",
+        }
+    return results
+
+
+async def check_stuck_trial() -> dict:
+    breaker = CircuitBreaker(window=10, min_calls=4, max_error_rate=0.5, max_latency_seconds=1.0,
+                             cooldown_seconds=0.1)
+    slow = ScriptedBackend("remote", delay=10.0)
+    backend = FailoverBackend(slow, ScriptedBackend("local"), breaker)
+    late = breaker.allow()  # started while closed, reports after the circuit opened
+    for _ in range(4):
+        breaker.record(breaker.allow(), False, 0.01)
+    opened = breaker.state
+
+    await asyncio.sleep(0.15)
+    task = asyncio.create_task(backend.complete(_prompt(0)))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    after_cancel = breaker.state
+
+    await asyncio.sleep(0.15)
+    lost = breaker.allow()  # a trial whose caller never reports
+    blocked = breaker.allow()
+    breaker.record(late, True, 0.01)
+    await asyncio.sleep(0.15)
+    retrial = breaker.allow()
+    breaker.record(lost, False, 0.01)  # stale trial result is ignored
+    state_before_retrial = breaker.state
+    breaker.record(retrial, True, 0.01)
+    return {
+        "state_after_errors": opened,
+        "state_after_cancelled_trial": after_cancel,
+        "second_call_during_trial": blocked,
+        "new_trial_after_cooldown": retrial is not None and retrial != lost,
+        "state_after_stale_results": state_before_retrial,
+        "state_after_retrial": breaker.state,
+        "ok": (opened == "open" and after_cancel == "open" and blocked is None and retrial not in (None, lost)
+               and state_before_retrial == "half_open" and breaker.state == "closed"),
+    }
+
+
+async def run(n: int) -> dict:
+    batching = await check_batching(n)
+    failover = await check_failover()
+    stuck = await check_stuck_trial()
+    return {"batching": batching, "failover": failover, "stuck_trial": stuck,
+            "ok": batching["ok"] and all(r["ok"] for r in failover.values()) and stuck["ok"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=16, help="concurrent requests for the batching check")
+    args = parser.parse_args()
+    settings.LLM_LOCAL_MAX_BATCH = args.requests
+    report = asyncio.run(run(args.requests))
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Accuracy check for the INT8 dynamically-quantized ViT regressor.
+
+Runs the fp32 regressor and its INT8 copy (VIT_QUANTIZATION=int8) on a
+held-out image set and compares denormalized predictions. Error budget,
+measured as absolute difference from the fp32 prediction:
+
+    mean  <= 1.0 cm / 1.0 kg
+    max   <= 2.5 cm / 2.5 kg
+
+Both are well inside the models' own error against ground truth, so the
+user-visible estimate is unchanged. Also reports serialized weight size and
+mean CPU latency per image; exits 1 if the budget is exceeded.
+
+    python -m benchmarks.check_quantization --images ./holdout
+
+`--tiny` uses the random-weight regressor from benchmarks.stubs (no download)
+to exercise the pipeline; its accuracy numbers are not meaningful.
+"""
+import argparse
+import copy
+import io
+import json
+import sys
+import time
+from io import BytesIO
+from typing import Dict, List
+
+import torch
+from PIL import Image
+
+from benchmarks.check_inference_parity import load_images
+
+BUDGET = {"mean_cm": 1.0, "mean_kg": 1.0, "max_cm": 2.5, "max_kg": 2.5}
+
+
+def _size_mb(model: torch.nn.Module) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return round(buffer.tell() / 1e6, 2)
+
+
+def _predict(model, batches, stats) -> Dict[str, object]:
+    heights, weights = [], []
+    start = time.perf_counter()
+    with torch.inference_mode():
+        for pixel_values in batches:
+            outputs = model(pixel_values)
+            heights.append(outputs["height"].item() * stats["height_std"] + stats["height_mean"])
+            weights.append(outputs["weight"].item() * stats["weight_std"] + stats["weight_mean"])
+    elapsed = time.perf_counter() - start
+    return {
+        "heights": torch.tensor(heights),
+        "weights": torch.tensor(weights),
+        "ms_per_image": round(elapsed / len(batches) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default=None, help="held-out image directory (default: synthetic)")
+    parser.add_argument("--samples", type=int, default=32)
+    parser.add_argument("--tiny", action="store_true")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    from app.services import ai_service
+
+    if args.tiny:
+        from benchmarks.stubs import install_tiny_models
+
+        install_tiny_models()
+        fp32, _, stats, _ = ai_service.load_vit_model()
+    else:
+        fp32, stats, _ = ai_service.build_vit_model(torch.device("cpu"))
+    int8 = ai_service.quantize_int8(copy.deepcopy(fp32))
+
+    processor = ai_service.load_vit_processor()
+    batches: List[torch.Tensor] = [
+        processor(images=Image.open(BytesIO(data)).convert("RGB"), return_tensors="pt")["pixel_values"]
+        for data in load_images(args.images, args.samples)
+    ]
+
+    _predict(fp32, batches[:1], stats)  # warm-up
+    _predict(int8, batches[:1], stats)
+    reference = _predict(fp32, batches, stats)
+    quantized = _predict(int8, batches, stats)
+
+    cm = (reference["heights"] - quantized["heights"]).abs()
+    kg = (reference["weights"] - quantized["weights"]).abs()
+    errors = {
+        "mean_cm": round(float(cm.mean()), 3), "max_cm": round(float(cm.max()), 3),
+        "mean_kg": round(float(kg.mean()), 3), "max_kg": round(float(kg.max()), 3),
+    }
+    ok = all(errors[k] <= limit for k, limit in BUDGET.items())
+    report = {
+        "samples": len(batches),
+        "fp32": {"size_mb": _size_mb(fp32), "ms_per_image": reference["ms_per_image"]},
+        "int8": {"size_mb": _size_mb(int8), "ms_per_image": quantized["ms_per_image"]},
+        "error": errors,
+        "budget": BUDGET,
+        "ok": ok,
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
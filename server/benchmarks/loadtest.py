@@ -0,0 +1,326 @@
+"""Load test the main API endpoints and report latency percentiles as JSON.
+
+By default everything runs in-process and offline: the app is driven through
+httpx's ASGI transport against a mongomock-motor database seeded with
+synthetic users (see benchmarks.seed). With --ai the AI endpoints are
+included, backed by a local stub LLM server and tiny random-weight models
+(see benchmarks.stubs).
+
+    python -m benchmarks.loadtest --requests 2000 --concurrency 32
+    python -m benchmarks.loadtest --ai --output report.json
+    python -m benchmarks.loadtest --baseline main.json --max-regression 0.25
+
+Against a real deployment (seed it first with benchmarks.seed, same SECRET_KEY):
+
+    python -m benchmarks.loadtest --backend mongo --base-url http://localhost:8000
+
+The report has, per scenario and overall: request/error counts, status codes,
+throughput and p50/p95/p99/mean/max latency in ms. With --baseline, the run
+exits non-zero if any scenario's p95 regressed by more than --max-regression.
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_access_token
+
+FOOD_NAMES = ["Apple", "Banana", "Broccoli", "Avocado", "Spinach", "Mango"]
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: int
+    build: Callable[[random.Random], dict]  # -> kwargs for httpx.AsyncClient.request
+    ai: bool = False
+
+
+def _scenarios(image: Optional[bytes]) -> List[Scenario]:
+    def days_ago(rng, n=30):
+        return (date.today() - timedelta(days=rng.randrange(n))).isoformat()
+
+    def image_upload():
+        return {"file": ("body.jpg", image, "image/jpeg")}
+
+    return [
+        Scenario("food_log", 3, lambda rng: {
+            "method": "POST", "url": "/api/food/log",
+            "json": {"food_name": rng.choice(FOOD_NAMES), "quantity": float(rng.randrange(50, 300, 10)),
+                     "meal_type": rng.choice(["breakfast", "lunch", "snacks", "dinner"])},
+        }),
+        Scenario("food_daily", 4, lambda rng: {
+            "method": "GET", "url": "/api/food/daily", "params": {"target_date": days_ago(rng)},
+        }),
+        Scenario("food_range_month", 1, lambda rng: {
+            "method": "GET", "url": "/api/food/range",
+            "params": {"start": (date.today() - timedelta(days=29)).isoformat(), "end": date.today().isoformat()},
+        }),
+        Scenario("analytics_weekly_summary", 2, lambda rng: {"method": "GET", "url": "/api/analytics/weekly-summary"}),
+        Scenario("analytics_adherence", 1, lambda rng: {"method": "GET", "url": "/api/analytics/adherence-score"}),
+        Scenario("analytics_streaks", 1, lambda rng: {"method": "GET", "url": "/api/analytics/streaks"}),
+        Scenario("health_awareness", 2, lambda rng: {"method": "GET", "url": "/api/health/awareness"}),
+        Scenario("workout_streak", 2, lambda rng: {"method": "GET", "url": "/api/workout/streak"}),
+        Scenario("ai_classify_image", 1, lambda rng: {
+            "method": "POST", "url": "/api/ai/classify-image", "files": image_upload(),
+        }, ai=True),
+        Scenario("ai_predict_height_weight", 1, lambda rng: {
+            "method": "POST", "url": "/api/ai/predict-height-weight", "files": image_upload(),
+        }, ai=True),
+        Scenario("ai_analyze_image", 1, lambda rng: {
+            "method": "POST", "url": "/api/ai/analyze-image", "files": image_upload(),
+        }, ai=True),
+        Scenario("ai_generate_plan", 1, lambda rng: {
+            "method": "POST", "url": "/api/ai/generate-plan", "files": image_upload(),
+            "data": {"age": "30", "sex": "male", "weight": "80", "height_cm": "180",
+                     "activity_level": "moderate", "goal": "muscle gain"},
+        }, ai=True),
+        Scenario("ai_chat", 1, lambda rng: {
+            "method": "POST", "url": "/api/ai/chat", "json": {"message": "How much protein should I eat?"},
+        }, ai=True),
+    ]
+
+
+@dataclass
+class Samples:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: Samples, wall_seconds: float) -> dict:
+    values = sorted(samples.latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": samples.errors,
+        "status": dict(sorted(samples.statuses.items())),
+        "throughput_rps": round(count / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(values, 50) * 1000, 2),
+            "p95": round(percentile(values, 95) * 1000, 2),
+            "p99": round(percentile(values, 99) * 1000, 2),
+            "mean": round(sum(values) / count * 1000, 2) if count else 0.0,
+            "max": round(values[-1] * 1000, 2) if count else 0.0,
+        },
+    }
+
+
+async def _setup_inprocess(args) -> List[Callable[[], None]]:
+    """Wire the app to a seeded in-memory (or real) database; returns cleanup callables."""
+    from app.db import mongodb
+    from app.db.instrumented import InstrumentedDatabase
+    from benchmarks.seed import seed
+
+    settings.MONGODB_DB_NAME = args.db
+    if args.backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+
+        mongodb.db.client = AsyncMongoMockClient()
+        mongodb.db.db = InstrumentedDatabase(mongodb.db.client[args.db])
+        user_ids = await seed(mongodb.get_database(), users=args.users, days=args.days, seed=args.seed)
+    else:
+        await mongodb.connect_to_mongo()
+        user_ids = [str(u["_id"]) async for u in mongodb.get_database()["users"].find(
+            {"email": {"$regex": r"^bench-user-"}}, {"_id": 1})]
+        if not user_ids:
+            user_ids = await seed(mongodb.get_database(), users=args.users, days=args.days, seed=args.seed)
+    args.user_ids = user_ids
+
+    stops = [] if args.backend == "mongomock" else [mongodb.db.client.close]
+    if args.ai:
+        from benchmarks.stubs import StubLLMServer, install_llm_stub, install_tiny_models
+
+        server = StubLLMServer(latency=args.llm_latency).start()
+        install_llm_stub(server.url)
+        install_tiny_models()
+        stops.append(server.stop)
+    return stops
+
+
+async def _run(args, client: httpx.AsyncClient, scenarios: List[Scenario]) -> dict:
+    rng = random.Random(args.seed)
+    tokens = [create_access_token(data={"sub": uid}) for uid in args.user_ids]
+    weights = [s.weight for s in scenarios]
+    plan = [rng.choices(scenarios, weights)[0] for _ in range(args.warmup + args.requests)]
+    results: Dict[str, Samples] = {s.name: Samples() for s in scenarios}
+
+    async def drive(batch: List[Scenario], record: bool) -> float:
+        queue: asyncio.Queue = asyncio.Queue()
+        for scenario in batch:
+            queue.put_nowait(scenario)
+
+        async def worker(worker_id: int):
+            wrng = random.Random(args.seed * 1000 + worker_id)
+            while not queue.empty():
+                scenario = queue.get_nowait()
+                request = scenario.build(wrng)
+                headers = {"Authorization": f"Bearer {wrng.choice(tokens)}"}
+                start = time.perf_counter()
+                try:
+                    response = await client.request(headers=headers, timeout=args.timeout, **request)
+                    status_code = str(response.status_code)
+                    failed = response.status_code >= 400
+                except Exception:
+                    status_code = "exception"
+                    failed = True
+                elapsed = time.perf_counter() - start
+                if record:
+                    samples = results[scenario.name]
+                    samples.latencies.append(elapsed)
+                    samples.statuses[status_code] = samples.statuses.get(status_code, 0) + 1
+                    samples.errors += int(failed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(i) for i in range(args.concurrency)])
+        return time.perf_counter() - started
+
+    await drive(plan[:args.warmup], record=False)
+    wall = await drive(plan[args.warmup:], record=True)
+
+    overall = Samples()
+    for samples in results.values():
+        overall.latencies.extend(samples.latencies)
+        overall.errors += samples.errors
+        for code, n in samples.statuses.items():
+            overall.statuses[code] = overall.statuses.get(code, 0) + n
+    return {
+        "scenarios": {name: summarize(s, wall) for name, s in results.items() if s.latencies},
+        "overall": summarize(overall, wall),
+        "wall_seconds": round(wall, 3),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Return a line per scenario whose p95 got worse than the allowed ratio."""
+    regressions = []
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before["latency_ms"]["p95"]:
+            continue
+        ratio = current["latency_ms"]["p95"] / before["latency_ms"]["p95"]
+        if ratio > 1 + max_regression:
+            regressions.append(f"{name}: p95 {before['latency_ms']['p95']}ms -> {current['latency_ms']['p95']}ms "
+                               f"({(ratio - 1) * 100:.0f}% slower)")
+    return regressions
+
+
+async def _main(args) -> int:
+    image = None
+    if args.ai:
+        from benchmarks.stubs import make_test_image
+        image = make_test_image()
+    scenarios = [s for s in _scenarios(image) if args.ai or not s.ai]
+    if args.scenarios:
+        wanted = set(args.scenarios.split(","))
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    cleanup: List[Callable[[], None]] = []
+    if args.base_url:
+        from app.db import mongodb
+
+        settings.MONGODB_DB_NAME = args.db
+        await mongodb.connect_to_mongo()
+        cleanup.append(mongodb.db.client.close)
+        args.user_ids = [str(u["_id"]) async for u in mongodb.get_database()["users"].find(
+            {"email": {"$regex": r"^bench-user-"}}, {"_id": 1})]
+        if not args.user_ids:
+            print("No bench users found; run `python -m benchmarks.seed` against the server's database first")
+            return 2
+        client = httpx.AsyncClient(base_url=args.base_url,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        from main import app
+
+        cleanup = await _setup_inprocess(args)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    try:
+        async with client:
+            result = await _run(args, client, scenarios)
+    finally:
+        for stop in cleanup:
+            stop()
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "target": args.base_url or "in-process",
+            "backend": args.backend,
+            "users": len(args.user_ids),
+            "days": args.days,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "ai": args.ai,
+            "seed": args.seed,
+        },
+        **result,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests (after warm-up)")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", help="comma-separated subset of scenario names")
+    parser.add_argument("--ai", action="store_true", help="include AI endpoints (stub LLM + tiny models)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub LLM seconds per completion")
+    parser.add_argument("--backend", choices=["mongomock", "mongo"], default="mongomock")
+    parser.add_argument("--db", default="fitai_bench")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--base-url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="previous report to compare p95 latencies against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 slowdown, e.g. 0.2 = 20%%")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Seed a database with synthetic users and a year of logs.
+
+Each user gets a profile, one stored plan, and one document per day in
+food_logs, workout_logs (on training days), wearable_daily_summary and a
+weekly health_sync record. Documents mirror what the API itself writes, so
+every aggregation sees realistic shapes. Generation is deterministic for a
+given --seed.
+
+    python -m benchmarks.seed --users 50 --days 365 --db fitai_bench --drop
+
+Seeding a real server's database: point MONGODB_URL at it and pass the same
+--db the server uses (MONGODB_DB_NAME).
+"""
+import argparse
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+
+from app.core.security import get_password_hash
+from app.services.plan_storage import encode_plan_text
+
+MEALS = ["breakfast", "lunch", "snacks", "dinner"]
+FOODS = [
+    # name, kcal, protein, carbs, fat, fiber per 100g (subset of the mock food table)
+    ("Apple", 52, 0.3, 13.8, 0.2, 2.4),
+    ("Banana", 89, 1.1, 22.8, 0.3, 2.6),
+    ("Broccoli", 34, 2.8, 7.0, 0.4, 2.6),
+    ("Sweet Potato", 86, 1.6, 20.1, 0.1, 3.0),
+    ("Avocado", 160, 2.0, 8.5, 14.7, 6.7),
+    ("Spinach", 23, 2.9, 3.6, 0.4, 2.2),
+    ("Mango", 60, 0.8, 15.0, 0.4, 1.6),
+    ("Carrots", 41, 0.9, 9.6, 0.2, 2.8),
+]
+EXERCISES = [
+    ("Bench Press", "chest"), ("Push-ups", "chest"), ("Pull-ups", "back"),
+    ("Barbell Back Squat", "legs"), ("Deadlift", "back"), ("Shoulder Press", "shoulders"),
+    ("Bicep Curls", "biceps"), ("Plank", "abs"),
+]
+GOALS = ["weight loss", "muscle gain", "maintenance"]
+ACTIVITY = ["sedentary", "light", "moderate", "active"]
+
+BENCH_PASSWORD = "benchmark"
+BENCH_EMAIL = "bench-user-{i}@example.com"
+
+
+def synthetic_plan_text(rng: random.Random) -> str:
+    kcal = rng.randrange(1800, 3000, 50)
+    days = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+    meals = "\n\n".join(
+        f"**{d} 🥗**\n• Breakfast 🍳: Oats\n• Lunch 🍱: Chicken and rice\n• Dinner 🍽️: Salmon\n• Snack 🍎: Apple"
+        for d in days
+    )
+    workouts = "\n\n".join(
+        f"**{d} 🏋️**\n• Focus: Full body\n• Exercises: Squat, press, row\n• Sets × Reps: 4 × 8\n• Rest: 90s"
+        for d in days
+    )
+    return (
+        "🔥 PLAN SNAPSHOT\n• Synthetic benchmark plan\n\n---\n\n"
+        f"🍽️ DAILY NUTRITION TARGETS\n• Calories: **{kcal} kcal**\n• Protein: **{kcal // 16} g (25%)** 🥩\n\n---\n\n"
+        f"🥗 WEEKLY MEAL PLAN (SUN → SAT)\n{meals}\n\n---\n\n🏋️ WEEKLY WORKOUT PLAN (SUN → SAT)\n{workouts}\n"
+    )
+
+
+def _food_doc(rng: random.Random, user_id: str, day: datetime) -> dict:
+    meals = {m: [] for m in MEALS}
+    totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0, "fiber": 0.0}
+    for meal in MEALS:
+        for _ in range(rng.randint(1, 3)):
+            name, kcal, protein, carbs, fat, fiber = rng.choice(FOODS)
+            qty = float(rng.randrange(50, 300, 10))
+            macros = {
+                "calories": round(kcal * qty / 100, 1),
+                "protein": round(protein * qty / 100, 1),
+                "carbs": round(carbs * qty / 100, 1),
+                "fat": round(fat * qty / 100, 1),
+                "fiber": round(fiber * qty / 100, 1),
+            }
+            for k in totals:
+                totals[k] += macros[k]
+            meals[meal].append({
+                "food_name": name, "quantity": qty, "meal_type": meal, "macros": macros,
+                "logged_at": day + timedelta(hours=7 + 4 * MEALS.index(meal)),
+            })
+    return {
+        "_id": ObjectId(), "user_id": user_id, "date": day, "meals": meals,
+        "total_macros": {k: round(v, 1) for k, v in totals.items()},
+        "water_ml": float(rng.randrange(500, 3500, 250)), "version": 1,
+        "created_at": day + timedelta(hours=7), "updated_at": day + timedelta(hours=20),
+    }
+
+
+def _workout_doc(rng: random.Random, user_id: str, day: datetime) -> dict:
+    workouts = []
+    for _ in range(rng.randint(2, 5)):
+        name, group = rng.choice(EXERCISES)
+        workouts.append({
+            "exercise_name": name, "muscle_group": group, "sets": rng.randint(3, 5), "reps": rng.randint(6, 12),
+            "weight": float(rng.randrange(10, 120, 5)), "duration": rng.randrange(300, 1200, 60),
+            "distance": None, "notes": None, "logged_at": day + timedelta(hours=18),
+        })
+    return {
+        "_id": ObjectId(), "user_id": user_id, "date": day, "workouts": workouts,
+        "total_sets": sum(w["sets"] for w in workouts), "total_reps": sum(w["reps"] for w in workouts),
+        "total_weight": sum(w["weight"] for w in workouts), "total_duration": sum(w["duration"] for w in workouts),
+        "version": 1,
+        "created_at": day + timedelta(hours=18), "updated_at": day + timedelta(hours=19),
+    }
+
+
+async def seed(db, users: int = 20, days: int = 365, seed: int = 42, batch: int = 1000) -> List[str]:
+    """Insert synthetic data and return the seeded user ids."""
+    rng = random.Random(seed)
+    hashed = get_password_hash(BENCH_PASSWORD)
+    today = datetime.combine(date.today(), datetime.min.time())
+    user_ids = []
+    buffers = {"food_logs": [], "workout_logs": [], "wearable_daily_summary": [], "health_sync": []}
+
+    async def flush(force: bool = False):
+        for name, docs in buffers.items():
+            if docs and (force or len(docs) >= batch):
+                await db[name].insert_many(docs, ordered=False)
+                docs.clear()
+
+    for i in range(users):
+        oid = ObjectId()
+        user_id = str(oid)
+        user_ids.append(user_id)
+        now = datetime.utcnow()
+        await db["users"].insert_one({
+            "_id": oid, "email": BENCH_EMAIL.format(i=i), "name": f"Bench User {i}", "hashed_password": hashed,
+            "age": rng.randint(18, 65), "sex": rng.choice(["male", "female"]),
+            "weight": float(rng.randint(50, 110)), "height_cm": float(rng.randint(150, 195)),
+            "activity_level": rng.choice(ACTIVITY), "goal": rng.choice(GOALS),
+            "created_at": now, "updated_at": now,
+        })
+        await db["plans"].insert_one({
+            "user_id": user_id,
+            "user_inputs": {"age": 30, "sex": "male", "weight": 80.0, "height_cm": 180.0,
+                            "activity_level": "moderate", "goal": rng.choice(GOALS), "diet_prefs": None},
+            "classifier_label": "Ordinary",
+            **encode_plan_text(synthetic_plan_text(rng)),
+            "created_at": now,
+        })
+
+        trains_on = set(rng.sample(range(7), rng.randint(2, 5)))
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            if rng.random() < 0.9:
+                buffers["food_logs"].append(_food_doc(rng, user_id, day))
+            if day.weekday() in trains_on and rng.random() < 0.85:
+                buffers["workout_logs"].append(_workout_doc(rng, user_id, day))
+            buffers["wearable_daily_summary"].append({
+                "user_id": user_id, "date": day.date().isoformat(), "steps": rng.randint(2000, 15000),
+                "sleep_minutes": rng.randint(300, 540), "resting_heart_rate": rng.randint(50, 80),
+                "active_minutes": rng.randint(10, 120), "calories_burned": rng.randint(1800, 3200),
+                "synced_at": day + timedelta(hours=23),
+            })
+            if offset % 7 == 0:
+                buffers["health_sync"].append({
+                    "user_id": user_id, "avg_steps": rng.randint(3000, 12000),
+                    "avg_sleep_hours": round(rng.uniform(5.5, 8.5), 1), "resting_heart_rate": rng.randint(50, 80),
+                    "source": "benchmark", "confidence_score": 0.8,
+                    "synced_at": day + timedelta(hours=22), "created_at": day + timedelta(hours=22),
+                })
+            await flush()
+    await flush(force=True)
+    return user_ids
+
+
+async def _main(args):
+    from app.db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+    from app.core.config import settings
+
+    settings.MONGODB_DB_NAME = args.db
+    await connect_to_mongo()
+    try:
+        db = get_database()
+        if args.drop:
+            for name in ["users", "plans", "food_logs", "workout_logs", "wearable_daily_summary", "health_sync"]:
+                await db[name].drop()
+        user_ids = await seed(db, users=args.users, days=args.days, seed=args.seed)
+        print(f"Seeded {len(user_ids)} users x {args.days} days into '{args.db}'")
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default="fitai_bench", help="database name (never the production one)")
+    parser.add_argument("--drop", action="store_true", help="drop the seeded collections first")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
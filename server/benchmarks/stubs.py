@@ -0,0 +1,174 @@
+"""Offline stand-ins for the external pieces the AI endpoints depend on.
+
+- StubLLMServer: a local OpenAI-compatible /chat/completions endpoint that
+  returns a canned plan after a configurable delay, with token usage.
+- install_tiny_models(): swaps the Hugging Face checkpoints for tiny
+  random-weight models with the same interfaces, so the image endpoints run
+  real torch inference without downloading anything.
+- tiny_local_llm(): a LocalBackend around a random-weight GPT-2 and a
+  word-level tokenizer, for exercising batching and failover offline.
+
+Run the LLM stub on its own (for a server started with GROQ_API_URL pointing at it):
+
+    python -m benchmarks.stubs --port 8089 --latency 0.3
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+from benchmarks.seed import synthetic_plan_text
+
+
+def make_test_image(size: int = 256, seed: int = 0) -> bytes:
+    """A small noisy JPEG to upload to the image endpoints."""
+    import random
+    from PIL import Image
+
+    rng = random.Random(seed)
+    image = Image.new("RGB", (size, size))
+    image.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(size * size)])
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class StubLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2):
+        import random
+
+        canned = synthetic_plan_text(random.Random(0))
+        delay = latency
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt = " ".join(m.get("content", "") for m in request.get("messages", []))
+                time.sleep(delay)
+                body = json.dumps({
+                    "id": "stub",
+                    "object": "chat.completion",
+                    "model": request.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": canned}, "finish_reason": "stop"}],
+                    "usage": {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(canned) // 4,
+                        "total_tokens": (len(prompt) + len(canned)) // 4,
+                    },
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/openai/v1/chat/completions"
+
+    def start(self) -> "StubLLMServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def install_llm_stub(url: str) -> None:
+    from app.services import llm
+
+    llm.GROQ_API_URL = url
+    llm.GROQ_API_KEY = llm.GROQ_API_KEY or "stub"
+
+
+def tiny_local_llm():
+    """A LocalBackend with a random-weight two-layer GPT-2 and a word-level tokenizer."""
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+    from app.services.llm import LocalBackend
+
+    words = ["<pad>", "<unk>", "<eos>", ":", "user", "assistant", "system"] + [f"w{i}" for i in range(249)]
+    core = Tokenizer(models.WordLevel({w: i for i, w in enumerate(words)}, unk_token="<unk>"))
+    core.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+
+    def loader():
+        torch.manual_seed(0)
+        tokenizer = PreTrainedTokenizerFast(
+            tokenizer_object=core, pad_token="<pad>", unk_token="<unk>", eos_token="<eos>")
+        model = GPT2LMHeadModel(GPT2Config(
+            vocab_size=len(words), n_positions=512, n_embd=32, n_layer=2, n_head=2,
+            bos_token_id=2, eos_token_id=2, pad_token_id=0,
+        )).eval()
+        return tokenizer, model
+
+    return LocalBackend(model_id="tiny-random-gpt2", loader=loader)
+
+
+def install_tiny_models(image_size: int = 64) -> None:
+    """Replace the image model loaders with tiny random-weight models."""
+    import torch
+    import torch.nn as nn
+    from transformers import ResNetConfig, ResNetForImageClassification, ViTConfig, ViTImageProcessor, ViTModel
+
+    from app.services import ai_service
+
+    torch.manual_seed(0)
+    processor = ViTImageProcessor(size={"height": image_size, "width": image_size})
+
+    classifier = ResNetForImageClassification(ResNetConfig(
+        embedding_size=8, hidden_sizes=[8, 16], depths=[1, 1], num_labels=len(ai_service.LABEL_MAP),
+    )).eval()
+
+    class TinyRegressor(nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.vit = ViTModel(ViTConfig(
+                hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64,
+                image_size=image_size, patch_size=16,
+            ), add_pooling_layer=False)
+            self.height_head = nn.Linear(32, 1)
+            self.weight_head = nn.Linear(32, 1)
+
+        def forward(self, pixel_values):
+            cls_token = self.vit(pixel_values).last_hidden_state[:, 0, :]
+            return {"height": self.height_head(cls_token), "weight": self.weight_head(cls_token)}
+
+    regressor = TinyRegressor().eval()
+    stats = {"height_mean": 170.0, "height_std": 10.0, "weight_mean": 70.0, "weight_std": 12.0}
+
+    ai_service.load_image_processor = lambda: processor
+    ai_service.load_vit_processor = lambda: processor
+    ai_service.load_image_model = lambda: (processor, classifier)
+    ai_service.load_vit_model = lambda: (regressor, processor, stats, torch.device("cpu"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per completion")
+    args = parser.parse_args()
+    server = StubLLMServer(args.host, args.port, args.latency).start()
+    print(f"Stub LLM listening on {server.url} (set GROQ_API_URL to this)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,46 +3,73 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
 import uvicorn
-import json
 
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.log import setup_logging, shutdown_logging, get_logger
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.uploads import UploadLimitMiddleware
 from app.api.routes import auth, users, ai, plans, food, workout, analytics, health
 from app.api.routes import health_insights
 from app.api.routes import wearables
+from app.api.routes import events
+from app.api.routes import metrics
+from app.api.routes import admin
+from app.api.routes import jobs
 from app.db.mongodb import connect_to_mongo, close_mongo_connection
 from app.services.wearable_service import run_daily_sync_loop
+from app.services.event_bus import event_bus
+from app.services.job_queue import job_worker
+from app.services.plan_storage import load_dictionaries
+from app.services.exercise_catalog import get_catalog
+from app.services.semantic_cache import get_semantic_cache
 import asyncio
 
+setup_logging()
+logger = get_logger("main")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print("Starting lifespan...")
+    logger.info("Starting lifespan...")
     try:
         await connect_to_mongo()
-        print("MongoDB connected successfully")
-    except Exception as e:
-        print(f"ERROR during MongoDB connection: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.info("MongoDB connected successfully")
+        await event_bus.start()
+        await load_dictionaries()
+        await job_worker.start()
+        catalog = get_catalog()
+        logger.info("Exercise catalog loaded", extra={"exercises": len(catalog.exercises)})
+        # Load the chat cache's embedder now rather than in the first chat request
+        await asyncio.get_event_loop().run_in_executor(None, get_semantic_cache)
+    except Exception:
+        logger.exception("Startup failed")
         raise
-    print("Lifespan startup complete")
+    logger.info("Lifespan startup complete")
     yield
     # Shutdown
-    print("Starting shutdown...")
+    logger.info("Starting shutdown...")
+    await job_worker.stop()
+    await event_bus.stop()
     try:
         await close_mongo_connection()
-        print("MongoDB closed successfully")
-    except Exception as e:
-        print(f"ERROR during MongoDB close: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.info("MongoDB closed successfully")
+    except Exception:
+        logger.exception("MongoDB close failed")
+    shutdown_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Reject oversized multipart uploads while they stream in. The last-added middleware is the
+# outermost, so registering this first keeps its 413s inside CORS and metrics.
+app.add_middleware(UploadLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -52,18 +79,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and status metrics, scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in request profiling; not installed at all unless enabled
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Custom exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
     """Log validation errors for debugging"""
     errors = exc.errors()
-    print(f"[VALIDATION ERROR] Path: {request.url.path}")
-    print(f"[VALIDATION ERROR] Method: {request.method}")
-    print(f"[VALIDATION ERROR] Details: {json.dumps(errors, indent=2)}")
-    print(f"[VALIDATION ERROR] Body: {await request.body()}")
+    # Request bodies are deliberately not logged (size, and they may contain credentials)
+    logger.info("validation_error", extra={
+        "path": request.url.path,
+        "method": request.method,
+        "errors": errors,
+    })
     # Return the default FastAPI validation error response
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=422,
         content={"detail": errors},
     )
@@ -79,6 +114,10 @@ app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"]
 app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(health_insights.router, prefix="/api/health", tags=["health_insights"])
 app.include_router(wearables.router, prefix="/api/wearables", tags=["wearables"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
+app.include_router(metrics.router, tags=["metrics"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 
 @app.get("/")